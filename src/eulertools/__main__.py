@@ -1,17 +1,33 @@
+from argparse import Namespace
+
+from pyutilkit.term import SGROutput
+
 from eulertools.lib.cli import parse_args
+from eulertools.lib.utils import get_cache_info
 from eulertools.subcommands.compare import Compare
 from eulertools.subcommands.generate import Generate
+from eulertools.subcommands.merge import Merge
 from eulertools.subcommands.run import Run
 from eulertools.subcommands.statement import Statement
 from eulertools.subcommands.test import Test
 from eulertools.subcommands.timing import Time
+from eulertools.subcommands.trend import Trend
 
 
 def main() -> None:
     args = parse_args()
+    try:
+        _run_subcommand(args)
+    finally:
+        if args.verbosity > 3:  # noqa: PLR2004
+            for name, info in get_cache_info().items():
+                SGROutput([f"🔍 {name.capitalize()} cache: ", str(info)]).print()
+
+
+def _run_subcommand(args: Namespace) -> None:
     match args.subcommand:
         case "generate":
-            Generate(args.languages, args.problems).run()
+            Generate(args.languages, args.problems, dry_run=args.dry_run).run()
         case "run":
             Run(
                 args.languages,
@@ -20,6 +36,13 @@ def main() -> None:
                 args.times,
                 args.update_mode,
                 args.extra,
+                args.jobs,
+                use_cache=not args.no_cache,
+                selection=args.selection,
+                fail_fast=args.fail_fast,
+                prioritise=args.prioritise,
+                shard=args.shard,
+                output_format=args.output_format,
             ).run()
         case "time":
             Time(
@@ -29,12 +52,49 @@ def main() -> None:
                 args.verbosity,
                 args.update_mode,
                 args.extra,
+                args.jobs,
+                threshold=args.threshold,
+                fail_on_regression=args.fail_on_regression,
+                sampling=args.sampling,
+                isolation=args.isolation,
+                selection=args.selection,
+                shard=args.shard,
+                resume=args.resume,
+                output_format=args.output_format,
             ).run()
         case "test":
             Test(
-                args.languages, args.problems, args.times, args.verbosity, args.extra
+                args.languages,
+                args.problems,
+                args.times,
+                args.verbosity,
+                args.extra,
+                args.jobs,
+                use_cache=not args.no_cache,
+                selection=args.selection,
+                fail_fast=args.fail_fast,
+                prioritise=args.prioritise,
+                output_format=args.output_format,
             ).run()
+        case "merge":
+            Merge(args.files).run()
         case "compare":
-            Compare(args.languages, args.problems).run()
+            Compare(
+                args.languages,
+                args.problems,
+                args.metric,
+                output_format=args.output_format,
+                baseline=args.baseline,
+                order=args.order,
+                top=args.top,
+            ).run()
+        case "trend":
+            Trend(
+                args.languages,
+                args.problems,
+                threshold=args.threshold,
+                last=args.last,
+                output_format=args.output_format,
+            ).run()
         case "statement":  # pragma: no branch
             Statement(args.problems, show_hints=args.show_hints).run()
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import json
+import shutil
+import sqlite3
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any
+
+import yaml
+
+from eulertools.lib.constants import ANSWER
+from eulertools.lib.filesystem import atomic_write
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+ProblemData = dict[str, dict[str, Any]]  # type: ignore[misc]
+
+
+class ResultsBackend(ABC):
+    """Storage for the results of every problem.
+
+    The results of a problem are exchanged in the same format as the one
+    that `ProblemSummary.as_dict` produces.
+    """
+
+    __slots__ = ("path",)
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    @abstractmethod
+    def create(self) -> None: ...
+
+    @abstractmethod
+    def remove(self) -> None: ...
+
+    @abstractmethod
+    def load(self, problem_name: str) -> ProblemData | None: ...
+
+    @abstractmethod
+    def load_all(self) -> dict[str, ProblemData]: ...
+
+    @abstractmethod
+    def save(self, problems: dict[str, ProblemData]) -> None: ...
+
+
+class YamlBackend(ResultsBackend):
+    """A directory with a YAML file for every problem."""
+
+    __slots__ = ()
+
+    def create(self) -> None:
+        self.path.mkdir()
+
+    def remove(self) -> None:
+        shutil.rmtree(self.path)
+
+    def load(self, problem_name: str) -> ProblemData | None:
+        try:
+            with self.path.joinpath(f"{problem_name}.yaml").open() as file:
+                data: ProblemData = yaml.safe_load(file)
+        except FileNotFoundError:
+            return None
+        return data
+
+    def load_all(self) -> dict[str, ProblemData]:
+        output = {}
+        for results_file in sorted(self.path.rglob("*.yaml")):
+            problem_name = results_file.relative_to(self.path).with_suffix("")
+            with results_file.open() as file:
+                output[problem_name.as_posix()] = yaml.safe_load(file)
+        return output
+
+    def save(self, problems: dict[str, ProblemData]) -> None:
+        for problem_name, data in problems.items():
+            results_file = self.path.joinpath(f"{problem_name}.yaml")
+            atomic_write(results_file, yaml.dump(data))
+
+
+class SQLiteBackend(ResultsBackend):
+    """A single SQLite database, with a row for every answer and timing.
+
+    Answers are keyed by (problem, case_key), timings by (problem, case_key,
+    language). Any other value is kept as JSON in the `extras` table.
+    """
+
+    __slots__ = ("_connection",)
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS answers (
+            problem TEXT NOT NULL,
+            case_key TEXT NOT NULL,
+            answer TEXT NOT NULL,
+            PRIMARY KEY (problem, case_key)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS timings (
+            problem TEXT NOT NULL,
+            case_key TEXT NOT NULL,
+            language TEXT NOT NULL,
+            nanoseconds INTEGER NOT NULL,
+            PRIMARY KEY (problem, case_key, language)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS extras (
+            problem TEXT NOT NULL,
+            case_key TEXT NOT NULL,
+            key TEXT NOT NULL,
+            value TEXT NOT NULL,
+            PRIMARY KEY (problem, case_key, key)
+        ) WITHOUT ROWID;
+    """
+    TABLES = ("answers", "timings", "extras")
+
+    def __init__(self, path: Path) -> None:
+        super().__init__(path)
+        self._connection: sqlite3.Connection | None = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path)
+            self._connection.executescript(self.SCHEMA)
+        return self._connection
+
+    def create(self) -> None:
+        self.connection.commit()
+
+    def remove(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+        self.path.unlink()
+
+    def load(self, problem_name: str) -> ProblemData | None:
+        output = self._load("WHERE problem = ?", (problem_name,))
+        return output.get(problem_name)
+
+    def load_all(self) -> dict[str, ProblemData]:
+        return self._load("", ())
+
+    def _load(self, where: str, params: tuple[str, ...]) -> dict[str, ProblemData]:
+        output: dict[str, ProblemData] = {}
+        answers = self.connection.execute(
+            f"SELECT problem, case_key, answer FROM answers {where}",  # noqa: S608
+            params,
+        )
+        for problem_name, case_key, answer in answers:
+            output.setdefault(problem_name, {}).setdefault(case_key, {})[
+                ANSWER
+            ] = answer
+        timings = self.connection.execute(
+            f"SELECT problem, case_key, language, nanoseconds FROM timings {where}",  # noqa: S608
+            params,
+        )
+        for problem_name, case_key, language, nanoseconds in timings:
+            output.setdefault(problem_name, {}).setdefault(case_key, {})[
+                language
+            ] = nanoseconds
+        extras = self.connection.execute(
+            f"SELECT problem, case_key, key, value FROM extras {where}",  # noqa: S608
+            params,
+        )
+        for problem_name, case_key, key, value in extras:
+            output.setdefault(problem_name, {}).setdefault(case_key, {})[key] = (
+                json.loads(value)
+            )
+        return {
+            problem_name: dict(sorted(data.items()))
+            for problem_name, data in sorted(output.items())
+        }
+
+    def save(self, problems: dict[str, ProblemData]) -> None:
+        rows: dict[str, list[tuple[str, ...] | tuple[str, str, str, int]]] = {
+            table: [] for table in self.TABLES
+        }
+        for problem_name, data in problems.items():
+            for case_key, case_info in data.items():
+                for key, value in case_info.items():
+                    if key == ANSWER and isinstance(value, str):
+                        rows["answers"].append((problem_name, case_key, value))
+                    elif isinstance(value, int) and not isinstance(value, bool):
+                        rows["timings"].append((problem_name, case_key, key, value))
+                    else:
+                        rows["extras"].append(
+                            (problem_name, case_key, key, json.dumps(value))
+                        )
+        with self.connection as connection:
+            for table, table_rows in rows.items():
+                connection.executemany(
+                    f"DELETE FROM {table} WHERE problem = ?",  # noqa: S608
+                    [(problem_name,) for problem_name in problems],
+                )
+                placeholders = ", ".join("?" * (3 if table == "answers" else 4))
+                connection.executemany(
+                    f"INSERT INTO {table} VALUES ({placeholders})",  # noqa: S608
+                    table_rows,
+                )
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Generic, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+    from pathlib import Path
+
+T = TypeVar("T")
+Stamp = tuple[int, int] | None
+
+
+@dataclass(slots=True)
+class CacheInfo:
+    hits: int = 0
+    misses: int = 0
+
+    def __str__(self) -> str:
+        return f"hits={self.hits}, misses={self.misses}"
+
+
+@dataclass(slots=True)
+class FileCache(Generic[T]):
+    """Cache the parsed contents of files, until any of them changes on disk."""
+
+    info: CacheInfo = field(default_factory=CacheInfo)
+    _entries: dict[tuple[Path, ...], tuple[tuple[Stamp, ...], T]] = field(
+        default_factory=dict, repr=False
+    )
+
+    def get(self, paths: Iterable[Path], loader: Callable[[], T]) -> T:
+        key = tuple(paths)
+        stamps = tuple(_get_stamp(path) for path in key)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == stamps:
+            self.info.hits += 1
+            return entry[1]
+
+        self.info.misses += 1
+        value = loader()
+        self._entries[key] = (stamps, value)
+        return value
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.info = CacheInfo()
+
+
+def _get_stamp(path: Path) -> Stamp:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
@@ -1,15 +1,41 @@
+import os
 import sys
 from argparse import ArgumentParser, Namespace
+from pathlib import Path
 
 from eulertools.__version__ import __version__
-from eulertools.lib.constants import UpdateMode
-from eulertools.lib.utils import filter_languages, filter_problems
+from eulertools.lib.constants import CompareOrder, Metric, OutputFormat, UpdateMode
+from eulertools.lib.utils import (
+    IsolationPolicy,
+    SamplingPolicy,
+    filter_languages,
+    filter_problems,
+    get_changed_pairs,
+    get_shard_pairs,
+    parse_cpus,
+    parse_duration,
+    parse_niceness,
+    parse_percentage,
+    parse_positive_int,
+    parse_shard,
+)
 
 sys.tracebacklimit = 0
 
 
 def runner_specific(parser: ArgumentParser, default_times: int) -> None:
     parser.add_argument("-t", "--times", type=int, default=default_times)
+    parser.add_argument(
+        "-j", "--jobs", type=parse_positive_int, default=os.cpu_count() or 1
+    )
+
+
+def can_be_cached(parser: ArgumentParser) -> None:
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="run the solutions, even if they have not changed since their last success",
+    )
 
 
 def language_specific(parser: ArgumentParser) -> None:
@@ -20,6 +46,52 @@ def problem_specific(parser: ArgumentParser) -> None:
     parser.add_argument("-p", "--problem", nargs="*", dest="problems", default=[])
 
 
+def can_fail_fast(parser: ArgumentParser) -> None:
+    parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="stop at the first solution that fails",
+    )
+    parser.add_argument(
+        "--prioritise",
+        action="store_true",
+        help="run the solutions that failed last time first, and then the rest by duration",
+    )
+
+
+def can_select_changed(parser: ArgumentParser) -> None:
+    parser.add_argument(
+        "--changed-since",
+        metavar="REF",
+        help="only run the solutions affected by the files changed since the git REF",
+    )
+
+
+def can_be_sharded(parser: ArgumentParser) -> None:
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        metavar="I/N",
+        help="only run the I-th of N deterministic parts of the solutions",
+    )
+    parser.add_argument(
+        "--balance-shards",
+        action="store_true",
+        help="balance the shards by the stored durations",
+    )
+
+
+def can_be_formatted(parser: ArgumentParser) -> None:
+    parser.add_argument(
+        "--format",
+        type=OutputFormat,
+        choices=list(OutputFormat),
+        default=OutputFormat.TABLE,
+        dest="output_format",
+        help="print for humans (table), or a record per case (jsonl or csv)",
+    )
+
+
 def can_be_updated(parser: ArgumentParser) -> None:
     group = parser.add_mutually_exclusive_group()
     group.add_argument("-a", "--append", action="store_true")
@@ -60,27 +132,152 @@ def parse_args() -> Namespace:
     subparsers = parser.add_subparsers(dest="subcommand", required=True)
 
     generate_parser = subparsers.add_parser("generate", parents=[parent_parser])
+    generate_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="only report the solutions that would be created",
+    )
     language_specific(generate_parser)
     problem_specific(generate_parser)
 
     run_parser = subparsers.add_parser("run", parents=[parent_parser])
     runner_specific(run_parser, default_times=1)
+    can_be_cached(run_parser)
+    can_fail_fast(run_parser)
+    can_be_formatted(run_parser)
     can_be_updated(run_parser)
+    can_select_changed(run_parser)
+    can_be_sharded(run_parser)
     language_specific(run_parser)
     problem_specific(run_parser)
 
     time_parser = subparsers.add_parser("time", parents=[parent_parser])
     runner_specific(time_parser, default_times=10)
+    time_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=5.0,
+        metavar="PCT",
+        help="the minimum change (in percent) that is reported as significant",
+    )
+    time_parser.add_argument(
+        "--fail-on-regression",
+        type=float,
+        metavar="PCT",
+        help="exit with status 82 on a significant slowdown of at least PCT percent",
+    )
+    time_parser.add_argument(
+        "--target-rse",
+        type=parse_percentage,
+        metavar="PCT",
+        help="keep sampling until the relative standard error drops below PCT",
+    )
+    time_parser.add_argument(
+        "--max-time",
+        type=parse_duration,
+        default=parse_duration("30s"),
+        metavar="DURATION",
+        help="the time budget for each problem, when sampling with --target-rse",
+    )
+    time_parser.add_argument(
+        "--cpus",
+        type=parse_cpus,
+        metavar="LIST",
+        help="pin the runners to these CPUs (e.g. 2-5,7), a disjoint set for each job",
+    )
+    time_parser.add_argument(
+        "--nice",
+        type=parse_niceness,
+        default=0,
+        metavar="N",
+        help="add N to the niceness of the runners",
+    )
+    time_parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="skip the solutions that an interrupted update already timed",
+    )
+    can_be_formatted(time_parser)
     can_be_updated(time_parser)
+    can_select_changed(time_parser)
+    can_be_sharded(time_parser)
     language_specific(time_parser)
     problem_specific(time_parser)
 
     compare_parser = subparsers.add_parser("compare", parents=[parent_parser])
+    compare_parser.add_argument(
+        "-m",
+        "--metric",
+        type=Metric,
+        choices=list(Metric),
+        default=Metric.WALL,
+        help="compare the timings (wall), the CPU time (cpu), or the peak memory (rss)",
+    )
+    compare_parser.add_argument(
+        "-b",
+        "--baseline",
+        metavar="LANGUAGE",
+        help="the language that the others are compared against (defaults to the first one)",
+    )
+    compare_parser.add_argument(
+        "--sort",
+        type=CompareOrder,
+        choices=list(CompareOrder),
+        default=CompareOrder.PROBLEM,
+        dest="order",
+        help="sort the cases by problem, by their slowest value, or by their slowdown",
+    )
+    compare_parser.add_argument(
+        "--top",
+        type=parse_positive_int,
+        metavar="N",
+        help="only show the first N cases",
+    )
+    can_be_formatted(compare_parser)
     language_specific(compare_parser)
     problem_specific(compare_parser)
 
+    merge_parser = subparsers.add_parser("merge", parents=[parent_parser])
+    merge_parser.add_argument(
+        "files",
+        nargs="*",
+        type=Path,
+        metavar="FILE",
+        help="the shard files to merge (defaults to the ones in .euler/shards)",
+    )
+
+    trend_parser = subparsers.add_parser("trend", parents=[parent_parser])
+    trend_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=5.0,
+        metavar="PCT",
+        help="the minimum change (in percent) that is reported as a change point",
+    )
+    trend_parser.add_argument(
+        "--last",
+        type=parse_positive_int,
+        metavar="N",
+        help="only use the latest N runs of each case",
+    )
+    trend_parser.add_argument(
+        "--format",
+        type=OutputFormat,
+        choices=[OutputFormat.TABLE, OutputFormat.CSV],
+        default=OutputFormat.TABLE,
+        dest="output_format",
+        help="print a sparkline per case (table), or every run (csv)",
+    )
+    language_specific(trend_parser)
+    problem_specific(trend_parser)
+
     test_parser = subparsers.add_parser("test", parents=[parent_parser])
     runner_specific(test_parser, default_times=2)
+    can_be_cached(test_parser)
+    can_fail_fast(test_parser)
+    can_be_formatted(test_parser)
+    can_select_changed(test_parser)
+    can_be_sharded(test_parser)
     language_specific(test_parser)
     problem_specific(test_parser)
 
@@ -101,6 +298,34 @@ def parse_args() -> Namespace:
     elif hasattr(args, "problems"):  # pragma: no branch
         parsed_problems = set(args.problems)
         args.problems = filter_problems(parsed_problems, set())
+    if getattr(args, "baseline", None) is not None:
+        [args.baseline] = filter_languages({args.baseline})
+        if args.baseline not in args.languages:
+            args.languages = sorted([*args.languages, args.baseline])
+    if getattr(args, "changed_since", None) is not None:
+        args.selection = get_changed_pairs(
+            args.changed_since, args.languages, args.problems
+        )
+    else:
+        args.selection = None
+    if getattr(args, "shard", None) is not None:
+        args.selection = get_shard_pairs(
+            args.shard,
+            args.languages,
+            args.problems,
+            args.selection,
+            balanced=args.balance_shards,
+        )
+    if getattr(args, "target_rse", None) is not None:
+        args.sampling = SamplingPolicy(
+            target_rse=args.target_rse, max_time=args.max_time
+        )
+    else:
+        args.sampling = None
+    if getattr(args, "cpus", None) or getattr(args, "nice", 0):
+        args.isolation = IsolationPolicy(cpus=args.cpus or (), nice=args.nice)
+    else:
+        args.isolation = None
     if extra and extra[0] == "--":
         extra = extra[1:]
     args.extra = extra
@@ -1,13 +1,33 @@
 import re
+import sys
 from enum import StrEnum, auto, unique
 
 ANSWER = "answer"
+AGGREGATION = "$aggregation"
+AFFINITY = "$affinity"
+RUN = "$run"
+RESOURCES = "$resources"
 PROBLEM = "problem"
 CASE_KEY = "case_key"
 MISSING = "N/A"
+ALL_CASES = "*"
 NULL_STRING = "(null)"
 SUPPORTED_SUFFIXES = [".yaml", ".yml", ".toml", ".json"]
+SIZE_UNITS = ["B", "KiB", "MiB", "GiB", "TiB"]
+SPARKS = "▁▂▃▄▅▆▇█"
+SIZE_UNIT = re.compile(r"(\d+(?:\.\d+)?)\s?([KMGT]?i?B?)")
+RSS_UNIT = 1 if sys.platform == "darwin" else 1024
 TIME_UNIT = re.compile(r"(\d+(?:\.\d+)?)\s?(.{0,2})")
+TIME_UNITS = {
+    "ns": 1,
+    "us": 1_000,
+    "µs": 1_000,
+    "ms": 1_000_000,
+    "": 1_000_000_000,
+    "s": 1_000_000_000,
+    "m": 60_000_000_000,
+    "h": 3_600_000_000_000,
+}
 
 
 @unique
@@ -24,10 +44,54 @@ class UpdateMode(StrEnum):
     UPDATE = auto()
 
 
+@unique
+class ResultsBackendType(StrEnum):
+    YAML = auto()
+    SQLITE = auto()
+
+
+@unique
+class Aggregation(StrEnum):
+    MEAN = auto()
+    MEDIAN = auto()
+    TRIMMED_MEAN = auto()
+    MIN = auto()
+    MAD_MEAN = auto()
+
+
+@unique
+class Metric(StrEnum):
+    WALL = auto()
+    CPU = auto()
+    RSS = auto()
+
+
+@unique
+class CompareOrder(StrEnum):
+    PROBLEM = auto()
+    SLOWEST = auto()
+    REGRESSED = auto()
+
+
+@unique
+class OutputFormat(StrEnum):
+    TABLE = auto()
+    JSONL = auto()
+    CSV = auto()
+
+
 @unique
 class ParseResult(StrEnum):
     SUCCESS = auto()
     FAILURE = auto()
+    TIMED_OUT = auto()
+    MEMORY_EXCEEDED = auto()
+
+
+LIMIT_MESSAGES = {
+    ParseResult.TIMED_OUT: "Timed out",
+    ParseResult.MEMORY_EXCEEDED: "Memory limit exceeded",
+}
 
 
 @unique
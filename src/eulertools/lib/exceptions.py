@@ -9,6 +9,14 @@ class DuplicateProblemError(RuntimeError):
         super().__init__(f"Duplicate problem id: {problem_id}")
 
 
+class GitDiffError(RuntimeError):
+    __slots__ = ()
+
+    def __init__(self, ref: str, reason: str) -> None:
+        super().__init__(f"Couldn't find the files changed since `{ref}`")
+        self.__notes__ = [f"    * {reason}"]
+
+
 class InternalError(RuntimeError):
     __slots__ = ()
 
@@ -17,6 +25,13 @@ class InternalError(RuntimeError):
         self.__notes__ = [f"    * {info}" for info in debug_info]
 
 
+class InvalidAggregationError(ValueError):
+    __slots__ = ()
+
+    def __init__(self, aggregation: str) -> None:
+        super().__init__(f"{aggregation} is not a valid aggregation")
+
+
 class InvalidLanguageError(ValueError):
     __slots__ = ()
 
@@ -38,6 +53,13 @@ class InvalidProblemError(ValueError):
         return ", ".join(self.parsed_languages)
 
 
+class InvalidResultsBackendError(ValueError):
+    __slots__ = ()
+
+    def __init__(self, backend: str) -> None:
+        super().__init__(f"{backend} is not a valid results backend")
+
+
 class InvalidVersionError(ValueError):
     __slots__ = ()
 
@@ -45,6 +67,14 @@ class InvalidVersionError(ValueError):
         super().__init__(f"The project requires a eulertools >= v{min_version}")
 
 
+class MergeConflictError(ValueError):
+    __slots__ = ()
+
+    def __init__(self, conflicts: list[str]) -> None:
+        super().__init__("The shards have conflicting answers:")
+        self.__notes__ = [f"    * {conflict}" for conflict in conflicts]
+
+
 class MissingProjectRootError(FileNotFoundError):
     __slots__ = ()
 
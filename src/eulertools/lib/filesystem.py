@@ -0,0 +1,19 @@
+import secrets
+import shutil
+from pathlib import Path
+
+
+def atomic_write(path: Path, data: str | bytes) -> None:
+    """Write the data to the path, so that readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.{secrets.token_hex(4)}.tmp")
+    mode = "xb" if isinstance(data, bytes) else "x"
+    try:
+        with temp_path.open(mode) as file:
+            file.write(data)
+        if path.exists():
+            shutil.copymode(path, temp_path)
+        temp_path.replace(path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
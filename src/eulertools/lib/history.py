@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import struct
+import sys
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, BinaryIO
+
+from eulertools.lib.filesystem import atomic_write
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from pathlib import Path
+
+# timestamp, length of the commit, length of the case key, number of samples
+_HEADER = struct.Struct("<qHHI")
+_SAMPLE_SIZE = array("q").itemsize
+
+
+@dataclass(frozen=True, slots=True)
+class HistoryPolicy:
+    max_runs: int = 100
+    max_samples: int = 1000
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_runs > 0
+
+
+@dataclass(frozen=True, slots=True)
+class HistoryRecord:
+    """The raw samples, in nanoseconds, of a single case from a single run."""
+
+    case_key: str
+    timestamp: int
+    commit: str
+    samples: array[int]
+
+    def to_bytes(self) -> bytes:
+        commit = self.commit.encode()
+        case_key = self.case_key.encode()
+        samples = array("q", self.samples)
+        if sys.byteorder == "big":
+            samples.byteswap()
+        header = _HEADER.pack(self.timestamp, len(commit), len(case_key), len(samples))
+        return b"".join([header, commit, case_key, samples.tobytes()])
+
+    @classmethod
+    def from_file(cls, file: BinaryIO) -> HistoryRecord | None:
+        header = file.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            return None
+        timestamp, commit_length, case_key_length, count = _HEADER.unpack(header)
+        key_end = commit_length + case_key_length
+        body = file.read(key_end + count * _SAMPLE_SIZE)
+        if len(body) < key_end + count * _SAMPLE_SIZE:
+            # the last record is incomplete when a write was interrupted
+            return None
+        commit = body[:commit_length].decode()
+        case_key = body[commit_length:key_end].decode()
+        samples = array("q")
+        samples.frombytes(body[key_end:])
+        if sys.byteorder == "big":
+            samples.byteswap()
+        return cls(
+            case_key=case_key, timestamp=timestamp, commit=commit, samples=samples
+        )
+
+    def downsample(self, max_samples: int) -> HistoryRecord:
+        """Keep `max_samples` evenly spaced order statistics of the samples."""
+        if len(self.samples) <= max_samples:
+            return self
+        ordered = sorted(self.samples)
+        step = (len(ordered) - 1) / (max_samples - 1) if max_samples > 1 else 0
+        samples = array("q", (ordered[round(i * step)] for i in range(max_samples)))
+        return HistoryRecord(
+            case_key=self.case_key,
+            timestamp=self.timestamp,
+            commit=self.commit,
+            samples=samples,
+        )
+
+
+def read_history(path: Path) -> Iterator[HistoryRecord]:
+    try:
+        file = path.open("rb")
+    except FileNotFoundError:
+        return
+    with file:
+        while (record := HistoryRecord.from_file(file)) is not None:
+            yield record
+
+
+def append_history(
+    path: Path, records: Iterable[HistoryRecord], policy: HistoryPolicy
+) -> None:
+    """Append the records to the history file, enforcing the retention policy.
+
+    Only the latest `max_runs` records are kept for each case key, and no
+    record keeps more than `max_samples` samples. An incomplete record at the
+    end of the file is dropped.
+    """
+    new_records = [record.downsample(policy.max_samples) for record in records]
+    if not new_records or not policy.enabled:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    history = []
+    with path.open("a+b") as file:
+        file.seek(0)
+        end = 0
+        while (record := HistoryRecord.from_file(file)) is not None:
+            history.append(record)
+            end = file.tell()
+        file.truncate(end)
+        for record in new_records:
+            file.write(record.to_bytes())
+    history.extend(new_records)
+
+    runs = Counter(record.case_key for record in history)
+    if all(count <= policy.max_runs for count in runs.values()):
+        return
+    kept = []
+    for record in history:
+        if runs[record.case_key] > policy.max_runs:
+            runs[record.case_key] -= 1
+            continue
+        kept.append(record)
+    atomic_write(path, b"".join(record.to_bytes() for record in kept))
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import json
+import stat
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Self
+
+from eulertools.lib.filesystem import atomic_write
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from os import stat_result
+    from pathlib import Path
+
+INDEX_VERSION = 1
+
+
+@dataclass(frozen=True, slots=True)
+class IndexEntry:
+    name: str
+    id: str
+    path: str
+    mtime: int
+    size: int
+    languages: frozenset[str]
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Self:  # type: ignore[misc]
+        return cls(
+            name=data["name"],
+            id=data["id"],
+            path=data["path"],
+            mtime=data["mtime"],
+            size=data["size"],
+            languages=frozenset(data["languages"]),
+        )
+
+    def as_dict(self) -> dict[str, str | int | list[str]]:
+        return {
+            "name": self.name,
+            "id": self.id,
+            "path": self.path,
+            "mtime": self.mtime,
+            "size": self.size,
+            "languages": sorted(self.languages),
+        }
+
+    def is_fresh(self, file_stat: stat_result) -> bool:
+        return self.mtime == file_stat.st_mtime_ns and self.size == file_stat.st_size
+
+
+def _read_index(index_file: Path) -> dict[str, IndexEntry]:
+    try:
+        data = json.loads(index_file.read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+    if data.get("version") != INDEX_VERSION:
+        return {}
+    return {
+        entry.path: entry
+        for entry in map(IndexEntry.from_dict, data.get("problems", []))
+    }
+
+
+def _write_index(index_file: Path, entries: list[IndexEntry]) -> None:
+    data = {
+        "version": INDEX_VERSION,
+        "problems": [entry.as_dict() for entry in entries],
+    }
+    atomic_write(index_file, json.dumps(data, indent=2))
+
+
+def _parse_entry(  # type: ignore[misc]
+    file: Path,
+    statement_dir: Path,
+    file_stat: stat_result,
+    parse: Callable[[Path], dict[str, Any]],
+) -> IndexEntry:
+    relative_path = file.relative_to(statement_dir)
+    statement = parse(file)
+    return IndexEntry(
+        name=relative_path.with_suffix("").as_posix(),
+        id=statement["common"].get("id", file.with_suffix("").as_posix()),
+        path=relative_path.as_posix(),
+        mtime=file_stat.st_mtime_ns,
+        size=file_stat.st_size,
+        languages=frozenset(
+            language
+            for language, value in statement.items()
+            if language != "common" and value is not None
+        ),
+    )
+
+
+def load_index(  # type: ignore[misc]
+    index_file: Path, statement_dir: Path, parse: Callable[[Path], dict[str, Any]]
+) -> list[IndexEntry]:
+    """Get an entry for every statement, parsing only the ones that have changed.
+
+    The index is persisted in the `index_file`, every time it goes stale.
+    """
+    cached_entries = _read_index(index_file)
+    entries = []
+    is_stale = False
+    for file in sorted(statement_dir.rglob("*")):
+        file_stat = file.stat()
+        if not stat.S_ISREG(file_stat.st_mode):
+            continue
+        relative_path = file.relative_to(statement_dir).as_posix()
+        entry = cached_entries.pop(relative_path, None)
+        if entry is None or not entry.is_fresh(file_stat):
+            entry = _parse_entry(file, statement_dir, file_stat, parse)
+            is_stale = True
+        entries.append(entry)
+    if is_stale or cached_entries:
+        _write_index(index_file, entries)
+    return entries
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from typing import IO, TYPE_CHECKING, Any, Self
+
+from eulertools.lib.filesystem import atomic_write
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+
+@dataclass(frozen=True, slots=True)
+class JournalEntry:  # type: ignore[misc]
+    """The results of a (language, problem) pair, that are not stored yet."""
+
+    language: str
+    problem: str
+    data: dict[str, Any]  # type: ignore[misc]
+
+    def to_line(self) -> str:
+        entry = {"language": self.language, "problem": self.problem, "data": self.data}
+        return json.dumps(entry, sort_keys=True) + "\n"
+
+
+def read_journal(path: Path) -> Iterator[JournalEntry]:
+    try:
+        file = path.open()
+    except FileNotFoundError:
+        return
+    with file:
+        for line in file:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # the last line is incomplete, if the run was interrupted while writing it
+                return
+            yield JournalEntry(
+                language=entry["language"], problem=entry["problem"], data=entry["data"]
+            )
+
+
+class Journal:
+    """Append the results to a file as soon as they are ready.
+
+    When resuming, the entries that are already in the file are kept.
+    """
+
+    __slots__ = ("_file", "path", "resume")
+
+    def __init__(self, path: Path, *, resume: bool = False) -> None:
+        self.path = path
+        self.resume = resume
+        self._file: IO[str] | None = None
+
+    def __enter__(self) -> Self:
+        if self.resume:
+            entries = "".join(entry.to_line() for entry in read_journal(self.path))
+        else:
+            entries = ""
+        atomic_write(self.path, entries)
+        self._file = self.path.open("a")
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def append(self, entry: JournalEntry) -> None:
+        if self._file is None:
+            return
+        self._file.write(entry.to_line())
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def discard(self) -> None:
+        self.__exit__()
+        self.path.unlink(missing_ok=True)
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import math
+import os
+import signal
+import threading
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Self
+
+from eulertools.lib.constants import ParseResult
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from pyutilkit.timing import Timing
+
+# the messages that the common runtimes print when an allocation fails
+MEMORY_ERRORS = (
+    "MemoryError",
+    "bad_alloc",
+    "out of memory",
+    "Cannot allocate memory",
+    "memory allocation",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Limits:
+    """The resources that a runner may use, before it is stopped."""
+
+    timeout: Timing | None = None
+    cpu_time: Timing | None = None
+    memory: int | None = None
+
+    def apply(self, pid: int) -> None:
+        """Limit the CPU time and the memory of a running process.
+
+        This is a no-op where the limits cannot be applied to another process,
+        i.e. on Windows, that has no `resource` module, and on macOS, that has
+        no `prlimit`.
+        """
+        if resource is None or not hasattr(resource, "prlimit"):
+            return
+        if self.cpu_time is not None:
+            seconds = math.ceil(self.cpu_time.nanoseconds / 1_000_000_000)
+            resource.prlimit(pid, resource.RLIMIT_CPU, (seconds, seconds + 1))
+        if self.memory is not None:
+            resource.prlimit(pid, resource.RLIMIT_AS, (self.memory, self.memory))
+
+    def get_failure(
+        self, return_code: int, error_output: str, *, timed_out: bool
+    ) -> ParseResult:
+        """Get the reason that a runner exited with a non-zero code."""
+        if timed_out:
+            return ParseResult.TIMED_OUT
+        # the CPU limit is only applied, and signalled, where `resource` exists
+        if (
+            resource is not None
+            and self.cpu_time is not None
+            and return_code in {-signal.SIGXCPU, -signal.SIGKILL}
+        ):
+            return ParseResult.TIMED_OUT
+        if (
+            self.memory is not None
+            and return_code != 0
+            and any(message in error_output for message in MEMORY_ERRORS)
+        ):
+            return ParseResult.MEMORY_EXCEEDED
+        return ParseResult.FAILURE
+
+
+def get_min_niceness() -> int:
+    """Get the lowest niceness that this process may give to its runners.
+
+    Only a privileged process may lower its niceness, or a process with a
+    soft `RLIMIT_NICE` of `r` down to `20 - r`.
+    """
+    niceness = os.getpriority(os.PRIO_PROCESS, 0)
+    if os.geteuid() == 0:
+        return -20
+    if resource is None or not hasattr(resource, "RLIMIT_NICE"):
+        return niceness
+    soft_limit, _ = resource.getrlimit(resource.RLIMIT_NICE)
+    if soft_limit == resource.RLIM_INFINITY:
+        return -20
+    return min(niceness, max(20 - soft_limit, -20))
+
+
+class Watchdog:
+    """Call `kill`, unless it is stopped before the timeout expires."""
+
+    __slots__ = ("_expired", "_kill", "_timer")
+
+    def __init__(self, timeout: Timing | None, kill: Callable[[], None]) -> None:
+        self._expired = threading.Event()
+        self._kill = kill
+        self._timer = self._get_timer(timeout)
+
+    def _get_timer(self, timeout: Timing | None) -> threading.Timer | None:
+        if timeout is None:
+            return None
+        timer = threading.Timer(timeout.nanoseconds / 1_000_000_000, self._expire)
+        timer.daemon = True
+        return timer
+
+    def _expire(self) -> None:
+        self._expired.set()
+        self._kill()
+
+    @property
+    def expired(self) -> bool:
+        return self._expired.is_set()
+
+    def rearm(self, timeout: Timing | None) -> None:
+        """Restart the countdown with a new timeout, or stop it without a timeout."""
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = self._get_timer(timeout)
+        if self._timer is not None:
+            self._timer.start()
+
+    def __enter__(self) -> Self:
+        if self._timer is not None:
+            self._timer.start()
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
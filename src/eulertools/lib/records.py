@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import csv
+import json
+import sys
+from dataclasses import asdict, dataclass, field, fields
+from typing import TYPE_CHECKING, TextIO
+
+from eulertools.lib.constants import ALL_CASES, OutputFormat
+
+if TYPE_CHECKING:
+    from pyutilkit.timing import Timing
+
+    from eulertools.lib.utils import CaseSummary, Language, ProblemSummary
+
+
+@dataclass(frozen=True, slots=True)
+class Record:
+    """The outcome of a single case for a single language, in nanoseconds."""
+
+    problem: str
+    case_key: str
+    language: str
+    result: str | None = None
+    answer: str | None = None
+    samples: list[int] = field(default_factory=list)
+    aggregate: int | None = None
+    delta: float | None = None
+
+
+RECORD_FIELDS = [record_field.name for record_field in fields(Record)]
+
+
+class RecordWriter:
+    """Write each record as soon as it is ready, without keeping it."""
+
+    __slots__ = ("_csv", "output_format", "stream")
+
+    def __init__(
+        self, output_format: OutputFormat, stream: TextIO | None = None
+    ) -> None:
+        self.output_format = output_format
+        self.stream = sys.stdout if stream is None else stream
+        self._csv = None
+        if output_format == OutputFormat.CSV:
+            self._csv = csv.writer(self.stream, lineterminator="\n")
+            self._csv.writerow(RECORD_FIELDS)
+
+    def write(self, record: Record) -> None:
+        row = asdict(record)
+        if self._csv is not None:
+            row["samples"] = " ".join(map(str, record.samples))
+            self._csv.writerow(row[name] for name in RECORD_FIELDS)
+        else:
+            self.stream.write(json.dumps(row) + "\n")
+        self.stream.flush()
+
+
+def get_record_writer(output_format: OutputFormat) -> RecordWriter | None:
+    if output_format == OutputFormat.TABLE:
+        return None
+    return RecordWriter(output_format)
+
+
+def get_failure_record(language: Language, problem_summary: ProblemSummary) -> Record:
+    return Record(
+        problem=problem_summary.problem.name,
+        case_key=ALL_CASES,
+        language=language.name,
+        result=problem_summary.result[language],
+    )
+
+
+def get_case_record(
+    language: Language,
+    case_summary: CaseSummary,
+    aggregate: Timing | None = None,
+    delta: float | None = None,
+) -> Record:
+    new_answers = case_summary.new_answers.get(language)
+    return Record(
+        problem=case_summary.case_id.problem.name,
+        case_key=case_summary.case_id.case_key,
+        language=language.name,
+        result=case_summary.result.get(language),
+        answer=min(new_answers) if new_answers else case_summary.answer,
+        samples=[
+            timing.nanoseconds for timing in case_summary.new_timings.get(language, [])
+        ],
+        aggregate=None if aggregate is None else aggregate.nanoseconds,
+        delta=delta,
+    )
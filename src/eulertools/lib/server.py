@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import subprocess
+import threading
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+END_OF_RESPONSE = "Done"
+SHUTDOWN_TIMEOUT = 5
+
+
+class RunnerServer:
+    """A long-lived runner, that accepts requests on stdin.
+
+    Every request is a `<problem> <times>` line, and the runner responds with the
+    usual `Time`/`Answer` lines, followed by a `Done` line.
+    """
+
+    __slots__ = ("command", "process", "setup", "show_errors")
+
+    def __init__(
+        self,
+        command: list[str],
+        *,
+        show_errors: bool = False,
+        setup: Callable[[int], None] | None = None,
+    ) -> None:
+        self.command = command
+        self.show_errors = show_errors
+        self.setup = setup
+        self.process: subprocess.Popen[str] | None = None
+
+    def _start(self) -> subprocess.Popen[str]:
+        if self.process is None or self.process.poll() is not None:
+            self.process = subprocess.Popen(  # noqa: S603
+                self.command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=None if self.show_errors else subprocess.DEVNULL,
+                text=True,
+                bufsize=1,
+            )
+            if self.setup is not None:
+                self.setup(self.process.pid)
+        return self.process
+
+    def request(self, problem: str, times: str) -> Iterator[str]:
+        """Yield the lines of the response, without the final `Done`.
+
+        If the runner exits before finishing the response, it raises an
+        `EOFError`, and the runner is restarted on the next request.
+        """
+        process = self._start()
+        if process.stdin is None or process.stdout is None:
+            raise EOFError(self.command)
+        try:
+            process.stdin.write(f"{problem} {times}\n")
+            process.stdin.flush()
+        except BrokenPipeError:
+            self.close()
+            raise EOFError(self.command) from None
+        for line in process.stdout:
+            stripped_line = line.rstrip("\n")
+            if stripped_line == END_OF_RESPONSE:
+                return
+            yield stripped_line
+        self.close()
+        raise EOFError(self.command)
+
+    def kill(self) -> None:
+        if self.process is not None:
+            self.process.kill()
+
+    def close(self) -> None:
+        process, self.process = self.process, None
+        if process is None:
+            return
+        try:
+            if process.stdin is not None:
+                process.stdin.close()
+            process.wait(timeout=SHUTDOWN_TIMEOUT)
+        except (BrokenPipeError, subprocess.TimeoutExpired):
+            process.kill()
+            process.wait()
+        if process.stdout is not None:
+            process.stdout.close()
+
+
+class ServerPool:
+    """Keep a runner server per thread and language, so that requests never mix."""
+
+    __slots__ = ("_lock", "_servers")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._servers: dict[tuple[int, str], RunnerServer] = {}
+
+    def get(
+        self,
+        name: str,
+        command: list[str],
+        *,
+        show_errors: bool = False,
+        setup: Callable[[int], None] | None = None,
+    ) -> RunnerServer:
+        key = (threading.get_ident(), name)
+        with self._lock:
+            server = self._servers.get(key)
+            if server is None:
+                server = RunnerServer(command, show_errors=show_errors, setup=setup)
+                self._servers[key] = server
+        return server
+
+    def close(self) -> None:
+        with self._lock:
+            servers = list(self._servers.values())
+            self._servers.clear()
+        for server in servers:
+            server.close()
@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import math
+import random
+from dataclasses import dataclass
+from statistics import NormalDist, fmean, median, stdev
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+CONFIDENCE = 0.95
+RESAMPLES = 1000
+# the largest number of samples, for which the exact distribution of U is used
+EXACT_SAMPLES = 20
+# the smallest segment of a series that can be significantly different from the rest
+MIN_SEGMENT = 3
+PERCENTILES = (50, 90, 99)
+
+
+@dataclass(frozen=True, slots=True)
+class Comparison:
+    """The relative change of the median between two sets of samples.
+
+    A positive change means that the new samples are slower.
+    """
+
+    change: float
+    low: float
+    high: float
+    p_value: float
+    confidence: float = CONFIDENCE
+
+    def is_significant(self, threshold: float) -> bool:
+        if self.p_value >= 1 - self.confidence:
+            return False
+        if self.low <= 0 <= self.high:
+            return False
+        return abs(self.change) >= threshold
+
+    def __str__(self) -> str:
+        return (
+            f"{self.change:+.2%}, {self.confidence:.0%} CI "
+            f"[{self.low:+.2%}, {self.high:+.2%}], p={self.p_value:.3f}"
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class ColumnSummary:
+    """The aggregates of the values of a language, against a baseline language.
+
+    The speed-up is the geometric mean of the ratios of the baseline to the values,
+    so that a speed-up greater than 1 means that the language is faster.
+    """
+
+    count: int
+    geometric_mean: float
+    percentiles: tuple[float, ...]
+    speed_up: float
+    wins: int
+    losses: int
+
+
+def relative_standard_error(samples: Sequence[float]) -> float:
+    """Get the standard error of the mean, relative to the mean."""
+    if len(samples) < 2:  # noqa: PLR2004
+        return math.inf
+    mean = fmean(samples)
+    if mean == 0:
+        return math.inf
+    return stdev(samples, mean) / math.sqrt(len(samples)) / mean
+
+
+def trimmed_mean(samples: Sequence[float], proportion: float) -> float:
+    """Get the mean, after discarding a proportion of the samples from each end."""
+    values = sorted(samples)
+    cut = math.floor(len(values) * proportion)
+    if 2 * cut >= len(values):
+        return median(values)
+    return fmean(values[cut : len(values) - cut])
+
+
+def mad_mean(samples: Sequence[float], threshold: float) -> float:
+    """Get the mean of the samples within `threshold` MADs from the median."""
+    center = median(samples)
+    deviation = median(abs(sample - center) for sample in samples)
+    if deviation == 0:
+        return fmean(sample for sample in samples if sample == center)
+    return fmean(
+        sample for sample in samples if abs(sample - center) <= threshold * deviation
+    )
+
+
+def _ranks(values: Sequence[float]) -> tuple[list[float], float]:
+    order = sorted(range(len(values)), key=values.__getitem__)
+    ranks = [0.0] * len(values)
+    ties = 0.0
+    start = 0
+    while start < len(order):
+        end = start
+        while end + 1 < len(order) and values[order[end + 1]] == values[order[start]]:
+            end += 1
+        rank = (start + end) / 2 + 1
+        for index in order[start : end + 1]:
+            ranks[index] = rank
+        count = end - start + 1
+        ties += count**3 - count
+        start = end + 1
+    return ranks, ties
+
+
+def _u_distribution(n_first: int, n_second: int) -> list[int]:
+    """Count the orderings of the samples that give each value of U, without ties."""
+    previous = [[1] for _ in range(n_second + 1)]
+    for i in range(1, n_first + 1):
+        current = [[1]]
+        for j in range(1, n_second + 1):
+            counts = [0] * (i * j + 1)
+            # the largest sample is either from the second set, or from the first one,
+            # when it is larger than all the samples of the second set
+            for u, count in enumerate(current[j - 1]):
+                counts[u] += count
+            for u, count in enumerate(previous[j]):
+                counts[u + j] += count
+            current.append(counts)
+        previous = current
+    return previous[n_second]
+
+
+def mann_whitney_u(first: Sequence[float], second: Sequence[float]) -> float:
+    """Get the two-sided p-value of the Mann-Whitney U test.
+
+    The exact distribution of U is used for few samples without ties, and the normal
+    approximation otherwise.
+    """
+    n_first, n_second = len(first), len(second)
+    if n_first == 0 or n_second == 0:
+        return 1.0
+    n = n_first + n_second
+    ranks, ties = _ranks([*first, *second])
+    u_statistic = sum(ranks[:n_first]) - n_first * (n_first + 1) / 2
+    if n <= EXACT_SAMPLES and ties == 0:
+        counts = _u_distribution(n_first, n_second)
+        u_value = round(u_statistic)
+        tail = min(sum(counts[: u_value + 1]), sum(counts[u_value:]))
+        return min(1.0, 2 * tail / math.comb(n, n_first))
+    mean = n_first * n_second / 2
+    variance = n_first * n_second / 12 * ((n + 1) - ties / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z_score = max(abs(u_statistic - mean) - 0.5, 0) / math.sqrt(variance)
+    return min(1.0, 2 * (1 - NormalDist().cdf(z_score)))
+
+
+def bootstrap_median_change(
+    first: Sequence[float],
+    second: Sequence[float],
+    confidence: float = CONFIDENCE,
+    resamples: int = RESAMPLES,
+) -> tuple[float, float]:
+    """Get a bootstrap confidence interval for the relative change of the median."""
+    generator = random.Random(len(first) * 31 + len(second))  # noqa: S311
+    changes = sorted(
+        median(generator.choices(second, k=len(second)))
+        / median(generator.choices(first, k=len(first)))
+        - 1
+        for _ in range(resamples)
+    )
+    tail = (1 - confidence) / 2
+    low = changes[math.floor(tail * (resamples - 1))]
+    high = changes[math.ceil((1 - tail) * (resamples - 1))]
+    return low, high
+
+
+def compare_samples(first: Sequence[float], second: Sequence[float]) -> Comparison:
+    low, high = bootstrap_median_change(first, second)
+    return Comparison(
+        change=median(second) / median(first) - 1,
+        low=low,
+        high=high,
+        p_value=mann_whitney_u(first, second),
+    )
+
+
+def geometric_mean(values: Iterable[float]) -> float:
+    """Get the geometric mean of the positive values, or NaN if there are none."""
+    logs = [math.log(value) for value in values if value > 0]
+    if not logs:
+        return math.nan
+    return math.exp(math.fsum(logs) / len(logs))
+
+
+def percentile(values: Sequence[float], rank: float) -> float:
+    """Get a percentile of sorted values, interpolating between the closest two."""
+    if not values:
+        return math.nan
+    position = rank / 100 * (len(values) - 1)
+    low = values[math.floor(position)]
+    high = values[math.ceil(position)]
+    return low + (high - low) * (position - math.floor(position))
+
+
+def summarise_column(
+    column: Sequence[float], baseline: Sequence[float]
+) -> ColumnSummary | None:
+    """Summarise a column of values, where NaN marks a missing value."""
+    values = sorted(value for value in column if not math.isnan(value))
+    if not values:
+        return None
+    pairs = [
+        (value, reference)
+        for value, reference in zip(column, baseline, strict=True)
+        if not math.isnan(value) and not math.isnan(reference)
+    ]
+    return ColumnSummary(
+        count=len(values),
+        geometric_mean=geometric_mean(values),
+        percentiles=tuple(percentile(values, rank) for rank in PERCENTILES),
+        speed_up=geometric_mean(
+            reference / value for value, reference in pairs if value > 0
+        ),
+        wins=sum(value < reference for value, reference in pairs),
+        losses=sum(value > reference for value, reference in pairs),
+    )
+
+
+def _best_split(logs: Sequence[float], start: int, end: int, min_size: int) -> int:
+    """Get the split that reduces the squared deviations of a segment the most."""
+    count = end - start
+    total = math.fsum(logs[start:end])
+    best, best_score = -1, 0.0
+    prefix = 0.0
+    for split in range(start + 1, end):
+        prefix += logs[split - 1]
+        left, right = split - start, end - split
+        if left < min_size or right < min_size:
+            continue
+        score = left * right / count * (prefix / left - (total - prefix) / right) ** 2
+        if score > best_score:
+            best, best_score = split, score
+    return best
+
+
+def find_change_points(
+    values: Sequence[float], threshold: float, min_size: int = MIN_SEGMENT
+) -> list[int]:
+    """Find the indices where the level of a series shifts, by binary segmentation.
+
+    A segment is split where the squared deviations of the logarithms drop the most,
+    as long as the medians of the two parts differ by at least `threshold`, and the
+    difference is significant according to the Mann-Whitney U test. With the exact
+    test, a split needs 3 runs on one side and 5 on the other, or 4 on each side.
+    """
+    logs = [math.log(max(value, 1)) for value in values]
+    change_points = []
+    segments = [(0, len(values))]
+    while segments:
+        start, end = segments.pop()
+        split = _best_split(logs, start, end, min_size)
+        if split < 0:
+            continue
+        before = median(values[start:split])
+        after = median(values[split:end])
+        if before <= 0 or abs(after / before - 1) < threshold:
+            continue
+        if mann_whitney_u(values[start:split], values[split:end]) >= 1 - CONFIDENCE:
+            continue
+        change_points.append(split)
+        segments.extend([(start, split), (split, end)])
+    return sorted(change_points)
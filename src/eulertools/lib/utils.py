@@ -1,39 +1,83 @@
 from __future__ import annotations
 
 import csv
+import hashlib
+import json
+import math
+import os
 import re
+import subprocess
+import time
+from array import array
 from dataclasses import dataclass, field
+from functools import cache
+from itertools import product
 from pathlib import Path
+from statistics import median
 from typing import TYPE_CHECKING, Any, Self
 
-import yaml
 from dj_settings import ConfigParser
 from pyutilkit.timing import Timing
 
 from eulertools.__version__ import __version__
+from eulertools.lib.backends import ResultsBackend, SQLiteBackend, YamlBackend
+from eulertools.lib.cache import CacheInfo, FileCache
 from eulertools.lib.constants import (
+    AFFINITY,
+    AGGREGATION,
     ANSWER,
     CASE_KEY,
     NULL_STRING,
     PROBLEM,
+    RESOURCES,
+    RSS_UNIT,
+    RUN,
+    SIZE_UNIT,
+    SIZE_UNITS,
+    SPARKS,
     SUPPORTED_SUFFIXES,
+    TIME_UNIT,
+    TIME_UNITS,
+    Aggregation,
     CaseResult,
     NamedArgType,
     ParseResult,
+    ResultsBackendType,
 )
 from eulertools.lib.exceptions import (
     DuplicateProblemError,
+    GitDiffError,
     InternalError,
+    InvalidAggregationError,
     InvalidLanguageError,
     InvalidProblemError,
+    InvalidResultsBackendError,
     InvalidVersionError,
+    MergeConflictError,
     MissingProjectRootError,
     MissingVersionError,
     ProblemNotFoundError,
 )
+from eulertools.lib.filesystem import atomic_write
+from eulertools.lib.history import (
+    HistoryPolicy,
+    HistoryRecord,
+    append_history,
+    read_history,
+)
+from eulertools.lib.index import load_index
+from eulertools.lib.journal import Journal, JournalEntry, read_journal
+from eulertools.lib.limits import Limits, get_min_niceness
+from eulertools.lib.stats import mad_mean, relative_standard_error, trimmed_mean
 
 if TYPE_CHECKING:
-    from collections.abc import Iterator
+    import resource
+    from collections.abc import Callable, Iterable, Iterator, Sequence
+
+    from pyutilkit.term import SGROutput
+
+_SETTINGS_CACHE: FileCache[dict[str, Any]] = FileCache()  # type: ignore[misc]
+_STATEMENTS_CACHE: FileCache[dict[str, Any]] = FileCache()  # type: ignore[misc]
 
 
 @dataclass(frozen=True, slots=True, order=True)
@@ -42,6 +86,8 @@ class Runner:
     args: tuple[str, ...]
     use_ids: bool = field(repr=False, compare=False)
     named_arg_type: NamedArgType = field(repr=False, compare=False)
+    server: bool = field(default=False, repr=False, compare=False)
+    batch: bool = field(default=False, repr=False, compare=False)
 
     @classmethod
     def from_settings(cls, name: str) -> Self:
@@ -62,13 +108,82 @@ class Runner:
             named_arg_type = NamedArgType[named_args.upper()]
         except KeyError:
             named_arg_type = NamedArgType.NONE
+        server = language.get("server", common.get("server", False))
+        batch = language.get("batch", common.get("batch", False))
         return cls(
             path=runner_path,
             args=runner_args,
             use_ids=use_ids,
             named_arg_type=named_arg_type,
+            server=server,
+            batch=batch,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class AggregationPolicy:
+    """How the raw timings of a run are reduced to a single timing."""
+
+    method: Aggregation = Aggregation.MEAN
+    warmup: int = 0
+    trim: float = 10.0
+    mad_threshold: float = 3.0
+
+    @classmethod
+    def from_settings(cls, name: str) -> Self:
+        settings = get_settings()
+        common = settings["languages"].get("$common", {})
+        language = settings["languages"][name]
+        default = cls()
+        method = language.get("aggregation", common.get("aggregation", default.method))
+        try:
+            aggregation = Aggregation(method.lower())
+        except ValueError:
+            raise InvalidAggregationError(method) from None
+        return cls(
+            method=aggregation,
+            warmup=language.get("warmup", common.get("warmup", default.warmup)),
+            trim=language.get("trim", common.get("trim", default.trim)),
+            mad_threshold=language.get(
+                "mad_threshold", common.get("mad_threshold", default.mad_threshold)
+            ),
         )
 
+    def __str__(self) -> str:
+        match self.method:
+            case Aggregation.TRIMMED_MEAN:
+                output = f"{self.method}={self.trim:g}%"
+            case Aggregation.MAD_MEAN:
+                output = f"{self.method}={self.mad_threshold:g}"
+            case _:
+                output = str(self.method)
+        if self.warmup:
+            output += f",warmup={self.warmup}"
+        return output
+
+    def discard_warmup(self, values: list[Timing]) -> list[Timing]:
+        return values[self.warmup :] or values
+
+    def aggregate(self, values: list[Timing]) -> Timing:
+        values = self.discard_warmup(values)
+        if not values:
+            return Timing()
+        samples = [value.nanoseconds for value in values]
+        match self.method:
+            case Aggregation.MEAN:
+                if len(values) >= 3:  # noqa: PLR2004
+                    values = sorted(values)[1:-1]
+                return sum(values, start=Timing()) // len(values)
+            case Aggregation.MEDIAN:
+                return Timing(nanoseconds=round(median(samples)))
+            case Aggregation.TRIMMED_MEAN:
+                nanoseconds = trimmed_mean(samples, self.trim / 100)
+            case Aggregation.MIN:
+                return min(values)
+            case Aggregation.MAD_MEAN:
+                nanoseconds = mad_mean(samples, self.mad_threshold)
+        return Timing(nanoseconds=round(nanoseconds))
+
 
 @dataclass(frozen=True, slots=True, order=True)
 class Language:
@@ -78,6 +193,9 @@ class Language:
     solutions_path: Path = field(repr=False, compare=False)
     settings_path: Path = field(repr=False, compare=False)
     runner: Runner = field(repr=False, compare=False)
+    aggregation: AggregationPolicy = field(
+        default_factory=AggregationPolicy, repr=False, compare=False
+    )
 
     @classmethod
     def from_settings(cls, name: str) -> Self:
@@ -96,6 +214,7 @@ class Language:
             suffix=suffix,
             path=path,
             runner=Runner.from_settings(name),
+            aggregation=AggregationPolicy.from_settings(name),
             solutions_path=path.joinpath(solutions),
             settings_path=settings_path,
         )
@@ -140,18 +259,36 @@ class Summary:
     problems: dict[Problem, ProblemSummary]
 
     def get_or_create_problem(self, problem: Problem) -> ProblemSummary:
-        problem_summary = self.problems.get(problem)
-        if problem_summary is None:
+        try:
+            return self.problems[problem]
+        except KeyError:
             problem_summary = ProblemSummary(problem=problem, cases={})
             self.problems[problem] = problem_summary
-        return problem_summary
+            return problem_summary
 
     def success(self, language: Language, problem: Problem) -> bool:
-        problem_summary = self.problems.get(problem)
-        if problem_summary is None:
+        try:
+            problem_summary = self.problems[problem]
+        except KeyError:
             return False
         return problem_summary.success(language)
 
+    def get_duration(self, language: Language, problem: Problem) -> Timing:
+        """Estimate the duration of a run, from the stored resources or timings."""
+        try:
+            problem_summary = self.problems[problem]
+        except KeyError:
+            return Timing()
+        if resources := problem_summary.resources.get(language):
+            return resources.wall_time
+        return sum(
+            filter(
+                None,
+                (case.timings.get(language) for case in problem_summary.cases.values()),
+            ),
+            Timing(),
+        )
+
 
 @dataclass(slots=True, order=True)
 class ProblemSummary:
@@ -159,6 +296,11 @@ class ProblemSummary:
     cases: dict[CaseId, CaseSummary]
     result: dict[Language, ParseResult] = field(default_factory=dict, repr=False)
     parse_info: dict[Language, str] = field(default_factory=dict, repr=False)
+    affinity: dict[Language, str] = field(default_factory=dict, repr=False)
+    cached: set[Language] = field(default_factory=set, repr=False)
+    resources: dict[Language, Resources] = field(default_factory=dict, repr=False)
+    new_resources: dict[Language, Resources] = field(default_factory=dict, repr=False)
+    resources_dirty: bool = field(default=False, repr=False, compare=False)
 
     def get_or_create_case(self, case_id: CaseId) -> CaseSummary:
         case_summary = self.cases.get(case_id)
@@ -167,29 +309,102 @@ class ProblemSummary:
             self.cases[case_id] = case_summary
         return case_summary
 
-    def as_dict(self) -> dict[str, dict[str, str | int]]:
-        return {
+    def discard_samples(self, language: Language) -> None:
+        """Free the raw samples of a language, once they are no longer needed."""
+        self.new_resources.pop(language, None)
+        for case in self.cases.values():
+            case.new_timings.pop(language, None)
+
+    def update_resources(self, language: Language, resources: Resources) -> None:
+        if self.resources.get(language) != resources:
+            self.resources[language] = resources
+            self.resources_dirty = True
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:  # type: ignore[misc]
+        output: dict[str, dict[str, Any]] = {  # type: ignore[misc]
             key: value
             for case in self.cases.values()
             for key, value in case.as_dict().items()
         }
+        if self.resources:
+            output[RESOURCES] = {
+                language.name: resources.as_dict()
+                for language, resources in sorted(self.resources.items())
+            }
+        return output
 
     def success(self, language: Language) -> bool:
-        if self.result.get(language) == ParseResult.FAILURE:
+        if self.result.get(language, ParseResult.SUCCESS) != ParseResult.SUCCESS:
             return False
         return all(case.success(language) for case in self.cases.values())
 
+    @property
+    def dirty(self) -> bool:
+        return self.resources_dirty or any(case.dirty for case in self.cases.values())
+
+    def mark_clean(self) -> None:
+        self.resources_dirty = False
+        for case in self.cases.values():
+            case.dirty = False
+
 
 @dataclass(slots=True, order=True)
 class CaseSummary:
     case_id: CaseId
     answer: str | None = None
     timings: dict[Language, Timing] = field(default_factory=dict)
+    aggregations: dict[Language, str] = field(default_factory=dict, repr=False)
+    affinities: dict[Language, str] = field(default_factory=dict, repr=False)
+    runs: dict[Language, str] = field(default_factory=dict, repr=False)
     result: dict[Language, CaseResult] = field(default_factory=dict, repr=False)
     new_timings: dict[Language, list[Timing]] = field(default_factory=dict, repr=False)
     new_answers: dict[Language, set[str]] = field(default_factory=dict, repr=False)
+    dirty: bool = field(default=False, repr=False, compare=False)
+
+    def update_answer(self, answer: str) -> None:
+        if self.answer != answer:
+            self.answer = answer
+            self.dirty = True
+
+    def update_timing(
+        self,
+        language: Language,
+        timing: Timing,
+        aggregation: str = Aggregation.MEAN,
+        affinity: str = "",
+        run: str = "",
+    ) -> None:
+        """Update the timing, and the run of the history that it is stored from."""
+        if self.timings.get(language) != timing:
+            self.timings[language] = timing
+            self.dirty = True
+        self._update_extra(self.aggregations, language, aggregation, Aggregation.MEAN)
+        self._update_extra(self.affinities, language, affinity, "")
+        self._update_extra(self.runs, language, run, "")
+
+    def _update_extra(
+        self, extra: dict[Language, str], language: Language, value: str, default: str
+    ) -> None:
+        if extra.get(language, default) == value:
+            return
+        if value == default:
+            del extra[language]
+        else:
+            extra[language] = value
+        self.dirty = True
 
-    def as_dict(self) -> dict[str, dict[str, str | int]]:
+    def get_aggregation(self, language: Language) -> str:
+        return self.aggregations.get(language, Aggregation.MEAN)
+
+    @property
+    def extras(self) -> dict[str, dict[Language, str]]:
+        return {
+            AGGREGATION: self.aggregations,
+            AFFINITY: self.affinities,
+            RUN: self.runs,
+        }
+
+    def as_dict(self) -> dict[str, dict[str, str | int | dict[str, str]]]:
         if self.answer is None:
             info = [f"Case {self.case_id.case_key} has no answer"]
             raise InternalError(info)
@@ -200,6 +415,14 @@ class CaseSummary:
                     language.name: timing.nanoseconds
                     for language, timing in self.timings.items()
                 },
+                **{
+                    key: {
+                        language.name: value
+                        for language, value in sorted(extra.items())
+                    }
+                    for key, extra in self.extras.items()
+                    if extra
+                },
             }
         }
 
@@ -211,6 +434,204 @@ class CaseSummary:
         }
 
 
+class ProblemSummaries(dict[Problem, ProblemSummary]):
+    """A mapping that loads the summary of each problem on first access."""
+
+    __slots__ = ("_loader",)
+
+    def __init__(self, loader: Callable[[Problem], ProblemSummary | None]) -> None:
+        super().__init__()
+        self._loader = loader
+
+    def __missing__(self, problem: Problem) -> ProblemSummary:
+        problem_summary = self._loader(problem)
+        if problem_summary is None:
+            raise KeyError(problem)
+        self[problem] = problem_summary
+        return problem_summary
+
+
+@dataclass(slots=True)
+class CaseOutput:
+    timings: list[Timing] = field(default_factory=list)
+    answers: set[str] = field(default_factory=set)
+
+
+@dataclass(frozen=True, slots=True)
+class Resources:
+    """The resources that the runner processes used, as reported by the OS."""
+
+    wall_time: Timing
+    user_time: Timing
+    system_time: Timing
+    max_rss: int
+    voluntary_switches: int
+    involuntary_switches: int
+
+    @classmethod
+    def from_rusage(cls, rusage: resource.struct_rusage, wall_time: Timing) -> Self:
+        return cls(
+            wall_time=wall_time,
+            user_time=Timing(nanoseconds=round(rusage.ru_utime * 1_000_000_000)),
+            system_time=Timing(nanoseconds=round(rusage.ru_stime * 1_000_000_000)),
+            max_rss=rusage.ru_maxrss * RSS_UNIT,
+            voluntary_switches=rusage.ru_nvcsw,
+            involuntary_switches=rusage.ru_nivcsw,
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict[str, int]) -> Self:
+        return cls(
+            wall_time=Timing(nanoseconds=data["wall_time"]),
+            user_time=Timing(nanoseconds=data["user_time"]),
+            system_time=Timing(nanoseconds=data["system_time"]),
+            max_rss=data["max_rss"],
+            voluntary_switches=data["voluntary_switches"],
+            involuntary_switches=data["involuntary_switches"],
+        )
+
+    @property
+    def cpu_time(self) -> Timing:
+        return self.user_time + self.system_time
+
+    def __add__(self, other: Resources) -> Resources:
+        return Resources(
+            wall_time=self.wall_time + other.wall_time,
+            user_time=self.user_time + other.user_time,
+            system_time=self.system_time + other.system_time,
+            max_rss=max(self.max_rss, other.max_rss),
+            voluntary_switches=self.voluntary_switches + other.voluntary_switches,
+            involuntary_switches=self.involuntary_switches + other.involuntary_switches,
+        )
+
+    def as_dict(self) -> dict[str, int]:
+        return {
+            "wall_time": self.wall_time.nanoseconds,
+            "user_time": self.user_time.nanoseconds,
+            "system_time": self.system_time.nanoseconds,
+            "max_rss": self.max_rss,
+            "voluntary_switches": self.voluntary_switches,
+            "involuntary_switches": self.involuntary_switches,
+        }
+
+
+@dataclass(slots=True)
+class RunOutput:
+    result: ParseResult = ParseResult.SUCCESS
+    parse_info: str = ""
+    cases: dict[str, CaseOutput] = field(default_factory=dict)
+    affinity: str = ""
+    resources: Resources | None = None
+    cache_key: str = ""
+    cached: bool = False
+    # the verbose output of the runner, that is printed with the results, in order
+    log: list[SGROutput] = field(default_factory=list, repr=False)
+
+    def get_or_create_case(self, case_key: str) -> CaseOutput:
+        case_output = self.cases.get(case_key)
+        if case_output is None:
+            case_output = CaseOutput()
+            self.cases[case_key] = case_output
+        return case_output
+
+    def extend(self, other: RunOutput) -> None:
+        if other.result != ParseResult.SUCCESS:
+            self.result = other.result
+            self.parse_info = other.parse_info
+        for case_key, case_output in other.cases.items():
+            own_case_output = self.get_or_create_case(case_key)
+            own_case_output.timings.extend(case_output.timings)
+            own_case_output.answers.update(case_output.answers)
+        self.log.extend(other.log)
+        if self.resources is None:
+            self.resources = other.resources
+        elif other.resources is not None:
+            self.resources += other.resources
+
+    @property
+    def relative_standard_error(self) -> float:
+        return max(
+            (
+                relative_standard_error(
+                    [timing.nanoseconds for timing in case_output.timings]
+                )
+                for case_output in self.cases.values()
+            ),
+            default=math.inf,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class SamplingPolicy:
+    """Keep sampling in batches, until the timings are stable or time runs out."""
+
+    target_rse: float
+    max_time: Timing
+
+
+@dataclass(frozen=True, slots=True)
+class IsolationPolicy:
+    """Pin the runners to dedicated CPUs, and adjust their niceness."""
+
+    cpus: tuple[int, ...] = ()
+    nice: int = 0
+
+    def partition(self, jobs: int) -> list[frozenset[int]]:
+        """Split the CPUs into disjoint sets, one for every concurrent runner."""
+        if not self.cpus:
+            return [frozenset()] * jobs
+        n = min(jobs, len(self.cpus))
+        size = len(self.cpus)
+        return [
+            frozenset(self.cpus[i * size // n : (i + 1) * size // n]) for i in range(n)
+        ]
+
+    def apply(self, pid: int, cpus: frozenset[int]) -> None:
+        # the CLI rejects both options where they are not supported
+        if cpus and hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(pid, cpus)
+        if self.nice and hasattr(os, "setpriority"):
+            niceness = os.getpriority(os.PRIO_PROCESS, pid) + self.nice
+            os.setpriority(os.PRIO_PROCESS, pid, niceness)
+
+
+@dataclass(frozen=True, slots=True)
+class Shard:
+    """A deterministic part of the (language, problem) pairs, for a single machine."""
+
+    index: int
+    count: int
+
+    def __str__(self) -> str:
+        return f"{self.index}-of-{self.count}"
+
+    def select(
+        self,
+        pairs: Iterable[tuple[Language, Problem]],
+        durations: Callable[[Language, Problem], Timing] | None = None,
+    ) -> set[tuple[Language, Problem]]:
+        """Select the pairs of this shard.
+
+        Without the durations, the pairs are dealt in turn. Otherwise, the longest
+        pair goes to the shard with the least total duration, and the pairs without
+        a duration count as an average one.
+        """
+        ordered = sorted(pairs, key=lambda pair: (pair[0].name, pair[1].name))
+        if durations is None:
+            return set(ordered[self.index - 1 :: self.count])
+        weights = {pair: durations(*pair).nanoseconds for pair in ordered}
+        known = [weight for weight in weights.values() if weight]
+        default = sum(known) // len(known) if known else 1
+        loads = [0] * self.count
+        selected = set()
+        for pair in sorted(ordered, key=lambda pair: -(weights[pair] or default)):
+            shard = loads.index(min(loads))
+            loads[shard] += weights[pair] or default
+            if shard == self.index - 1:
+                selected.add(pair)
+        return selected
+
+
 @dataclass(frozen=True, slots=True, order=True)
 class Version:
     major: int
@@ -254,7 +675,7 @@ def _get_txt_summary() -> Summary:
             problem_summary = summary.get_or_create_problem(problem)
             case_id = CaseId(problem=problem, case_key=case_key)
             summary_case = problem_summary.get_or_create_case(case_id)
-            summary_case.answer = answer
+            summary_case.update_answer(answer)
     answers.unlink()
 
     for language in get_all_languages():
@@ -265,7 +686,7 @@ def _get_txt_summary() -> Summary:
                 problem = Problem.from_name(problem_name)
                 case_id = CaseId(problem=problem, case_key=case_key)
                 case_summary = summary.problems[problem].cases[case_id]
-                case_summary.timings[language] = timing
+                case_summary.update_timing(language, timing)
         timings.unlink()
 
     return summary
@@ -282,17 +703,24 @@ def _get_csv_summary() -> Summary:
             problem_summary = summary.get_or_create_problem(problem)
             case_id = CaseId(problem=problem, case_key=row[CASE_KEY])
             case_summary = problem_summary.get_or_create_case(case_id)
-            case_summary.answer = row[ANSWER]
+            case_summary.update_answer(row[ANSWER])
             for language in languages:
                 timing = row.get(language.name, NULL_STRING)
                 if timing != NULL_STRING:
-                    case_summary.timings[language] = Timing(nanoseconds=int(timing))
+                    case_summary.update_timing(
+                        language, Timing(nanoseconds=int(timing))
+                    )
     results_file.unlink()
     return summary
 
 
-def _create_summary(file: Path) -> None:
-    file.mkdir()
+def _create_summary(backend: ResultsBackend, others: list[ResultsBackend]) -> None:
+    backend.create()
+    for other in others:
+        if other.exists():
+            backend.save(other.load_all())
+            other.remove()
+            return
     if _get_settings_root().joinpath("answers.txt").exists():
         summary = _get_txt_summary()
     if _get_settings_root().joinpath("results.csv").exists():
@@ -302,17 +730,60 @@ def _create_summary(file: Path) -> None:
     update_summary(summary)
 
 
-def _get_summary() -> Path:
-    directory = _get_settings_root().joinpath("results")
-    if not directory.exists():
-        _create_summary(directory)
-    return directory
+def _get_results_backend() -> ResultsBackend:
+    settings_root = _get_settings_root()
+    backends: dict[ResultsBackendType, ResultsBackend] = {
+        ResultsBackendType.YAML: YamlBackend(settings_root.joinpath("results")),
+        ResultsBackendType.SQLITE: SQLiteBackend(
+            settings_root.joinpath("results.sqlite3")
+        ),
+    }
+    backend_name = get_settings().get("results", {}).get("backend", "yaml")
+    try:
+        backend = backends.pop(ResultsBackendType(backend_name.lower()))
+    except ValueError:
+        raise InvalidResultsBackendError(backend_name) from None
+    if not backend.exists():
+        _create_summary(backend, list(backends.values()))
+    return backend
 
 
 def _get_statements_dir() -> Path:
     return _get_settings_root().joinpath("statements")
 
 
+def _get_index_file() -> Path:
+    return _get_settings_root().joinpath("index.json")
+
+
+def _get_history_dir() -> Path:
+    return _get_settings_root().joinpath("history")
+
+
+def _get_run_cache_dir() -> Path:
+    return _get_settings_root().joinpath("cache")
+
+
+def get_template_cache_dir() -> Path:
+    return _get_run_cache_dir().joinpath("templates")
+
+
+@cache
+def _get_commit(project_root: Path) -> str:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"],  # noqa: S607
+            cwd=project_root,
+            capture_output=True,
+            check=False,
+        )
+    except FileNotFoundError:
+        return ""
+    if result.returncode != 0:
+        return ""
+    return result.stdout.decode().strip()
+
+
 def _get_templates_dir() -> Path:
     return _get_settings_root().joinpath("templates")
 
@@ -337,13 +808,17 @@ def get_solution(language: Language, problem: Problem) -> Path:
 
 
 def get_statement(path: Path) -> dict[str, Any]:  # type: ignore[misc]
-    return ConfigParser([path]).data
+    return _STATEMENTS_CACHE.get([path], lambda: ConfigParser([path]).data)
 
 
 def get_settings() -> dict[str, Any]:  # type: ignore[misc]
-    settings_root = _get_settings_root()
     base_path = _get_settings_root().joinpath("euler")
     settings = [base_path.with_suffix(suffix) for suffix in SUPPORTED_SUFFIXES]
+    return _SETTINGS_CACHE.get(settings, lambda: _parse_settings(settings))
+
+
+def _parse_settings(settings: list[Path]) -> dict[str, Any]:  # type: ignore[misc]
+    settings_root = _get_settings_root()
     data = ConfigParser(settings).data
     version_string = data.get("$meta", {}).get("version")
     if version_string is None:
@@ -354,6 +829,124 @@ def get_settings() -> dict[str, Any]:  # type: ignore[misc]
     return data
 
 
+def get_cache_info() -> dict[str, CacheInfo]:
+    return {"settings": _SETTINGS_CACHE.info, "statements": _STATEMENTS_CACHE.info}
+
+
+def parse_duration(string: str) -> Timing:
+    match = TIME_UNIT.fullmatch(string.strip())
+    if match is None or (unit := match.group(2).strip()) not in TIME_UNITS:
+        msg = f"invalid duration: `{string}`"
+        raise ValueError(msg)
+    return Timing(nanoseconds=round(float(match.group(1)) * TIME_UNITS[unit]))
+
+
+def parse_cpus(string: str) -> tuple[int, ...]:
+    cpus: set[int] = set()
+    for part in string.split(","):
+        start, _, end = part.strip().partition("-")
+        cpus.update(range(int(start), int(end or start) + 1))
+    if not hasattr(os, "sched_getaffinity"):
+        msg = "CPU pinning is not supported on this platform"
+        raise ValueError(msg)
+    if unavailable := cpus - os.sched_getaffinity(0):
+        msg = f"unavailable CPUs: {format_cpus(unavailable)}"
+        raise ValueError(msg)
+    return tuple(sorted(cpus))
+
+
+def parse_niceness(string: str) -> int:
+    niceness = int(string)
+    if niceness and not hasattr(os, "setpriority"):
+        msg = "changing the niceness is not supported on this platform"
+        raise ValueError(msg)
+    if niceness < 0 and (
+        os.getpriority(os.PRIO_PROCESS, 0) + niceness < get_min_niceness()
+    ):
+        msg = f"not permitted to lower the niceness by {-niceness}"
+        raise ValueError(msg)
+    return niceness
+
+
+def parse_shard(string: str) -> Shard:
+    index, _, count = string.partition("/")
+    shard = Shard(index=int(index), count=int(count))
+    if not 1 <= shard.index <= shard.count:
+        msg = f"invalid shard: `{string}`"
+        raise ValueError(msg)
+    return shard
+
+
+def get_shard_pairs(
+    shard: Shard,
+    languages: list[Language],
+    problems: list[Problem],
+    selection: set[tuple[Language, Problem]] | None = None,
+    *,
+    balanced: bool = False,
+) -> set[tuple[Language, Problem]]:
+    pairs = [
+        (language, problem)
+        for language, problem in product(languages, problems)
+        if get_solution(language, problem).exists()
+        and (selection is None or (language, problem) in selection)
+    ]
+    return shard.select(pairs, get_summary().get_duration if balanced else None)
+
+
+def format_cpus(cpus: Iterable[int]) -> str:
+    ranges: list[list[int]] = []
+    for cpu in sorted(cpus):
+        if ranges and ranges[-1][-1] == cpu - 1:
+            ranges[-1][-1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    return ",".join(
+        str(start) if start == end else f"{start}-{end}" for start, end in ranges
+    )
+
+
+def format_size(size: int) -> str:
+    value = float(size)
+    unit, *larger_units = SIZE_UNITS
+    for larger_unit in larger_units:
+        if value < 1024:  # noqa: PLR2004
+            break
+        value /= 1024
+        unit = larger_unit
+    return f"{value:.1f}{unit}"
+
+
+def format_sparkline(values: Sequence[float]) -> str:
+    low, high = min(values, default=0), max(values, default=0)
+    if high == low:
+        return SPARKS[0] * len(values)
+    scale = (len(SPARKS) - 1) / (high - low)
+    return "".join(SPARKS[round((value - low) * scale)] for value in values)
+
+
+def parse_size(string: str) -> int:
+    match = SIZE_UNIT.fullmatch(string.strip())
+    if match is None:
+        msg = f"invalid size: `{string}`"
+        raise ValueError(msg)
+    prefix = match.group(2).removesuffix("B").removesuffix("i")
+    exponent = ["", "K", "M", "G", "T"].index(prefix)
+    return round(float(match.group(1)) * (1 << 10 * exponent))
+
+
+def parse_positive_int(string: str) -> int:
+    number = int(string)
+    if number <= 0:
+        msg = f"not a positive integer: `{string}`"
+        raise ValueError(msg)
+    return number
+
+
+def parse_percentage(string: str) -> float:
+    return float(string.strip().removesuffix("%")) / 100
+
+
 def parse_timing_result(line: str) -> tuple[str, str, Timing]:
     prefix, response_key, timing = line.split(maxsplit=2)
     return prefix, response_key, Timing(nanoseconds=int(timing) or 1)
@@ -368,24 +961,47 @@ def parse_answer_result(line: str) -> tuple[str, str, str]:
     return prefix, response_key, answer
 
 
+def _load_problem_summary(
+    problem: Problem, backend: ResultsBackend, languages: list[Language]
+) -> ProblemSummary | None:
+    data = backend.load(problem.name)
+    if data is None:
+        return None
+    return _parse_problem_summary(problem, data, languages)
+
+
+def _parse_problem_summary(  # type: ignore[misc]
+    problem: Problem, data: dict[str, Any], languages: list[Language]
+) -> ProblemSummary:
+    problem_summary = ProblemSummary(problem=problem, cases={})
+    resources = data.pop(RESOURCES, {})
+    for language in languages:
+        if language.name in resources:
+            problem_summary.resources[language] = Resources.from_dict(
+                resources[language.name]
+            )
+    for case_key, case_info in data.items():
+        case_id = CaseId(problem=problem, case_key=case_key)
+        case_summary = problem_summary.get_or_create_case(case_id)
+        case_summary.answer = case_info[ANSWER]
+        for language in languages:
+            timing = case_info.get(language.name, NULL_STRING)
+            if timing != NULL_STRING:
+                case_summary.timings[language] = Timing(nanoseconds=int(timing))
+            for key, extra in case_summary.extras.items():
+                if value := case_info.get(key, {}).get(language.name):
+                    extra[language] = value
+    return problem_summary
+
+
 def get_summary() -> Summary:
-    results_dir = _get_summary()
+    backend = _get_results_backend()
     languages = get_all_languages()
-    summary = Summary(problems={})
-    for results_file in results_dir.rglob("*.yaml"):
-        with results_file.open() as file:
-            data = yaml.safe_load(file)
-        problem = Problem.from_path(results_file, results_dir)
-        problem_summary = summary.get_or_create_problem(problem)
-        for case_key, case_info in data.items():
-            case_id = CaseId(problem=problem, case_key=case_key)
-            case_summary = problem_summary.get_or_create_case(case_id)
-            case_summary.answer = case_info[ANSWER]
-            for language in languages:
-                timing = case_info.get(language.name, NULL_STRING)
-                if timing != NULL_STRING:
-                    case_summary.timings[language] = Timing(nanoseconds=int(timing))
-    return summary
+    return Summary(
+        problems=ProblemSummaries(
+            lambda problem: _load_problem_summary(problem, backend, languages)
+        )
+    )
 
 
 def get_context(language: Language, problem: Problem) -> dict[str, Any]:  # type: ignore[misc]
@@ -395,21 +1011,332 @@ def get_context(language: Language, problem: Problem) -> dict[str, Any]:  # type
     return output
 
 
-def update_summary(summary: Summary) -> None:
-    results_dir = _get_summary()
-    for problem, problem_summary in summary.problems.items():
-        results_file = results_dir.joinpath(f"{problem.name}.yaml")
-        results_file.parent.mkdir(parents=True, exist_ok=True)
-        with results_file.open("w+") as file:
-            yaml.dump(problem_summary.as_dict(), file)
+def update_summary(summary: Summary, shard: Shard | None = None) -> None:
+    dirty_problems = [
+        problem_summary
+        for problem_summary in summary.problems.values()
+        if problem_summary.dirty
+    ]
+    if shard is None:
+        _get_results_backend().save(
+            {
+                problem_summary.problem.name: problem_summary.as_dict()
+                for problem_summary in dirty_problems
+            }
+        )
+    else:
+        _save_shard(dirty_problems, shard)
+    for problem_summary in dirty_problems:
+        problem_summary.mark_clean()
+
+
+def _get_shards_dir() -> Path:
+    return _get_settings_root().joinpath("shards")
+
+
+def get_shard_files() -> list[Path]:
+    return sorted(_get_shards_dir().glob("*.json"))
+
+
+def _select_languages(  # type: ignore[misc]
+    data: dict[str, dict[str, Any]], names: set[str]
+) -> dict[str, dict[str, Any]]:
+    output: dict[str, dict[str, Any]] = {}  # type: ignore[misc]
+    for key, info in data.items():
+        if key == RESOURCES:
+            output[key] = {name: value for name, value in info.items() if name in names}
+            continue
+        output[key] = {
+            field_name: (
+                {name: extra for name, extra in value.items() if name in names}
+                if field_name.startswith("$")
+                else value
+            )
+            for field_name, value in info.items()
+            if field_name == ANSWER or field_name.startswith("$") or field_name in names
+        }
+    return output
+
+
+def _save_shard(problem_summaries: list[ProblemSummary], shard: Shard) -> None:
+    """Write the results of the languages that ran, for merging them later."""
+    data = {
+        problem_summary.problem.name: _select_languages(
+            problem_summary.as_dict(),
+            {language.name for language in problem_summary.result},
+        )
+        for problem_summary in problem_summaries
+    }
+    path = _get_shards_dir().joinpath(f"{shard}.json")
+    atomic_write(path, json.dumps(data, indent=2, sort_keys=True))
+
+
+def _merge_problem_summary(
+    problem_summary: ProblemSummary, other: ProblemSummary
+) -> None:
+    for language, resources in other.resources.items():
+        problem_summary.update_resources(language, resources)
+    for case_id, other_case in other.cases.items():
+        case_summary = problem_summary.get_or_create_case(case_id)
+        if other_case.answer is not None:
+            case_summary.update_answer(other_case.answer)
+        for language, timing in other_case.timings.items():
+            case_summary.update_timing(
+                language,
+                timing,
+                other_case.get_aggregation(language),
+                other_case.affinities.get(language, ""),
+                other_case.runs.get(language, ""),
+            )
+
+
+def merge_shards(paths: list[Path]) -> Summary:
+    """Merge the results of the shards into the summary of the project.
+
+    Nothing is merged, if two shards disagree on the answer of a case.
+    """
+    languages = get_all_languages()
+    all_problems = {
+        problem.name: problem for problem in get_all_problems(set()).values()
+    }
+    summary = get_summary()
+    answers: dict[CaseId, tuple[str | None, Path]] = {}
+    conflicts = []
+    for path in paths:
+        with path.open() as file:
+            data = json.load(file)
+        for name, problem_data in data.items():
+            if name not in all_problems:
+                raise ProblemNotFoundError(name)
+            problem = all_problems[name]
+            shard_summary = _parse_problem_summary(problem, problem_data, languages)
+            for case_id, shard_case in list(shard_summary.cases.items()):
+                answer, other_path = answers.setdefault(
+                    case_id, (shard_case.answer, path)
+                )
+                if answer != shard_case.answer:
+                    conflicts.append(
+                        f"{problem.id} // {case_id.case_key}: "
+                        f"`{answer}` in {other_path}, `{shard_case.answer}` in {path}"
+                    )
+                    del shard_summary.cases[case_id]
+            _merge_problem_summary(
+                summary.get_or_create_problem(problem), shard_summary
+            )
+    if conflicts:
+        raise MergeConflictError(conflicts)
+    return summary
+
+
+def _get_journal_file() -> Path:
+    return _get_settings_root().joinpath("journal.jsonl")
+
+
+def get_journal(*, resume: bool) -> Journal:
+    return Journal(_get_journal_file(), resume=resume)
+
+
+def get_journal_entry(
+    language: Language, problem_summary: ProblemSummary
+) -> JournalEntry:
+    data = (
+        _select_languages(problem_summary.as_dict(), {language.name})
+        if problem_summary.dirty
+        else {}
+    )
+    return JournalEntry(
+        language=language.name, problem=problem_summary.problem.name, data=data
+    )
+
+
+def fold_journal(summary: Summary) -> set[tuple[str, str]]:
+    """Fold the results of an interrupted run into the summary.
+
+    It returns the names of the (language, problem) pairs that were completed.
+    """
+    languages = get_all_languages()
+    all_problems = {
+        problem.name: problem for problem in get_all_problems(set()).values()
+    }
+    completed = set()
+    for entry in read_journal(_get_journal_file()):
+        if entry.problem not in all_problems:
+            continue
+        problem = all_problems[entry.problem]
+        completed.add((entry.language, entry.problem))
+        _merge_problem_summary(
+            summary.get_or_create_problem(problem),
+            _parse_problem_summary(problem, entry.data, languages),
+        )
+    return completed
+
+
+def get_history_policy() -> HistoryPolicy:
+    history = get_settings().get("history", {})
+    default = HistoryPolicy()
+    return HistoryPolicy(
+        max_runs=history.get("max_runs", default.max_runs),
+        max_samples=history.get("max_samples", default.max_samples),
+    )
+
+
+def get_limits(language: Language, problem: Problem) -> Limits:
+    settings = get_settings()["languages"]
+    statement_limits = get_statement(problem.statement).get("limits", {})
+    limits = (
+        settings.get("$common", {})
+        | settings[language.name]
+        | statement_limits
+        | statement_limits.get(language.name, {})
+    )
+    timeout = limits.get("timeout")
+    cpu_limit = limits.get("cpu_limit")
+    memory_limit = limits.get("memory_limit")
+    return Limits(
+        timeout=None if timeout is None else parse_duration(str(timeout)),
+        cpu_time=None if cpu_limit is None else parse_duration(str(cpu_limit)),
+        memory=None if memory_limit is None else parse_size(str(memory_limit)),
+    )
+
+
+def get_run_key(
+    language: Language, problem: Problem, times: int, extra: Sequence[str]
+) -> str:
+    """Get a hash of everything that can change the output of a runner."""
+    runner = language.runner
+    runner_stat = runner.path.stat()
+    parts = [
+        language.name,
+        problem.name,
+        str(times),
+        runner.path.as_posix(),
+        str(runner_stat.st_mtime_ns),
+        str(runner_stat.st_size),
+        *runner.args,
+        "--",
+        *extra,
+    ]
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode())
+        digest.update(b"\0")
+    digest.update(get_solution(language, problem).read_bytes())
+    digest.update(b"\0")
+    digest.update(problem.statement.read_bytes())
+    return digest.hexdigest()
+
+
+def get_run_cache_file(language: Language, problem: Problem, times: int) -> Path:
+    """Get the cache file of a solution, with one file for every number of times."""
+    return _get_run_cache_dir().joinpath(language.name, problem.name, f"{times}.json")
+
+
+def load_cached_run(
+    language: Language, problem: Problem, times: int, key: str
+) -> RunOutput | None:
+    try:
+        with get_run_cache_file(language, problem, times).open() as file:
+            data = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if data.get("key") != key:
+        return None
+    return RunOutput(
+        result=ParseResult(data["result"]),
+        cases={
+            case_key: CaseOutput(answers=set(answers))
+            for case_key, answers in data["cases"].items()
+        },
+        cache_key=key,
+        cached=True,
+    )
+
+
+def save_cached_run(
+    language: Language, problem: Problem, times: int, run_output: RunOutput
+) -> None:
+    data = {
+        "key": run_output.cache_key,
+        "result": run_output.result,
+        "cases": {
+            case_key: sorted(case_output.answers)
+            for case_key, case_output in sorted(run_output.cases.items())
+        },
+    }
+    atomic_write(
+        get_run_cache_file(language, problem, times), json.dumps(data, indent=2)
+    )
+
+
+def _get_verdicts_file() -> Path:
+    return _get_run_cache_dir().joinpath("verdicts.json")
+
+
+def load_failures() -> set[tuple[str, str]]:
+    """Get the names of the (language, problem) pairs that failed in their last run."""
+    try:
+        with _get_verdicts_file().open() as file:
+            data = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return set()
+    return {(language, problem) for language, problem in data.get("failures", [])}
+
+
+def save_verdicts(verdicts: dict[tuple[Language, Problem], bool]) -> None:
+    if not verdicts:
+        return
+    failures = load_failures()
+    for (language, problem), success in verdicts.items():
+        if success:
+            failures.discard((language.name, problem.name))
+        else:
+            failures.add((language.name, problem.name))
+    data = {"failures": sorted(failures)}
+    atomic_write(_get_verdicts_file(), json.dumps(data, indent=2))
+
+
+def get_history_file(language: Language, problem: Problem) -> Path:
+    return _get_history_dir().joinpath(language.name, f"{problem.name}.bin")
+
+
+def get_history(language: Language, problem: Problem) -> dict[str, list[HistoryRecord]]:
+    output: dict[str, list[HistoryRecord]] = {}
+    for record in read_history(get_history_file(language, problem)):
+        output.setdefault(record.case_key, []).append(record)
+    return output
+
+
+def record_history(language: Language, problem_summary: ProblemSummary) -> int | None:
+    """Append the new samples to the history, and get the timestamp of the run."""
+    if problem_summary.result.get(language) != ParseResult.SUCCESS:
+        return None
+    policy = get_history_policy()
+    if not policy.enabled:
+        return None
+    timestamp = int(time.time())
+    commit = _get_commit(_get_project_root())
+    records = [
+        HistoryRecord(
+            case_key=case_id.case_key,
+            timestamp=timestamp,
+            commit=commit,
+            samples=array("q", (timing.nanoseconds for timing in timings)),
+        )
+        for case_id, case_summary in problem_summary.cases.items()
+        if case_summary.success(language)
+        and (timings := case_summary.new_timings.get(language))
+    ]
+    history_file = get_history_file(language, problem_summary.problem)
+    append_history(history_file, records, policy)
+    return timestamp
 
 
-def get_average(values: list[Timing]) -> Timing:
-    if not values:
-        return Timing()
-    if len(values) >= 3:  # noqa: PLR2004
-        values = sorted(values)[1:-1]
-    return sum(values, start=Timing()) // len(values)
+def get_average(
+    values: list[Timing], policy: AggregationPolicy | None = None
+) -> Timing:
+    if policy is None:
+        policy = AggregationPolicy()
+    return policy.aggregate(values)
 
 
 def get_all_languages() -> list[Language]:
@@ -427,15 +1354,14 @@ def get_all_problems(languages: set[str]) -> dict[str, Problem]:
         languages = {language.name for language in get_all_languages()}
 
     output = {}
-    for file in sorted(statement_dir.rglob("*")):
-        if not file.is_file():
+    for entry in load_index(_get_index_file(), statement_dir, get_statement):
+        if entry.languages.isdisjoint(languages):
             continue
-        problem = Problem.from_path(file, statement_dir)
-        statement = get_statement(file)
-        if any(statement.get(language) is not None for language in languages):
-            if problem.id in output:
-                raise DuplicateProblemError(problem.id)
-            output[problem.id] = problem
+        if entry.id in output:
+            raise DuplicateProblemError(entry.id)
+        output[entry.id] = Problem(
+            id=entry.id, name=entry.name, statement=statement_dir.joinpath(entry.path)
+        )
 
     return output
 
@@ -487,6 +1413,78 @@ def filter_problems(problems: set[str], languages: set[str]) -> list[Problem]:
     )
 
 
+def _get_changed_files(ref: str) -> set[Path]:
+    project_root = _get_project_root()
+    commands = (
+        ["git", "diff", "--name-only", "--relative", ref, "--"],
+        ["git", "ls-files", "--others", "--exclude-standard"],
+    )
+    changed_files: set[Path] = set()
+    for command in commands:
+        try:
+            result = subprocess.run(  # noqa: S603
+                command, cwd=project_root, capture_output=True, check=False
+            )
+        except FileNotFoundError as exc:
+            raise GitDiffError(ref, str(exc)) from exc
+        if result.returncode != 0:
+            raise GitDiffError(ref, result.stderr.decode().strip())
+        changed_files.update(
+            project_root.joinpath(line) for line in result.stdout.decode().splitlines()
+        )
+    return changed_files
+
+
+def _get_changed_problem(path: Path, base_dir: Path, suffix: str) -> str | None:
+    if not path.is_relative_to(base_dir) or path.suffix != suffix:
+        return None
+    return path.relative_to(base_dir).with_suffix("").as_posix()
+
+
+def get_changed_pairs(
+    ref: str, languages: list[Language], problems: list[Problem]
+) -> set[tuple[Language, Problem]]:
+    """Get the (language, problem) pairs that are affected by the changes since `ref`.
+
+    A changed solution affects its pair, a changed statement affects every language
+    of its problem, and a changed template or runner affects every problem of its
+    language. A change to the settings affects everything. The results change with
+    every update, so they do not affect anything.
+    """
+    settings_root = _get_settings_root()
+    templates_dir = _get_templates_dir()
+    problems_by_name = {problem.name: problem for problem in problems}
+    pairs: set[tuple[Language, Problem]] = set()
+    for path in _get_changed_files(ref):
+        if path.parent == settings_root and path.stem == "euler":
+            return set(product(languages, problems))
+        name = _get_changed_problem(path, _get_statements_dir(), path.suffix)
+        if name in problems_by_name:
+            problem = problems_by_name[name]
+            pairs.update((language, problem) for language in languages)
+        for language in languages:
+            templates = {
+                templates_dir.joinpath(f"{language.name}.jinja"),
+                templates_dir.joinpath("solution").with_suffix(
+                    f"{language.suffix}.jinja"
+                ),
+            }
+            name = _get_changed_problem(path, language.solutions_path, language.suffix)
+            if name in problems_by_name:
+                pairs.add((language, problems_by_name[name]))
+            elif (
+                path == language.runner.path
+                or path in templates
+                or (
+                    path.is_relative_to(language.path)
+                    and not path.is_relative_to(language.solutions_path)
+                    and not path.is_relative_to(settings_root)
+                )
+            ):
+                pairs.update((language, problem) for problem in problems)
+    return pairs
+
+
 def transpose(matrix: list[list[str]]) -> list[list[str]]:
     return [list(row) for row in zip(*matrix, strict=True)]
 
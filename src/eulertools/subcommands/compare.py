@@ -1,52 +1,295 @@
-from collections.abc import Iterator
+import math
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from itertools import islice
 
 from pyutilkit.term import SGROutput
+from pyutilkit.timing import Timing
 
-from eulertools.lib.constants import CASE_KEY, MISSING, PROBLEM
-from eulertools.lib.utils import Language, Problem, format_cell, get_summary
+from eulertools.lib.constants import (
+    ALL_CASES,
+    CASE_KEY,
+    MISSING,
+    PROBLEM,
+    CompareOrder,
+    Metric,
+    OutputFormat,
+)
+from eulertools.lib.records import Record, get_record_writer
+from eulertools.lib.stats import PERCENTILES, summarise_column
+from eulertools.lib.utils import (
+    CaseSummary,
+    Language,
+    Problem,
+    ProblemSummary,
+    Resources,
+    format_cell,
+    format_size,
+    get_summary,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Row:
+    """A case, with a value for every language, where NaN marks a missing value."""
+
+    problem: str
+    case_key: str
+    answer: str | None
+    values: list[float]
+    cells: list[str]
 
 
 class Compare:
     __slots__ = (
+        "baseline",
         "case_ids",
         "languages",
+        "metric",
+        "order",
         "pad_length",
         "problems",
         "summary",
+        "top",
+        "writer",
     )
 
-    def __init__(self, languages: list[Language], problems: list[Problem]) -> None:
+    def __init__(
+        self,
+        languages: list[Language],
+        problems: list[Problem],
+        metric: Metric = Metric.WALL,
+        output_format: OutputFormat = OutputFormat.TABLE,
+        *,
+        baseline: Language | None = None,
+        order: CompareOrder = CompareOrder.PROBLEM,
+        top: int | None = None,
+    ) -> None:
         self.languages = languages
         self.problems = problems
+        self.metric = metric
+        self.writer = get_record_writer(output_format)
+        self.baseline = baseline
+        self.order = order
+        self.top = top
 
     def run(self) -> None:
-        self._print_table(self._get_table())
+        if self.writer is None:
+            rows = list(self._rows)
+            table = [self._header, *(row.cells for row in self._select(rows))]
+            self._print_table(table, self._get_footer(rows))
+            return
+        for row in self._select(self._rows):
+            for record in self._get_records(row):
+                self.writer.write(record)
 
     @property
     def _header(self) -> list[str]:
         return [PROBLEM, CASE_KEY, *(language.name for language in self.languages)]
 
     @property
-    def _table_rows(self) -> Iterator[list[str]]:
+    def _rows(self) -> Iterator[Row]:
         summary = get_summary()
         for problem in self.problems:
             problem_summary = summary.problems[problem]
+            # the problems are not needed again, so they are freed as soon as possible
+            del summary.problems[problem]
+            if self.metric != Metric.WALL:
+                yield Row(
+                    problem=problem.name,
+                    case_key=ALL_CASES,
+                    answer=None,
+                    values=[
+                        self._get_resource(problem_summary.resources.get(language))
+                        for language in self.languages
+                    ],
+                    cells=[
+                        problem.name,
+                        ALL_CASES,
+                        *(
+                            self._format_resources(problem_summary, language)
+                            for language in self.languages
+                        ),
+                    ],
+                )
+                continue
             for case_id, case_summary in problem_summary.cases.items():
-                yield [
-                    case_id.problem.name,
-                    case_id.case_key,
-                    *(
-                        str(case_summary.timings.get(language, MISSING))
+                timed_languages = [
+                    language
+                    for language in self.languages
+                    if language in case_summary.timings
+                ]
+                aggregations = {
+                    case_summary.get_aggregation(language)
+                    for language in timed_languages
+                }
+                yield Row(
+                    problem=case_id.problem.name,
+                    case_key=case_id.case_key,
+                    answer=case_summary.answer,
+                    values=[
+                        self._get_timing(case_summary, language)
                         for language in self.languages
+                    ],
+                    cells=[
+                        case_id.problem.name,
+                        case_id.case_key,
+                        *(
+                            self._format_timing(
+                                case_summary, language, annotate=len(aggregations) > 1
+                            )
+                            for language in self.languages
+                        ),
+                    ],
+                )
+
+    def _select(self, rows: Iterable[Row]) -> Iterable[Row]:
+        """Sort the rows, and keep the top ones."""
+        if self.order == CompareOrder.SLOWEST:
+            rows = sorted(rows, key=self._get_slowest, reverse=True)
+        elif self.order == CompareOrder.REGRESSED:
+            rows = sorted(rows, key=self._get_regression, reverse=True)
+        if self.top is not None:
+            rows = islice(rows, self.top)
+        return rows
+
+    @staticmethod
+    def _get_slowest(row: Row) -> float:
+        return max(
+            (value for value in row.values if not math.isnan(value)), default=-math.inf
+        )
+
+    def _get_regression(self, row: Row) -> float:
+        reference = self._get_reference(row)
+        if not reference > 0:
+            return -math.inf
+        return max(
+            (value / reference for value in row.values if not math.isnan(value)),
+            default=-math.inf,
+        )
+
+    def _get_reference(self, row: Row) -> float:
+        """Get the value of the baseline, which defaults to the first language."""
+        if not self.languages:
+            return math.nan
+        baseline = self.baseline or self.languages[0]
+        return row.values[self.languages.index(baseline)]
+
+    def _get_records(self, row: Row) -> Iterator[Record]:
+        reference = self._get_reference(row)
+        for language, value in zip(self.languages, row.values, strict=True):
+            if math.isnan(value):
+                continue
+            yield Record(
+                problem=row.problem,
+                case_key=row.case_key,
+                language=language.name,
+                answer=row.answer,
+                aggregate=round(value),
+                delta=value / reference - 1 if reference > 0 else None,
+            )
+
+    def _get_footer(self, rows: list[Row]) -> list[list[str]]:
+        """Get the aggregates of every language over all the rows."""
+        if not self.languages:
+            return []
+        baseline = self.baseline or self.languages[0]
+        columns = [
+            [row.values[index] for row in rows] for index in range(len(self.languages))
+        ]
+        baseline_column = columns[self.languages.index(baseline)]
+        summaries = [summarise_column(column, baseline_column) for column in columns]
+        return [
+            [
+                "geomean",
+                ALL_CASES,
+                *(
+                    self._format_value(
+                        math.nan if summary is None else summary.geometric_mean
+                    )
+                    for summary in summaries
+                ),
+            ],
+            *(
+                [
+                    f"p{rank}",
+                    ALL_CASES,
+                    *(
+                        self._format_value(
+                            math.nan if summary is None else summary.percentiles[index]
+                        )
+                        for summary in summaries
                     ),
                 ]
+                for index, rank in enumerate(PERCENTILES)
+            ),
+            [
+                "speed-up",
+                baseline.name,
+                *(
+                    (
+                        MISSING
+                        if summary is None or math.isnan(summary.speed_up)
+                        else f"{summary.speed_up:.2f}x"
+                    )
+                    for summary in summaries
+                ),
+            ],
+            [
+                "won/lost",
+                baseline.name,
+                *(
+                    MISSING if summary is None else f"{summary.wins}/{summary.losses}"
+                    for summary in summaries
+                ),
+            ],
+        ]
+
+    def _format_value(self, value: float) -> str:
+        if math.isnan(value):
+            return MISSING
+        if self.metric == Metric.RSS:
+            return format_size(round(value))
+        return str(Timing(nanoseconds=round(value)))
+
+    @staticmethod
+    def _get_timing(case_summary: CaseSummary, language: Language) -> float:
+        timing = case_summary.timings.get(language)
+        if timing is None:
+            return math.nan
+        return timing.nanoseconds
 
-    def _get_table(self) -> list[list[str]]:
-        return [self._header, *self._table_rows]
+    @staticmethod
+    def _format_timing(
+        case_summary: CaseSummary, language: Language, *, annotate: bool
+    ) -> str:
+        timing = case_summary.timings.get(language)
+        if timing is None:
+            return MISSING
+        if annotate:
+            return f"{timing} ({case_summary.get_aggregation(language)})"
+        return str(timing)
 
-    def _print_table(self, table: list[list[str]]) -> None:
+    def _get_resource(self, resources: Resources | None) -> float:
+        if resources is None:
+            return math.nan
+        if self.metric == Metric.RSS:
+            return resources.max_rss
+        return resources.cpu_time.nanoseconds
+
+    def _format_resources(
+        self, problem_summary: ProblemSummary, language: Language
+    ) -> str:
+        resources = problem_summary.resources.get(language)
+        if resources is None:
+            return MISSING
+        if self.metric == Metric.RSS:
+            return format_size(resources.max_rss)
+        return str(resources.cpu_time)
+
+    def _print_table(self, table: list[list[str]], footer: list[list[str]]) -> None:
         n = len(self.languages) + 2
-        cell_length = max(len(cell) for row in table for cell in row) + 2
+        cell_length = max(len(cell) for row in [*table, *footer] for cell in row) + 2
         spacing = ["─" * cell_length for _ in range(n)]
         top = SGROutput(["┌", "┬".join(spacing), "┐"])
         mid = SGROutput(["├", "┼".join(spacing), "┤"])
@@ -59,4 +302,11 @@ class Compare:
                 format_cell(item, cell_length, is_header=(i == 0)) for item in row
             )
             SGROutput(["│", inner_row, "│"]).print()
+        if footer:
+            mid.print()
+        for row in footer:
+            inner_row = "│".join(
+                format_cell(item, cell_length, is_header=False) for item in row
+            )
+            SGROutput(["│", inner_row, "│"]).print()
         btm.print()
@@ -1,35 +1,77 @@
+from typing import TYPE_CHECKING
+
 import jinja2
+from pyutilkit.term import SGROutput
 
+from eulertools.lib.constants import Prefix
 from eulertools.lib.utils import (
     Language,
     Problem,
     get_context,
     get_solution,
     get_template,
+    get_template_cache_dir,
 )
 
+if TYPE_CHECKING:
+    from pathlib import Path
+
 
 class Generate:
-    __slots__ = ("languages", "problems")
+    __slots__ = ("dry_run", "environments", "languages", "problems")
 
-    def __init__(self, languages: list[Language], problems: list[Problem]) -> None:
+    def __init__(
+        self,
+        languages: list[Language],
+        problems: list[Problem],
+        *,
+        dry_run: bool = False,
+    ) -> None:
         self.languages = languages
         self.problems = problems
+        self.dry_run = dry_run
+        self.environments: dict[Path, jinja2.Environment] = {}
 
     def run(self) -> None:
-        for problem in self.problems:
-            for language in self.languages:
-                self._generate_solution(language, problem)
-
-    @staticmethod
-    def _generate_solution(language: Language, problem: Problem) -> None:
-        template_path = get_template(language)
-        solution = get_solution(language, problem)
-        context = get_context(language, problem)
-        if solution.exists():
+        missing = [
+            (language, problem, solution)
+            for problem in self.problems
+            for language in self.languages
+            if not (solution := get_solution(language, problem)).exists()
+        ]
+        if self.dry_run:
+            for language, problem, solution in missing:
+                SGROutput(
+                    [
+                        Prefix.WARNING,
+                        f"Generating {language.name} // {problem.id}... ",
+                        f"would create `{solution}`",
+                    ]
+                ).print()
             return
 
-        template = jinja2.Template(
-            template_path.read_text(), keep_trailing_newline=True
-        )
-        solution.write_text(template.render(context))
+        templates = {
+            language: self._get_template(language) for language in self.languages
+        }
+        rendered = [
+            (solution, templates[language].render(get_context(language, problem)))
+            for language, problem, solution in missing
+        ]
+        for solution, text in rendered:
+            solution.parent.mkdir(parents=True, exist_ok=True)
+            solution.write_text(text)
+
+    def _get_template(self, language: Language) -> jinja2.Template:
+        """Compile the template of the language, at most once per template."""
+        template_path = get_template(language)
+        environment = self.environments.get(template_path.parent)
+        if environment is None:
+            cache_dir = get_template_cache_dir()
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            environment = jinja2.Environment(  # noqa: S701
+                loader=jinja2.FileSystemLoader(template_path.parent),
+                bytecode_cache=jinja2.FileSystemBytecodeCache(str(cache_dir)),
+                keep_trailing_newline=True,
+            )
+            self.environments[template_path.parent] = environment
+        return environment.get_template(template_path.name)
@@ -0,0 +1,25 @@
+from pathlib import Path
+
+from pyutilkit.term import SGROutput
+
+from eulertools.lib.constants import Prefix
+from eulertools.lib.utils import get_shard_files, merge_shards, update_summary
+
+
+class Merge:
+    __slots__ = ("files",)
+
+    def __init__(self, files: list[Path]) -> None:
+        self.files = files
+
+    def run(self) -> None:
+        files = self.files or get_shard_files()
+        if not files:
+            SGROutput([Prefix.WARNING, "There are no shard files to merge"]).print()
+            return
+        summary = merge_shards(files)
+        update_summary(summary)
+        for file in files:
+            # a merged shard is removed, so that it is not merged again over newer results
+            file.unlink(missing_ok=True)
+            SGROutput([Prefix.SUCCESS, f"Merged {file}"]).print()
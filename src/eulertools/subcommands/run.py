@@ -1,41 +1,83 @@
+import math
+import os
 import shlex
 import subprocess
 import sys
+import tempfile
+import threading
+import time
 from collections.abc import Iterator, Sequence
-from itertools import product
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby, product
+from operator import itemgetter
+from queue import SimpleQueue
+from typing import IO
 
 from pyutilkit.term import SGROutput
+from pyutilkit.timing import Timing
 
 from eulertools.lib.constants import (
+    LIMIT_MESSAGES,
     CaseResult,
     NamedArgType,
+    OutputFormat,
     ParseResult,
     Prefix,
     UpdateMode,
 )
+from eulertools.lib.limits import Watchdog
+from eulertools.lib.records import (
+    get_case_record,
+    get_failure_record,
+    get_record_writer,
+)
+from eulertools.lib.server import END_OF_RESPONSE, ServerPool
 from eulertools.lib.utils import (
     CaseId,
+    IsolationPolicy,
     Language,
     Problem,
+    Resources,
+    RunOutput,
+    SamplingPolicy,
+    Shard,
     Summary,
+    format_cpus,
+    get_limits,
+    get_run_key,
     get_solution,
     get_summary,
+    load_cached_run,
+    load_failures,
     parse_answer_result,
     parse_timing_result,
+    save_cached_run,
+    save_verdicts,
     update_summary,
 )
 
 
 class Run:
     __slots__ = (
+        "assigned_cpus",
         "extra",
+        "fail_fast",
+        "isolation",
+        "jobs",
         "languages",
+        "prioritise",
         "problems",
+        "sampling",
+        "selection",
+        "servers",
+        "shard",
         "success",
         "summary",
         "times",
         "update_mode",
+        "use_cache",
         "verbosity",
+        "writer",
     )
 
     def __init__(
@@ -46,6 +88,16 @@ class Run:
         times: int,
         update_mode: UpdateMode = UpdateMode.NONE,
         extra: Sequence[str] = (),
+        jobs: int = 1,
+        sampling: SamplingPolicy | None = None,
+        isolation: IsolationPolicy | None = None,
+        *,
+        use_cache: bool = False,
+        selection: set[tuple[Language, Problem]] | None = None,
+        fail_fast: bool = False,
+        prioritise: bool = False,
+        shard: Shard | None = None,
+        output_format: OutputFormat = OutputFormat.TABLE,
     ) -> None:
         self.success = True
         self.languages = languages
@@ -55,6 +107,17 @@ class Run:
         self.update_mode = update_mode
         self.summary = get_summary()
         self.extra = extra
+        self.jobs = jobs
+        self.sampling = sampling
+        self.servers = ServerPool()
+        self.isolation = isolation
+        self.use_cache = use_cache
+        self.selection = selection
+        self.fail_fast = fail_fast
+        self.prioritise = prioritise
+        self.shard = shard
+        self.writer = get_record_writer(output_format)
+        self.assigned_cpus: dict[int, frozenset[int]] = {}
 
     def run(self) -> None:
         for language, problem, _ in self.get_summaries(self.languages, self.problems):
@@ -63,27 +126,183 @@ class Run:
                 self.success = False
             if self.update_mode != UpdateMode.NONE:
                 self._prepare_summary(language, problem)
+            self.summary.problems[problem].discard_samples(language)
+            if not self.success and self.fail_fast:
+                break
         if self.update_mode != UpdateMode.NONE:
-            update_summary(self.summary)
+            update_summary(self.summary, self.shard)
         if not self.success:
             sys.exit(81)
 
     def get_summaries(
         self, languages: list[Language], problems: list[Problem]
     ) -> Iterator[tuple[Language, Problem, Summary]]:
-        for language, problem in product(languages, problems):
-            solution = get_solution(language, problem)
-            if not solution.exists():
+        pairs = [
+            (language, problem)
+            for language, problem in product(languages, problems)
+            if get_solution(language, problem).exists()
+            and (self.selection is None or (language, problem) in self.selection)
+        ]
+        if self.isolation is None:
+            workers = self.jobs
+            executor = ThreadPoolExecutor(max_workers=workers)
+        else:
+            cpu_sets = self.isolation.partition(self.jobs)
+            available: SimpleQueue[frozenset[int]] = SimpleQueue()
+            for cpu_set in cpu_sets:
+                available.put(cpu_set)
+            workers = len(cpu_sets)
+            executor = ThreadPoolExecutor(
+                max_workers=workers,
+                initializer=self._assign_cpus,
+                initargs=(available,),
+            )
+        units = self._get_units(pairs, workers)
+        if self.prioritise:
+            units = self._prioritise(units, workers)
+        verdicts: dict[tuple[Language, Problem], bool] = {}
+        try:
+            run_outputs = executor.map(
+                self._collect_unit,
+                [language for language, _ in units],
+                [unit_problems for _, unit_problems in units],
+            )
+            for (language, unit_problems), unit_outputs in zip(
+                units, run_outputs, strict=True
+            ):
+                for problem, run_output in zip(
+                    unit_problems, unit_outputs, strict=True
+                ):
+                    self._merge_output(language, problem, run_output)
+                    if (
+                        run_output.cache_key
+                        and not run_output.cached
+                        and self.summary.success(language, problem)
+                    ):
+                        save_cached_run(language, problem, self.times, run_output)
+                    verdicts[language, problem] = self.summary.success(
+                        language, problem
+                    )
+                    yield language, problem, self.summary
+        finally:
+            executor.shutdown(cancel_futures=True)
+            self.servers.close()
+            save_verdicts(verdicts)
+
+    def _get_units(
+        self, pairs: list[tuple[Language, Problem]], workers: int
+    ) -> list[tuple[Language, list[Problem]]]:
+        """Split the pairs into the units of work, keeping their order.
+
+        The problems of a batch runner are split into (at most) one batch per worker,
+        and every other pair is a unit on its own.
+        """
+        units: list[tuple[Language, list[Problem]]] = []
+        for language, group in groupby(pairs, key=itemgetter(0)):
+            language_problems = [problem for _, problem in group]
+            runner = language.runner
+            if not runner.batch or runner.server or self.sampling is not None:
+                units.extend((language, [problem]) for problem in language_problems)
                 continue
+            size = math.ceil(len(language_problems) / workers)
+            units.extend(
+                (language, language_problems[start : start + size])
+                for start in range(0, len(language_problems), size)
+            )
+        return units
+
+    def _prioritise(
+        self, units: list[tuple[Language, list[Problem]]], workers: int
+    ) -> list[tuple[Language, list[Problem]]]:
+        """Run the units that failed last time first, and then the rest by duration.
+
+        With a single worker the shortest units run first, so that the results arrive
+        as early as possible, otherwise the longest ones, so that the workers finish
+        at about the same time.
+        """
+        failures = load_failures()
+
+        def priority(unit: tuple[Language, list[Problem]]) -> tuple[bool, int]:
+            language, unit_problems = unit
+            failed = any(
+                (language.name, problem.name) in failures for problem in unit_problems
+            )
+            duration = sum(
+                self.summary.get_duration(language, problem).nanoseconds
+                for problem in unit_problems
+            )
+            return not failed, duration if workers == 1 else -duration
+
+        return sorted(units, key=priority)
+
+    def _assign_cpus(self, available: SimpleQueue[frozenset[int]]) -> None:
+        self.assigned_cpus[threading.get_ident()] = available.get()
 
-            self._run_single_problem(language, problem)
-            yield language, problem, self.summary
+    def _isolate(self, pid: int) -> None:
+        if self.isolation is not None:
+            cpus = self.assigned_cpus.get(threading.get_ident(), frozenset())
+            self.isolation.apply(pid, cpus)
 
     def _run_single_problem(self, language: Language, problem: Problem) -> None:
-        problem_summary = self.summary.get_or_create_problem(problem)
-        problem_summary.result[language] = ParseResult.SUCCESS
+        run_output = self._collect(language, problem)
+        self._merge_output(language, problem, run_output)
+
+    def _collect_unit(
+        self, language: Language, problems: list[Problem]
+    ) -> list[RunOutput]:
+        if len(problems) == 1:
+            return [self._collect(language, problems[0])]
+        run_outputs: dict[Problem, RunOutput] = {}
+        keys: dict[Problem, str] = {}
+        if self.use_cache:
+            for problem in problems:
+                keys[problem] = get_run_key(language, problem, self.times, self.extra)
+                cached_output = load_cached_run(
+                    language, problem, self.times, keys[problem]
+                )
+                if cached_output is not None:
+                    run_outputs[problem] = cached_output
+        pending = [problem for problem in problems if problem not in run_outputs]
+        for problem, run_output in self._execute_batch(language, pending).items():
+            run_output.cache_key = keys.get(problem, "")
+            if cpus := self.assigned_cpus.get(threading.get_ident()):
+                run_output.affinity = format_cpus(cpus)
+            run_outputs[problem] = run_output
+        return [run_outputs[problem] for problem in problems]
+
+    def _collect(self, language: Language, problem: Problem) -> RunOutput:
+        if not self.use_cache:
+            return self._sample(language, problem)
+        key = get_run_key(language, problem, self.times, self.extra)
+        run_output = load_cached_run(language, problem, self.times, key)
+        if run_output is None:
+            run_output = self._sample(language, problem)
+            run_output.cache_key = key
+        return run_output
+
+    def _sample(self, language: Language, problem: Problem) -> RunOutput:
+        start = time.perf_counter_ns()
+        run_output = self._execute(language, problem)
+        if cpus := self.assigned_cpus.get(threading.get_ident()):
+            run_output.affinity = format_cpus(cpus)
+        if self.sampling is None:
+            return run_output
+        deadline = start + self.sampling.max_time.nanoseconds
+        while (
+            run_output.result == ParseResult.SUCCESS
+            and run_output.relative_standard_error > self.sampling.target_rse
+            and time.perf_counter_ns() < deadline
+        ):
+            run_output.extend(self._execute(language, problem))
+        return run_output
+
+    @staticmethod
+    def _get_problem_arg(language: Language, problem: Problem) -> str:
+        return problem.id if language.runner.use_ids else problem.name
+
+    def _get_command(self, language: Language, problem: Problem) -> list[str]:
         runner = language.runner
-        problem_arg = problem.id if runner.use_ids else problem.name
+        problem_arg = self._get_problem_arg(language, problem)
         times_arg = str(self.times)
         match runner.named_arg_type:
             case NamedArgType.NONE:
@@ -95,49 +314,237 @@ class Run:
             case NamedArgType.LONG:
                 problem_args = ["--problem", problem_arg]
                 time_args = ["--times", times_arg]
+        return [
+            runner.path.as_posix(),
+            *runner.args,
+            *problem_args,
+            *time_args,
+            *self.extra,
+        ]
+
+    def _execute(self, language: Language, problem: Problem) -> RunOutput:
+        if language.runner.server:
+            return self._execute_on_server(language, problem)
+        if language.runner.batch:
+            return self._execute_batch(language, [problem])[problem]
+        command = self._get_command(language, problem)
+        run_output = RunOutput()
         if self.verbosity > 3:  # noqa: PLR2004
-            command = shlex.join(
-                [
-                    runner.path.as_posix(),
-                    *runner.args,
-                    *problem_args,
-                    *time_args,
-                    *self.extra,
-                ]
+            run_output.log.append(
+                SGROutput(["🔍 Running command:", shlex.join(command)])
+            )
+        limits = get_limits(language, problem)
+        start = time.perf_counter_ns()
+        with (
+            tempfile.TemporaryFile() as error,
+            subprocess.Popen(  # noqa: S603
+                command, stdout=subprocess.PIPE, stderr=error, text=True
+            ) as process,
+            Watchdog(limits.timeout, process.kill) as watchdog,
+        ):
+            self._isolate(process.pid)
+            limits.apply(process.pid)
+            for line in process.stdout or ():
+                if not self._parse_line(run_output, line.rstrip("\n")):
+                    process.kill()
+                    break
+            return_code, run_output.resources = self._wait(process, start)
+            error_output = self._read(error)
+        if self.verbosity > 3 and error_output:  # noqa: PLR2004
+            run_output.log.append(SGROutput([error_output], is_error=True))
+        if run_output.result == ParseResult.SUCCESS and return_code != 0:
+            run_output.result = limits.get_failure(
+                return_code, error_output, timed_out=watchdog.expired
             )
-            SGROutput(["🔍 Running command:", command]).print()
-        result = subprocess.run(  # noqa: PLW1510, S603
-            [runner.path, *runner.args, *problem_args, *time_args, *self.extra],
-            capture_output=True,
+            run_output.parse_info = ""
+        return run_output
+
+    @staticmethod
+    def _wait(
+        process: subprocess.Popen[str], start: int
+    ) -> tuple[int, Resources | None]:
+        if not hasattr(os, "wait4"):
+            # the resources are not available on Windows, and they are not recorded
+            return process.wait(), None
+        _, status, rusage = os.wait4(process.pid, 0)
+        wall_time = Timing(nanoseconds=time.perf_counter_ns() - start)
+        process.returncode = os.waitstatus_to_exitcode(status)
+        return process.returncode, Resources.from_rusage(rusage, wall_time)
+
+    def _execute_on_server(self, language: Language, problem: Problem) -> RunOutput:
+        runner = language.runner
+        command = [runner.path.as_posix(), *runner.args, *self.extra]
+        server = self.servers.get(
+            language.name,
+            command,
+            show_errors=self.verbosity > 3,  # noqa: PLR2004
+            setup=self._isolate,
         )
-        output = result.stdout.decode()
-        error = result.stderr.decode()
+        problem_arg = self._get_problem_arg(language, problem)
+        run_output = RunOutput()
+        if self.verbosity > 3:  # noqa: PLR2004
+            request = f"{problem_arg} {self.times}"
+            run_output.log.append(
+                SGROutput(["🔍 Requesting:", request, "from", shlex.join(command)])
+            )
+        watchdog = Watchdog(get_limits(language, problem).timeout, server.kill)
+        try:
+            with watchdog:
+                for line in server.request(problem_arg, str(self.times)):
+                    if not self._parse_line(run_output, line):
+                        server.close()
+                        break
+        except EOFError:
+            if run_output.result == ParseResult.SUCCESS:
+                run_output.result = (
+                    ParseResult.TIMED_OUT if watchdog.expired else ParseResult.FAILURE
+                )
+                run_output.parse_info = ""
+        return run_output
+
+    def _execute_batch(
+        self, language: Language, problems: list[Problem]
+    ) -> dict[Problem, RunOutput]:
+        """Run the problems in as few invocations of the runner as possible.
+
+        When the runner crashes, the crash is attributed to the problem that it was
+        running, and the problems that it didn't finish are run in a new batch.
+        """
+        run_outputs: dict[Problem, RunOutput] = {}
+        pending = problems
+        while pending:
+            done, crashed = self._run_batch(language, pending, run_outputs)
+            pending = [
+                problem
+                for problem in pending
+                if problem not in done and problem != crashed
+            ]
+        return run_outputs
+
+    def _run_batch(
+        self,
+        language: Language,
+        problems: list[Problem],
+        run_outputs: dict[Problem, RunOutput],
+    ) -> tuple[set[Problem], Problem]:
+        runner = language.runner
+        command = [runner.path.as_posix(), *runner.args, *self.extra]
+        problem_args = {
+            self._get_problem_arg(language, problem): problem for problem in problems
+        }
+        requests = "".join(f"{arg} {self.times}\n" for arg in problem_args)
+        done: set[Problem] = set()
+        current = problems[0]
+        for problem in problems:
+            run_outputs[problem] = RunOutput()
         if self.verbosity > 3:  # noqa: PLR2004
-            if output:
-                SGROutput([output]).print()
-            if error:
-                SGROutput([error], is_error=True).print()
-        if result.returncode != 0:
-            problem_summary.result[language] = ParseResult.FAILURE
-            problem_summary.parse_info[language] = ""
+            run_outputs[current].log.append(
+                SGROutput(["🔍 Running batch:", shlex.join(command)])
+            )
+        with (
+            tempfile.TemporaryFile() as error,
+            subprocess.Popen(  # noqa: S603
+                command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=error,
+                text=True,
+            ) as process,
+            Watchdog(get_limits(language, current).timeout, process.kill) as watchdog,
+        ):
+            self._isolate(process.pid)
+            try:
+                if process.stdin is not None:
+                    process.stdin.write(requests)
+                    process.stdin.close()
+            except BrokenPipeError:
+                pass
+            for line in process.stdout or ():
+                problem_arg, _, output = line.rstrip("\n").partition(" ")
+                line_problem = problem_args.get(problem_arg)
+                if line_problem is None or line_problem in done:
+                    run_outputs[current].result = ParseResult.FAILURE
+                    run_outputs[current].parse_info = line.rstrip("\n")
+                    process.kill()
+                    break
+                # every problem is timed on its own, with its own timeout
+                if line_problem != current:
+                    current = line_problem
+                    watchdog.rearm(get_limits(language, current).timeout)
+                if output == END_OF_RESPONSE:
+                    done.add(current)
+                    current = next(
+                        (problem for problem in problems if problem not in done),
+                        current,
+                    )
+                    watchdog.rearm(get_limits(language, current).timeout)
+                elif not self._parse_line(run_outputs[current], output):
+                    process.kill()
+                    break
+            return_code = process.wait()
+            error_output = self._read(error)
+        if self.verbosity > 3 and error_output:  # noqa: PLR2004
+            run_outputs[current].log.append(SGROutput([error_output], is_error=True))
+        if len(done) == len(problems) and return_code == 0:
+            return done, current
+        run_output = run_outputs[current]
+        if run_output.result == ParseResult.SUCCESS:
+            run_output.result = get_limits(language, current).get_failure(
+                return_code, error_output, timed_out=watchdog.expired
+            )
+            run_output.parse_info = ""
+        return done, current
+
+    def _parse_line(self, run_output: RunOutput, line: str) -> bool:
+        if self.verbosity > 3:  # noqa: PLR2004
+            run_output.log.append(SGROutput([line]))
+        if line.startswith("Time"):
+            _, case_key, timing = parse_timing_result(line)
+            run_output.get_or_create_case(case_key).timings.append(timing)
+        elif line.startswith("Answer"):
+            _, case_key, answer = parse_answer_result(line)
+            run_output.get_or_create_case(case_key).answers.add(answer)
+        elif line.lower().startswith("debug"):
+            run_output.log.append(SGROutput(["🔍", line]))
+        else:
+            run_output.result = ParseResult.FAILURE
+            run_output.parse_info = line
+            return False
+        return True
+
+    @staticmethod
+    def _read(file: IO[bytes]) -> str:
+        file.seek(0)
+        return file.read().decode()
+
+    def _merge_output(
+        self, language: Language, problem: Problem, run_output: RunOutput
+    ) -> None:
+        # the output of the runners is printed here, from the main thread, so that
+        # it is not interleaved between the runners that run concurrently
+        for output in run_output.log:
+            output.print()
+        problem_summary = self.summary.get_or_create_problem(problem)
+        problem_summary.result[language] = run_output.result
+        problem_summary.affinity[language] = run_output.affinity
+        if run_output.cached:
+            problem_summary.cached.add(language)
+        if run_output.resources is not None:
+            problem_summary.new_resources[language] = run_output.resources
+        if run_output.result != ParseResult.SUCCESS:
+            problem_summary.parse_info[language] = run_output.parse_info
             return
-        for line in output.splitlines():
-            if line.startswith("Time"):
-                _, case_key, timing = parse_timing_result(line)
-                case_id = CaseId(problem, case_key)
-                case_summary = problem_summary.get_or_create_case(case_id)
-                case_summary.new_timings.setdefault(language, []).append(timing)
-            elif line.startswith("Answer"):
-                _, case_key, answer = parse_answer_result(line)
-                case_id = CaseId(problem, case_key)
-                case_summary = problem_summary.get_or_create_case(case_id)
-                case_summary.new_answers.setdefault(language, set()).add(answer)
-            elif line.lower().startswith("debug"):
-                SGROutput(["🔍", line]).print()
-            else:
-                problem_summary.result[language] = ParseResult.FAILURE
-                problem_summary.parse_info[language] = line
-                return
+        for case_key, case_output in run_output.cases.items():
+            case_id = CaseId(problem, case_key)
+            case_summary = problem_summary.get_or_create_case(case_id)
+            if case_output.timings:
+                case_summary.new_timings.setdefault(language, []).extend(
+                    case_output.timings
+                )
+            if case_output.answers:
+                case_summary.new_answers.setdefault(language, set()).update(
+                    case_output.answers
+                )
         for case_summary in problem_summary.cases.values():
             new_answers = case_summary.new_answers.get(language, set())
             if len(new_answers) == 0:
@@ -154,6 +561,13 @@ class Run:
     def _print_summary(self, language: Language, problem: Problem) -> None:
         problem_summary = self.summary.problems[problem]
         parse_result = problem_summary.result[language]
+        if self.writer is not None:
+            if parse_result != ParseResult.SUCCESS:
+                self.writer.write(get_failure_record(language, problem_summary))
+                return
+            for _, case_summary in sorted(problem_summary.cases.items()):
+                self.writer.write(get_case_record(language, case_summary))
+            return
         if parse_result == ParseResult.FAILURE:
             parse_info = problem_summary.parse_info[language]
             SGROutput(
@@ -164,10 +578,22 @@ class Run:
                 is_error=True,
             )
             return
+        if parse_result != ParseResult.SUCCESS:
+            SGROutput(
+                [
+                    Prefix.FAILURE,
+                    f"Running {language.name} // {problem.id}... ",
+                    LIMIT_MESSAGES[parse_result],
+                ],
+                is_error=True,
+            ).print()
+            return
         for case_id, case_summary in sorted(problem_summary.cases.items()):
             case_key = case_id.case_key
             result = case_summary.result[language]
             run_text = f"Running {language.name} // {problem.id} // {case_key}... "
+            if language in problem_summary.cached:
+                run_text += "(cached) "
             answer = case_summary.answer
             try:
                 new_answers = case_summary.new_answers[language]
@@ -203,7 +629,7 @@ class Run:
     def _prepare_summary(self, language: Language, problem: Problem) -> None:
         problem_summary = self.summary.problems[problem]
         parse_result = problem_summary.result[language]
-        if parse_result == ParseResult.FAILURE:
+        if parse_result != ParseResult.SUCCESS:
             return
 
         for case_summary in problem_summary.cases.values():
@@ -220,4 +646,4 @@ class Run:
             ):
                 continue
             new_answer = next(iter(case_summary.new_answers[language]))
-            case_summary.answer = new_answer
+            case_summary.update_answer(new_answer)
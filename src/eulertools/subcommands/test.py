@@ -3,7 +3,18 @@ from collections.abc import Sequence
 
 from pyutilkit.term import SGROutput
 
-from eulertools.lib.constants import CaseResult, ParseResult, Prefix
+from eulertools.lib.constants import (
+    LIMIT_MESSAGES,
+    CaseResult,
+    OutputFormat,
+    ParseResult,
+    Prefix,
+)
+from eulertools.lib.records import (
+    get_case_record,
+    get_failure_record,
+    get_record_writer,
+)
 from eulertools.lib.utils import Language, Problem, Summary
 from eulertools.subcommands.run import Run
 
@@ -11,11 +22,17 @@ from eulertools.subcommands.run import Run
 class Test:
     __slots__ = (
         "extra",
+        "fail_fast",
+        "jobs",
         "languages",
+        "prioritise",
         "problems",
+        "selection",
         "success",
         "times",
+        "use_cache",
         "verbosity",
+        "writer",
     )
 
     def __init__(
@@ -25,6 +42,13 @@ class Test:
         times: int,
         verbosity: int,
         extra: Sequence[str] = (),
+        jobs: int = 1,
+        *,
+        use_cache: bool = False,
+        selection: set[tuple[Language, Problem]] | None = None,
+        fail_fast: bool = False,
+        prioritise: bool = False,
+        output_format: OutputFormat = OutputFormat.TABLE,
     ) -> None:
         self.success = True
         self.languages = languages
@@ -32,6 +56,12 @@ class Test:
         self.times = times
         self.verbosity = verbosity
         self.extra = extra
+        self.jobs = jobs
+        self.use_cache = use_cache
+        self.selection = selection
+        self.fail_fast = fail_fast
+        self.prioritise = prioritise
+        self.writer = get_record_writer(output_format)
 
     def run(self) -> None:
         runner = Run(
@@ -40,6 +70,10 @@ class Test:
             verbosity=self.verbosity,
             times=self.times,
             extra=self.extra,
+            jobs=self.jobs,
+            use_cache=self.use_cache,
+            selection=self.selection,
+            prioritise=self.prioritise,
         )
         for language, problem, summary in runner.get_summaries(
             self.languages, self.problems
@@ -47,6 +81,9 @@ class Test:
             if not summary.success(language, problem):
                 self.success = False
             self._print_summary(language, problem, summary)
+            summary.problems[problem].discard_samples(language)
+            if not self.success and self.fail_fast:
+                break
         if not self.success:
             sys.exit(81)
 
@@ -55,16 +92,31 @@ class Test:
     ) -> None:
         problem_summary = summary.problems[problem]
         parse_result = problem_summary.result[language]
-        if parse_result == ParseResult.FAILURE:
+        if self.writer is not None:
+            if parse_result != ParseResult.SUCCESS:
+                self.writer.write(get_failure_record(language, problem_summary))
+                return
+            for _, case_summary in sorted(problem_summary.cases.items()):
+                self.writer.write(get_case_record(language, case_summary))
+            return
+        if parse_result != ParseResult.SUCCESS:
             SGROutput(
                 [
                     Prefix.FAILURE,
                     f"Testing {language.name} // {problem.id}...",
-                    "Failed to parse results",
+                    LIMIT_MESSAGES.get(parse_result, "Failed to parse results"),
                 ],
                 is_error=True,
             ).print()
             return
+        if language in problem_summary.cached:
+            SGROutput(
+                [
+                    Prefix.NO_CHANGE,
+                    f"Testing {language.name} // {problem.id}... ",
+                    "cached",
+                ]
+            ).print()
         for case_id, case_summary in sorted(problem_summary.cases.items()):
             case_key = case_id.case_key
             result = case_summary.result[language]
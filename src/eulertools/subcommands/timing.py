@@ -1,10 +1,42 @@
 import sys
 from collections.abc import Sequence
+from itertools import product
 
 from pyutilkit.term import SGROutput
+from pyutilkit.timing import Timing
 
-from eulertools.lib.constants import CaseResult, ParseResult, Prefix, UpdateMode
-from eulertools.lib.utils import Language, Problem, Summary, get_average, update_summary
+from eulertools.lib.constants import (
+    LIMIT_MESSAGES,
+    CaseResult,
+    OutputFormat,
+    ParseResult,
+    Prefix,
+    UpdateMode,
+)
+from eulertools.lib.history import HistoryRecord
+from eulertools.lib.journal import Journal
+from eulertools.lib.records import (
+    get_case_record,
+    get_failure_record,
+    get_record_writer,
+)
+from eulertools.lib.stats import Comparison, compare_samples
+from eulertools.lib.utils import (
+    IsolationPolicy,
+    Language,
+    Problem,
+    SamplingPolicy,
+    Shard,
+    Summary,
+    fold_journal,
+    format_size,
+    get_average,
+    get_history,
+    get_journal,
+    get_journal_entry,
+    record_history,
+    update_summary,
+)
 from eulertools.subcommands.run import Run
 
 
@@ -12,12 +44,22 @@ class Time:
 
     __slots__ = (
         "extra",
+        "fail_on_regression",
+        "isolation",
+        "jobs",
         "languages",
         "problems",
+        "regressed",
+        "resume",
+        "sampling",
+        "selection",
+        "shard",
         "success",
+        "threshold",
         "times",
         "update_mode",
         "verbosity",
+        "writer",
     )
 
     def __init__(
@@ -28,14 +70,34 @@ class Time:
         verbosity: int,
         update_mode: UpdateMode,
         extra: Sequence[str] = (),
+        jobs: int = 1,
+        threshold: float = 5.0,
+        fail_on_regression: float | None = None,
+        sampling: SamplingPolicy | None = None,
+        isolation: IsolationPolicy | None = None,
+        *,
+        selection: set[tuple[Language, Problem]] | None = None,
+        shard: Shard | None = None,
+        resume: bool = False,
+        output_format: OutputFormat = OutputFormat.TABLE,
     ) -> None:
         self.success = True
+        self.regressed = False
         self.languages = languages
         self.problems = problems
         self.times = times
         self.verbosity = verbosity
         self.update_mode = update_mode
         self.extra = extra
+        self.jobs = jobs
+        self.threshold = threshold
+        self.fail_on_regression = fail_on_regression
+        self.sampling = sampling
+        self.isolation = isolation
+        self.selection = selection
+        self.shard = shard
+        self.resume = resume
+        self.writer = get_record_writer(output_format)
 
     def run(self) -> None:
         runner = Run(
@@ -44,35 +106,85 @@ class Time:
             verbosity=self.verbosity,
             times=self.times,
             extra=self.extra,
+            jobs=self.jobs,
+            sampling=self.sampling,
+            isolation=self.isolation,
+            selection=self.selection,
         )
+        if self.update_mode == UpdateMode.NONE:
+            self._time(runner, None)
+        else:
+            if self.resume:
+                self._skip_completed(runner)
+            with get_journal(resume=self.resume) as journal:
+                self._time(runner, journal)
+                update_summary(runner.summary, self.shard)
+                journal.discard()
+        if not self.success:
+            sys.exit(81)
+        if self.regressed:
+            sys.exit(82)
+
+    def _time(self, runner: Run, journal: Journal | None) -> None:
         for language, problem, summary in runner.get_summaries(
             self.languages, self.problems
         ):
             if not summary.success(language, problem):
                 self.success = False
             self._print_summary(language, problem, summary)
-            if self.update_mode != UpdateMode.NONE:
-                self._prepare_summary(language, problem, summary)
-        if self.update_mode != UpdateMode.NONE:
-            update_summary(summary)
-        if not self.success:
-            sys.exit(81)
+            problem_summary = summary.problems[problem]
+            run = record_history(language, problem_summary)
+            if journal is not None:
+                self._prepare_summary(language, problem, summary, run)
+                journal.append(get_journal_entry(language, problem_summary))
+            problem_summary.discard_samples(language)
+
+    def _skip_completed(self, runner: Run) -> None:
+        completed = fold_journal(runner.summary)
+        runner.selection = {
+            (language, problem)
+            for language, problem in product(self.languages, self.problems)
+            if (self.selection is None or (language, problem) in self.selection)
+            and (language.name, problem.name) not in completed
+        }
 
     def _print_summary(
         self, language: Language, problem: Problem, summary: Summary
     ) -> None:
         problem_summary = summary.problems[problem]
         parse_result = problem_summary.result[language]
-        if parse_result == ParseResult.FAILURE:
+        if parse_result != ParseResult.SUCCESS and self.writer is not None:
+            self.writer.write(get_failure_record(language, problem_summary))
+            return
+        if parse_result != ParseResult.SUCCESS:
             SGROutput(
                 [
                     Prefix.FAILURE,
                     f"Timing {language.name} // {problem.id}... ",
-                    "Failed to parse results",
+                    LIMIT_MESSAGES.get(parse_result, "Failed to parse results"),
                 ],
                 is_error=True,
             ).print()
             return
+        if (
+            self.writer is None
+            and self.verbosity > 0
+            and (resources := problem_summary.new_resources.get(language))
+        ):
+            SGROutput(
+                [
+                    "🧮 ",
+                    f"Resources {language.name} // {problem.id}... ",
+                    f"wall: {resources.wall_time}, ",
+                    f"user: {resources.user_time}, ",
+                    f"sys: {resources.system_time}, ",
+                    f"peak RSS: {format_size(resources.max_rss)}, ",
+                    "context switches: ",
+                    f"{resources.voluntary_switches} voluntary / ",
+                    f"{resources.involuntary_switches} involuntary",
+                ]
+            ).print()
+        history = get_history(language, problem)
         for case_id, case_summary in problem_summary.cases.items():
             case_key = case_id.case_key
             time_text = f"Timing {language.name} // {problem.id} // {case_key}... "
@@ -81,26 +193,63 @@ class Time:
                 CaseResult.MISSING_KEY,
                 CaseResult.NON_DETERMINISTIC,
             }:
+                if self.writer is not None:
+                    self.writer.write(get_case_record(language, case_summary))
+                    continue
                 SGROutput(
                     [Prefix.FAILURE, time_text, "Unsuccessful run"], is_error=True
                 ).print()
                 continue
+            policy = language.aggregation
             old_timing = case_summary.timings.get(language)
+            old_aggregation = case_summary.get_aggregation(language)
+            if old_aggregation != str(policy):
+                old_timing = None
             raw_timings = case_summary.new_timings[language]
-            new_timing = get_average(raw_timings)
+            new_timing = get_average(raw_timings, policy)
+            comparison = None
+            # the cached timing is the reference, and not the previous run, so that a
+            # regression is reported on every run until it is fixed or stored
+            if old_timing is not None and (
+                old_samples := self._get_cached_samples(
+                    history.get(case_key, []), case_summary.runs.get(language)
+                )
+            ):
+                comparison = compare_samples(
+                    [
+                        timing.nanoseconds
+                        for timing in policy.discard_warmup(old_samples)
+                    ],
+                    [
+                        timing.nanoseconds
+                        for timing in policy.discard_warmup(raw_timings)
+                    ],
+                )
 
-            if old_timing is None:
+            if old_timing is None and old_aggregation != str(policy):
+                general_prefix = Prefix.WARNING
+                suffix = f"aggregation changed to {policy}, new timing: {new_timing}"
+            elif old_timing is None:
                 general_prefix = Prefix.WARNING
                 suffix = f"initial timing: {new_timing}"
-            elif old_timing > new_timing:
-                general_prefix = Prefix.SUCCESS
-                suffix = f"timing changed from {old_timing} to {new_timing}"
-            elif old_timing < new_timing:
-                general_prefix = Prefix.FAILURE
-                suffix = f"timing changed from {old_timing} to {new_timing}"
             else:
-                general_prefix = Prefix.NO_CHANGE
-                suffix = f"timing remained unchanged at: {new_timing}"
+                general_prefix = self._get_prefix(old_timing, new_timing, comparison)
+                if general_prefix == Prefix.NO_CHANGE and old_timing == new_timing:
+                    suffix = f"timing remained unchanged at: {new_timing}"
+                elif general_prefix == Prefix.NO_CHANGE:
+                    suffix = f"no significant change from {old_timing} to {new_timing}"
+                else:
+                    suffix = f"timing changed from {old_timing} to {new_timing}"
+                if comparison is not None:
+                    suffix += f" ({comparison})"
+            if self.writer is not None:
+                delta = self._get_delta(old_timing, new_timing, comparison)
+                self.writer.write(
+                    get_case_record(language, case_summary, new_timing, delta)
+                )
+                continue
+            if self.sampling is not None:
+                suffix += f" [{len(raw_timings)} samples]"
             SGROutput(
                 [general_prefix, time_text, suffix if self.verbosity == 0 else ""]
             ).print()
@@ -110,6 +259,10 @@ class Time:
                 if old_timing:
                     SGROutput([padding, prefix, "Old timing: ", old_timing]).print()
                 SGROutput([padding, prefix, "New timing: ", new_timing]).print()
+                if self.sampling is not None:
+                    SGROutput(
+                        [padding, prefix, "Samples: ", str(len(raw_timings))]
+                    ).print()
                 if old_timing is not None:
                     old_nanoseconds = old_timing.nanoseconds
                     new_nanoseconds = new_timing.nanoseconds
@@ -122,6 +275,15 @@ class Time:
                             f"{change:.2f}%",
                         ]
                     ).print()
+                if comparison is not None:
+                    SGROutput(
+                        [
+                            padding,
+                            general_prefix,
+                            "Change of the median: ",
+                            str(comparison),
+                        ]
+                    ).print()
                 if self.verbosity > 1:
                     SGROutput(f"{prefix} Detailed new timings:").print()
                     for i, timing in enumerate(raw_timings):
@@ -137,14 +299,58 @@ class Time:
                             [padding * 2, prefix, f"Run {i + 1} took:", timing]
                         ).print()
 
+    @staticmethod
+    def _get_cached_samples(
+        previous_runs: list[HistoryRecord], run: str | None
+    ) -> list[Timing] | None:
+        """Get the samples of the run that the cached timing is stored from."""
+        for record in reversed(previous_runs):
+            if str(record.timestamp) == run:
+                return [Timing(nanoseconds=sample) for sample in record.samples]
+        return None
+
+    @staticmethod
+    def _get_delta(
+        old_timing: Timing | None, new_timing: Timing, comparison: Comparison | None
+    ) -> float | None:
+        if comparison is not None:
+            return comparison.change
+        if old_timing is None:
+            return None
+        return new_timing.nanoseconds / old_timing.nanoseconds - 1
+
+    def _get_prefix(
+        self, old_timing: Timing, new_timing: Timing, comparison: Comparison | None
+    ) -> Prefix:
+        if comparison is None:
+            change = new_timing.nanoseconds / old_timing.nanoseconds - 1
+            significant = abs(change) * 100 >= self.threshold and change != 0
+        else:
+            change = comparison.change
+            significant = comparison.is_significant(self.threshold / 100)
+        if not significant:
+            return Prefix.NO_CHANGE
+        if change < 0:
+            return Prefix.SUCCESS
+        if self.fail_on_regression is not None and (
+            change * 100 >= self.fail_on_regression
+        ):
+            self.regressed = True
+        return Prefix.FAILURE
+
     def _prepare_summary(
-        self, language: Language, problem: Problem, summary: Summary
+        self, language: Language, problem: Problem, summary: Summary, run: int | None
     ) -> None:
         problem_summary = summary.problems[problem]
         parse_result = problem_summary.result[language]
-        if parse_result == ParseResult.FAILURE:
+        if parse_result != ParseResult.SUCCESS:
             return
 
+        if (resources := problem_summary.new_resources.get(language)) and (
+            language not in problem_summary.resources
+            or self.update_mode == UpdateMode.UPDATE
+        ):
+            problem_summary.update_resources(language, resources)
         for case_summary in problem_summary.cases.values():
             case_result = case_summary.result[language]
             if case_result in {
@@ -154,10 +360,18 @@ class Time:
                 CaseResult.NEW_RESPONSE,
             }:
                 continue
+            policy = language.aggregation
             if (
                 case_summary.timings.get(language)
+                and case_summary.get_aggregation(language) == str(policy)
                 and self.update_mode == UpdateMode.APPEND
             ):
                 continue
-            new_timing = get_average(case_summary.new_timings[language])
-            case_summary.timings[language] = new_timing
+            new_timing = get_average(case_summary.new_timings[language], policy)
+            case_summary.update_timing(
+                language,
+                new_timing,
+                str(policy),
+                problem_summary.affinity.get(language, ""),
+                "" if run is None else str(run),
+            )
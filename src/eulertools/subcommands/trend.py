@@ -0,0 +1,135 @@
+import csv
+import sys
+from datetime import UTC, datetime
+from itertools import product
+from statistics import median
+
+from pyutilkit.term import SGROutput
+from pyutilkit.timing import Timing
+
+from eulertools.lib.constants import OutputFormat, Prefix
+from eulertools.lib.history import HistoryRecord
+from eulertools.lib.stats import find_change_points
+from eulertools.lib.utils import (
+    Language,
+    Problem,
+    format_sparkline,
+    get_average,
+    get_history,
+)
+
+TREND_FIELDS = [
+    "problem",
+    "case_key",
+    "language",
+    "timestamp",
+    "commit",
+    "timing",
+    "change_point",
+]
+
+
+class Trend:
+    __slots__ = ("languages", "last", "output_format", "problems", "threshold")
+
+    def __init__(
+        self,
+        languages: list[Language],
+        problems: list[Problem],
+        threshold: float = 5.0,
+        last: int | None = None,
+        output_format: OutputFormat = OutputFormat.TABLE,
+    ) -> None:
+        self.languages = languages
+        self.problems = problems
+        self.threshold = threshold
+        self.last = last
+        self.output_format = output_format
+
+    def run(self) -> None:
+        writer = None
+        if self.output_format == OutputFormat.CSV:
+            writer = csv.writer(sys.stdout, lineterminator="\n")
+            writer.writerow(TREND_FIELDS)
+        found = False
+        for language, problem in product(self.languages, self.problems):
+            # the history is read one solution at a time, and it is not kept
+            history = get_history(language, problem)
+            for case_key, case_records in sorted(history.items()):
+                found = True
+                records = case_records[-self.last :] if self.last else case_records
+                timings = [
+                    get_average(
+                        [Timing(nanoseconds=sample) for sample in record.samples],
+                        language.aggregation,
+                    )
+                    for record in records
+                ]
+                change_points = find_change_points(
+                    [timing.nanoseconds for timing in timings], self.threshold / 100
+                )
+                if writer is None:
+                    self._print_trend(
+                        language, problem, case_key, records, timings, change_points
+                    )
+                    continue
+                for index, (record, timing) in enumerate(
+                    zip(records, timings, strict=True)
+                ):
+                    writer.writerow(
+                        [
+                            problem.name,
+                            case_key,
+                            language.name,
+                            record.timestamp,
+                            record.commit,
+                            timing.nanoseconds,
+                            index in change_points,
+                        ]
+                    )
+                sys.stdout.flush()
+        if not found and writer is None:
+            SGROutput([Prefix.WARNING, "There is no timing history"]).print()
+
+    @staticmethod
+    def _print_trend(
+        language: Language,
+        problem: Problem,
+        case_key: str,
+        records: list[HistoryRecord],
+        timings: list[Timing],
+        change_points: list[int],
+    ) -> None:
+        trend_text = f"Trend {language.name} // {problem.id} // {case_key}... "
+        sparkline = format_sparkline([timing.nanoseconds for timing in timings])
+        if len(timings) < 2:  # noqa: PLR2004
+            SGROutput(
+                [Prefix.WARNING, trend_text, f"only one run: {timings[0]}"]
+            ).print()
+            return
+        if not change_points:
+            SGROutput(
+                [
+                    Prefix.NO_CHANGE,
+                    trend_text,
+                    f"{sparkline} no change in {len(timings)} runs, ",
+                    f"latest: {timings[-1]}",
+                ]
+            ).print()
+            return
+        split = change_points[-1]
+        start = change_points[-2] if len(change_points) > 1 else 0
+        before = median(timing.nanoseconds for timing in timings[start:split])
+        after = median(timing.nanoseconds for timing in timings[split:])
+        change = after / before - 1
+        record = records[split]
+        when = record.commit[:8] or datetime.fromtimestamp(record.timestamp, UTC).date()
+        SGROutput(
+            [
+                Prefix.FAILURE if change > 0 else Prefix.SUCCESS,
+                trend_text,
+                f"{sparkline} changed from {Timing(nanoseconds=round(before))} ",
+                f"to {Timing(nanoseconds=round(after))} ({change:+.2%}) at {when}, ",
+                f"{len(change_points)} change point(s) in {len(timings)} runs",
+            ]
+        ).print()
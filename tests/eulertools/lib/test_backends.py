@@ -0,0 +1,74 @@
+from pathlib import Path
+
+import pytest
+
+from eulertools.lib.backends import (
+    ProblemData,
+    ResultsBackend,
+    SQLiteBackend,
+    YamlBackend,
+)
+
+PROBLEMS: dict[str, ProblemData] = {
+    "easy/p0001": {
+        "1": {"answer": "233168", "c": 44, "python": 662},
+        "2": {"answer": "23331668", "python": 721},
+    },
+    "p0042": {"1": {"answer": "162", "python": 1400121}},
+}
+
+
+@pytest.fixture(params=[YamlBackend, SQLiteBackend])
+def backend(request: pytest.FixtureRequest, tmp_path: Path) -> ResultsBackend:
+    backend_class: type[ResultsBackend] = request.param
+    return backend_class(tmp_path.joinpath("results"))
+
+
+def test_backend_round_trip(backend: ResultsBackend) -> None:
+    assert not backend.exists()
+    backend.create()
+    backend.save(PROBLEMS)
+
+    assert backend.exists()
+    assert backend.load("easy/p0001") == PROBLEMS["easy/p0001"]
+    assert backend.load("p0002") is None
+    assert backend.load_all() == PROBLEMS
+
+
+def test_backend_save_replaces_problem(backend: ResultsBackend) -> None:
+    backend.create()
+    backend.save(PROBLEMS)
+
+    backend.save({"easy/p0001": {"2": {"answer": "23331668", "c": 48}}})
+
+    assert backend.load("easy/p0001") == {"2": {"answer": "23331668", "c": 48}}
+    assert backend.load("p0042") == PROBLEMS["p0042"]
+
+
+def test_backend_remove(backend: ResultsBackend) -> None:
+    backend.create()
+    backend.save(PROBLEMS)
+
+    backend.remove()
+
+    assert not backend.exists()
+
+
+def test_sqlite_backend_keeps_extra_values(tmp_path: Path) -> None:
+    backend = SQLiteBackend(tmp_path.joinpath("results.sqlite3"))
+    data: ProblemData = {"1": {"answer": "1", "python": 5, "$note": {"a": [1, 2]}}}
+    backend.create()
+    backend.save({"p0001": data})
+
+    assert backend.load("p0001") == data
+
+
+def test_incomplete_backend_cannot_be_created(tmp_path: Path) -> None:
+    class IncompleteBackend(ResultsBackend):
+        __slots__ = ()
+
+        def create(self) -> None:
+            self.path.mkdir()
+
+    with pytest.raises(TypeError, match="abstract"):
+        IncompleteBackend(tmp_path)  # type: ignore[abstract]
@@ -0,0 +1,39 @@
+import os
+from pathlib import Path
+
+from eulertools.lib.cache import FileCache
+
+
+def test_file_cache_hits(tmp_path: Path) -> None:
+    path = tmp_path.joinpath("euler.toml")
+    path.write_text("first")
+    cache: FileCache[str] = FileCache()
+
+    assert cache.get([path], path.read_text) == "first"
+    assert cache.get([path], path.read_text) == "first"
+    assert (cache.info.hits, cache.info.misses) == (1, 1)
+
+
+def test_file_cache_invalidates_on_change(tmp_path: Path) -> None:
+    path = tmp_path.joinpath("euler.toml")
+    path.write_text("first")
+    cache: FileCache[str] = FileCache()
+    cache.get([path], path.read_text)
+
+    path.write_text("second")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert cache.get([path], path.read_text) == "second"
+    assert (cache.info.hits, cache.info.misses) == (0, 2)
+
+
+def test_file_cache_missing_files(tmp_path: Path) -> None:
+    paths = [tmp_path.joinpath("euler.toml"), tmp_path.joinpath("euler.yaml")]
+    cache: FileCache[int] = FileCache()
+
+    assert cache.get(paths, lambda: 1) == 1
+    paths[1].write_text("")
+    assert cache.get(paths, lambda: 2) == 2
+    assert cache.get(paths, lambda: 3) == 2
+    assert (cache.info.hits, cache.info.misses) == (1, 2)
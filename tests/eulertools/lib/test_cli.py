@@ -3,6 +3,7 @@ from unittest import mock
 import pytest
 
 from eulertools.lib.cli import parse_args
+from eulertools.lib.utils import IsolationPolicy, Shard
 
 
 @pytest.mark.parametrize(
@@ -72,3 +73,111 @@ def test_eulertools_run_with_extra_args() -> None:
 def test_eulertools_unknown_subcommand() -> None:
     with pytest.raises(SystemExit, match="2"):
         parse_args()
+
+
+@pytest.mark.parametrize("subcommand", ["run", "time", "test"])
+@mock.patch("eulertools.lib.cli.filter_languages", mock.MagicMock())
+@mock.patch("eulertools.lib.cli.filter_problems", mock.MagicMock())
+def test_eulertools_jobs(subcommand: str) -> None:
+    with mock.patch("sys.argv", ["euler", subcommand, "-j", "3"]):
+        args = parse_args()
+    assert args.jobs == 3
+
+
+@pytest.mark.parametrize("jobs", ["0", "-2", "two"])
+@mock.patch("eulertools.lib.cli.filter_languages", mock.MagicMock())
+@mock.patch("eulertools.lib.cli.filter_problems", mock.MagicMock())
+def test_eulertools_invalid_jobs(jobs: str) -> None:
+    with (
+        mock.patch("sys.argv", ["euler", "run", "-j", jobs]),
+        pytest.raises(SystemExit, match="2"),
+    ):
+        parse_args()
+
+
+@pytest.mark.parametrize("last", ["0", "-1"])
+@mock.patch("eulertools.lib.cli.filter_languages", mock.MagicMock())
+@mock.patch("eulertools.lib.cli.filter_problems", mock.MagicMock())
+def test_eulertools_trend_invalid_last(last: str) -> None:
+    with (
+        mock.patch("sys.argv", ["euler", "trend", "--last", last]),
+        pytest.raises(SystemExit, match="2"),
+    ):
+        parse_args()
+
+
+@pytest.mark.parametrize("top", ["0", "-1"])
+@mock.patch("eulertools.lib.cli.filter_languages", mock.MagicMock())
+@mock.patch("eulertools.lib.cli.filter_problems", mock.MagicMock())
+def test_eulertools_compare_invalid_top(top: str) -> None:
+    with (
+        mock.patch("sys.argv", ["euler", "compare", "--top", top]),
+        pytest.raises(SystemExit, match="2"),
+    ):
+        parse_args()
+
+
+@mock.patch("eulertools.lib.cli.filter_languages", mock.MagicMock())
+@mock.patch("eulertools.lib.cli.filter_problems", mock.MagicMock())
+def test_eulertools_time_regression_options() -> None:
+    with mock.patch(
+        "sys.argv",
+        ["euler", "time", "--threshold", "2.5", "--fail-on-regression", "10"],
+    ):
+        args = parse_args()
+    assert args.threshold == 2.5
+    assert args.fail_on_regression == 10
+
+
+@mock.patch("eulertools.lib.cli.filter_languages", mock.MagicMock())
+@mock.patch("eulertools.lib.cli.filter_problems", mock.MagicMock())
+@mock.patch(
+    "os.sched_getaffinity",
+    create=True,
+    new=mock.MagicMock(return_value={0, 1, 2, 3}),
+)
+def test_eulertools_time_isolation_options() -> None:
+    with mock.patch("sys.argv", ["euler", "time", "--cpus", "0,2-3", "--nice", "5"]):
+        args = parse_args()
+    assert args.isolation == IsolationPolicy(cpus=(0, 2, 3), nice=5)
+
+
+@pytest.mark.parametrize("subcommand", ["run", "test", "time"])
+@mock.patch("eulertools.lib.cli.filter_languages", mock.MagicMock(return_value=[]))
+@mock.patch("eulertools.lib.cli.filter_problems", mock.MagicMock(return_value=[]))
+@mock.patch("eulertools.lib.cli.get_changed_pairs", new_callable=mock.MagicMock)
+def test_eulertools_changed_since(
+    mock_get_changed_pairs: mock.MagicMock, subcommand: str
+) -> None:
+    with mock.patch("sys.argv", ["euler", subcommand, "--changed-since", "main"]):
+        args = parse_args()
+    mock_get_changed_pairs.assert_called_once_with("main", [], [])
+    assert args.selection == mock_get_changed_pairs.return_value
+
+    with mock.patch("sys.argv", ["euler", subcommand]):
+        args = parse_args()
+    assert args.selection is None
+
+
+@mock.patch("eulertools.lib.cli.filter_languages", mock.MagicMock(return_value=[]))
+@mock.patch("eulertools.lib.cli.filter_problems", mock.MagicMock(return_value=[]))
+@mock.patch("eulertools.lib.cli.get_changed_pairs", new_callable=mock.MagicMock)
+@mock.patch("eulertools.lib.cli.get_shard_pairs", new_callable=mock.MagicMock)
+def test_eulertools_shard(
+    mock_get_shard_pairs: mock.MagicMock, mock_get_changed_pairs: mock.MagicMock
+) -> None:
+    argv = [
+        "euler",
+        "time",
+        "--shard",
+        "2/3",
+        "--balance-shards",
+        "--changed-since",
+        "main",
+    ]
+    with mock.patch("sys.argv", argv):
+        args = parse_args()
+    mock_get_shard_pairs.assert_called_once_with(
+        Shard(2, 3), [], [], mock_get_changed_pairs.return_value, balanced=True
+    )
+    assert args.selection == mock_get_shard_pairs.return_value
@@ -0,0 +1,71 @@
+from array import array
+from pathlib import Path
+
+from eulertools.lib.history import (
+    HistoryPolicy,
+    HistoryRecord,
+    append_history,
+    read_history,
+)
+
+
+def _record(case_key: str, timestamp: int, samples: list[int]) -> HistoryRecord:
+    return HistoryRecord(
+        case_key=case_key,
+        timestamp=timestamp,
+        commit="0123abcd",
+        samples=array("q", samples),
+    )
+
+
+def test_history_round_trip(tmp_path: Path) -> None:
+    path = tmp_path.joinpath("python", "p0001.bin")
+    records = [_record("1", 100, [5, 3, 4]), _record("ünicode", 100, [2**40])]
+
+    append_history(path, records, HistoryPolicy())
+    append_history(path, [_record("1", 200, [1])], HistoryPolicy())
+
+    assert list(read_history(path)) == [*records, _record("1", 200, [1])]
+
+
+def test_history_truncated_record(tmp_path: Path) -> None:
+    path = tmp_path.joinpath("python", "p0001.bin")
+    records = [_record("1", 100, [5, 3, 4]), _record("2", 100, [7])]
+    append_history(path, records, HistoryPolicy())
+    with path.open("r+b") as file:
+        file.truncate(path.stat().st_size - 3)
+
+    assert list(read_history(path)) == records[:1]
+
+    append_history(path, [_record("1", 200, [1])], HistoryPolicy())
+
+    assert list(read_history(path)) == [records[0], _record("1", 200, [1])]
+
+
+def test_history_missing_file(tmp_path: Path) -> None:
+    assert list(read_history(tmp_path.joinpath("p0001.bin"))) == []
+
+
+def test_history_retention(tmp_path: Path) -> None:
+    path = tmp_path.joinpath("p0001.bin")
+    policy = HistoryPolicy(max_runs=2, max_samples=3)
+    for timestamp in range(4):
+        append_history(
+            path,
+            [_record("1", timestamp, [9, 1, 5, 7, 3]), _record("2", 0, [1])],
+            policy,
+        )
+
+    history = list(read_history(path))
+
+    assert [record.timestamp for record in history if record.case_key == "1"] == [2, 3]
+    assert [record.case_key for record in history].count("2") == 2
+    assert history[-2].samples == array("q", [1, 5, 9])
+
+
+def test_history_disabled(tmp_path: Path) -> None:
+    path = tmp_path.joinpath("p0001.bin")
+
+    append_history(path, [_record("1", 0, [1])], HistoryPolicy(max_runs=0))
+
+    assert not path.exists()
@@ -0,0 +1,67 @@
+import json
+from pathlib import Path
+from typing import Any, cast
+from unittest import mock
+
+from eulertools.lib.index import load_index
+
+
+def _parse(path: Path) -> dict[str, Any]:  # type: ignore[misc]
+    return cast("dict[str, Any]", json.loads(path.read_text()))  # type: ignore[misc]
+
+
+def _write_statement(path: Path, data: dict[str, Any]) -> None:  # type: ignore[misc]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data))
+
+
+def test_load_index(tmp_path: Path) -> None:
+    statement_dir = tmp_path.joinpath("statements")
+    index_file = tmp_path.joinpath("index.json")
+    _write_statement(
+        statement_dir.joinpath("p0001.json"), {"common": {"id": "1"}, "c": {}}
+    )
+    _write_statement(
+        statement_dir.joinpath("easy", "p0002.json"), {"common": {}, "python": {}}
+    )
+
+    entries = load_index(index_file, statement_dir, _parse)
+
+    assert [(entry.name, entry.path, entry.languages) for entry in entries] == [
+        ("easy/p0002", "easy/p0002.json", frozenset({"python"})),
+        ("p0001", "p0001.json", frozenset({"c"})),
+    ]
+    assert entries[0].id == statement_dir.joinpath("easy", "p0002").as_posix()
+    assert entries[1].id == "1"
+    assert index_file.exists()
+
+
+def test_load_index_parses_only_changed_statements(tmp_path: Path) -> None:
+    statement_dir = tmp_path.joinpath("statements")
+    index_file = tmp_path.joinpath("index.json")
+    _write_statement(statement_dir.joinpath("p0001.json"), {"common": {"id": "1"}})
+    _write_statement(statement_dir.joinpath("p0002.json"), {"common": {"id": "2"}})
+    load_index(index_file, statement_dir, _parse)
+
+    _write_statement(statement_dir.joinpath("p0002.json"), {"common": {"id": "two"}})
+    parse = mock.MagicMock(side_effect=_parse)
+    entries = load_index(index_file, statement_dir, parse)
+
+    assert [entry.id for entry in entries] == ["1", "two"]
+    assert parse.call_args_list == [mock.call(statement_dir.joinpath("p0002.json"))]
+
+
+def test_load_index_drops_deleted_statements(tmp_path: Path) -> None:
+    statement_dir = tmp_path.joinpath("statements")
+    index_file = tmp_path.joinpath("index.json")
+    _write_statement(statement_dir.joinpath("p0001.json"), {"common": {"id": "1"}})
+    _write_statement(statement_dir.joinpath("p0002.json"), {"common": {"id": "2"}})
+    load_index(index_file, statement_dir, _parse)
+
+    statement_dir.joinpath("p0001.json").unlink()
+    entries = load_index(index_file, statement_dir, _parse)
+
+    assert [entry.id for entry in entries] == ["2"]
+    assert [
+        problem["id"] for problem in json.loads(index_file.read_text())["problems"]
+    ] == ["2"]
@@ -0,0 +1,38 @@
+from pathlib import Path
+
+from eulertools.lib.journal import Journal, JournalEntry, read_journal
+
+FIRST = JournalEntry(language="python", problem="p0001", data={"1": {"python": 5}})
+SECOND = JournalEntry(language="c", problem="p0001", data={})
+
+
+def test_journal_round_trip(tmp_path: Path) -> None:
+    path = tmp_path.joinpath("journal.jsonl")
+    with Journal(path) as journal:
+        journal.append(FIRST)
+        journal.append(SECOND)
+
+    assert list(read_journal(path)) == [FIRST, SECOND]
+
+
+def test_journal_resumes_after_an_incomplete_line(tmp_path: Path) -> None:
+    path = tmp_path.joinpath("journal.jsonl")
+    path.write_text(FIRST.to_line() + SECOND.to_line()[:10])
+
+    assert list(read_journal(path)) == [FIRST]
+    with Journal(path, resume=True) as journal:
+        journal.append(SECOND)
+
+    assert list(read_journal(path)) == [FIRST, SECOND]
+
+
+def test_journal_starts_over_without_resuming(tmp_path: Path) -> None:
+    path = tmp_path.joinpath("journal.jsonl")
+    path.write_text(FIRST.to_line())
+    with Journal(path) as journal:
+        journal.append(SECOND)
+        assert list(read_journal(path)) == [SECOND]
+        journal.discard()
+
+    assert not path.exists()
+    assert list(read_journal(path)) == []
@@ -0,0 +1,111 @@
+import signal
+import subprocess
+import sys
+from unittest import mock
+
+import pytest
+from pyutilkit.timing import Timing
+
+from eulertools.lib.constants import ParseResult
+from eulertools.lib.limits import Limits, Watchdog, get_min_niceness
+
+resource = pytest.importorskip("resource")
+
+
+@pytest.mark.parametrize(
+    ("limits", "return_code", "error_output", "timed_out", "expected"),
+    [
+        (Limits(), 1, "", True, ParseResult.TIMED_OUT),
+        (Limits(), -signal.SIGXCPU, "", False, ParseResult.FAILURE),
+        (
+            Limits(cpu_time=Timing(seconds=1)),
+            -signal.SIGXCPU,
+            "",
+            False,
+            ParseResult.TIMED_OUT,
+        ),
+        (Limits(memory=1024), 1, "MemoryError", False, ParseResult.MEMORY_EXCEEDED),
+        (Limits(), 1, "MemoryError", False, ParseResult.FAILURE),
+        (Limits(memory=1024), 1, "IndexError", False, ParseResult.FAILURE),
+    ],
+)
+def test_limits_get_failure(
+    limits: Limits,
+    return_code: int,
+    error_output: str,
+    *,
+    timed_out: bool,
+    expected: ParseResult,
+) -> None:
+    failure = limits.get_failure(return_code, error_output, timed_out=timed_out)
+    assert failure == expected
+
+
+def test_watchdog_kills_on_timeout() -> None:
+    command = [sys.executable, "-c", "while True: pass"]
+    with (
+        subprocess.Popen(command) as process,  # noqa: S603
+        Watchdog(Timing(milliseconds=100), process.kill) as watchdog,
+    ):
+        return_code = process.wait()
+
+    assert watchdog.expired
+    assert return_code == -signal.SIGKILL
+
+
+def test_watchdog_is_rearmed() -> None:
+    command = [sys.executable, "-c", "while True: pass"]
+    with (
+        subprocess.Popen(command) as process,  # noqa: S603
+        Watchdog(None, process.kill) as watchdog,
+    ):
+        watchdog.rearm(Timing(seconds=10))
+        watchdog.rearm(Timing(milliseconds=100))
+        return_code = process.wait()
+
+    assert watchdog.expired
+    assert return_code == -signal.SIGKILL
+
+
+def test_watchdog_is_stopped_in_time() -> None:
+    with Watchdog(Timing(seconds=10), pytest.fail) as watchdog:
+        pass
+
+    assert not watchdog.expired
+
+
+@pytest.mark.skipif(not hasattr(resource, "prlimit"), reason="requires prlimit")
+def test_limits_apply() -> None:
+    command = [sys.executable, "-c", "import time; time.sleep(10)"]
+    limits = Limits(cpu_time=Timing(milliseconds=1500), memory=1 << 30)
+    with subprocess.Popen(command) as process:  # noqa: S603
+        limits.apply(process.pid)
+        cpu_limit = resource.prlimit(process.pid, resource.RLIMIT_CPU)
+        memory_limit = resource.prlimit(process.pid, resource.RLIMIT_AS)
+        process.kill()
+
+    assert cpu_limit == (2, 3)
+    assert memory_limit == (1 << 30, 1 << 30)
+
+
+@pytest.mark.skipif(not hasattr(resource, "RLIMIT_NICE"), reason="requires RLIMIT_NICE")
+@pytest.mark.parametrize(
+    ("euid", "soft_limit", "niceness", "expected"),
+    [
+        (0, 0, 0, -20),
+        (1000, 0, 0, 0),
+        (1000, 0, 5, 5),
+        (1000, 25, 5, -5),
+        (1000, 25, -10, -10),
+        (1000, resource.RLIM_INFINITY, 0, -20),
+    ],
+)
+def test_get_min_niceness(
+    euid: int, soft_limit: int, niceness: int, expected: int
+) -> None:
+    with (
+        mock.patch("os.geteuid", return_value=euid),
+        mock.patch("os.getpriority", return_value=niceness),
+        mock.patch.object(resource, "getrlimit", return_value=(soft_limit, -1)),
+    ):
+        assert get_min_niceness() == expected
@@ -0,0 +1,49 @@
+import io
+
+from eulertools.lib.constants import OutputFormat
+from eulertools.lib.records import Record, RecordWriter
+
+RECORD = Record(
+    problem="p0001",
+    case_key="1",
+    language="python",
+    result="success",
+    answer="42",
+    samples=[3, 5],
+    aggregate=4,
+    delta=0.25,
+)
+FAILURE = Record(problem="p0002", case_key="*", language="c", result="timed_out")
+
+
+def test_jsonl_writer() -> None:
+    stream = io.StringIO()
+    writer = RecordWriter(OutputFormat.JSONL, stream)
+    writer.write(RECORD)
+    writer.write(FAILURE)
+
+    assert stream.getvalue().splitlines() == [
+        (
+            '{"problem": "p0001", "case_key": "1", "language": "python", '
+            '"result": "success", "answer": "42", "samples": [3, 5], '
+            '"aggregate": 4, "delta": 0.25}'
+        ),
+        (
+            '{"problem": "p0002", "case_key": "*", "language": "c", '
+            '"result": "timed_out", "answer": null, "samples": [], '
+            '"aggregate": null, "delta": null}'
+        ),
+    ]
+
+
+def test_csv_writer() -> None:
+    stream = io.StringIO()
+    writer = RecordWriter(OutputFormat.CSV, stream)
+    writer.write(RECORD)
+    writer.write(FAILURE)
+
+    assert stream.getvalue().splitlines() == [
+        "problem,case_key,language,result,answer,samples,aggregate,delta",
+        "p0001,1,python,success,42,3 5,4,0.25",
+        "p0002,*,c,timed_out,,,,",
+    ]
@@ -0,0 +1,59 @@
+import sys
+
+import pytest
+
+from eulertools.lib.server import RunnerServer, ServerPool
+
+SERVER = """
+import sys
+for line in sys.stdin:
+    problem, times = line.split()
+    if problem == "crash":
+        sys.exit(1)
+    for _ in range(int(times)):
+        print(f"Time 1 {len(problem)}")
+        print(f"Answer 1 {problem}")
+    print("Done", flush=True)
+"""
+
+
+@pytest.fixture
+def server() -> RunnerServer:
+    return RunnerServer([sys.executable, "-c", SERVER])
+
+
+def test_runner_server_requests(server: RunnerServer) -> None:
+    try:
+        assert list(server.request("42", "2")) == [
+            "Time 1 2",
+            "Answer 1 42",
+            "Time 1 2",
+            "Answer 1 42",
+        ]
+        process = server.process
+        assert list(server.request("7", "1")) == ["Time 1 1", "Answer 1 7"]
+        assert server.process is process
+    finally:
+        server.close()
+    assert server.process is None
+
+
+def test_runner_server_restarts_after_crash(server: RunnerServer) -> None:
+    try:
+        with pytest.raises(EOFError):
+            list(server.request("crash", "1"))
+        assert server.process is None
+        assert list(server.request("1", "1")) == ["Time 1 1", "Answer 1 1"]
+    finally:
+        server.close()
+
+
+def test_server_pool() -> None:
+    pool = ServerPool()
+    command = [sys.executable, "-c", SERVER]
+
+    server = pool.get("python", command)
+
+    assert pool.get("python", command) is server
+    assert pool.get("c", command) is not server
+    pool.close()
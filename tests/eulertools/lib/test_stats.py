@@ -0,0 +1,151 @@
+import math
+
+import pytest
+
+from eulertools.lib.stats import (
+    Comparison,
+    compare_samples,
+    find_change_points,
+    geometric_mean,
+    mad_mean,
+    mann_whitney_u,
+    percentile,
+    summarise_column,
+    trimmed_mean,
+)
+
+
+def test_mann_whitney_u_identical_samples() -> None:
+    assert mann_whitney_u([5, 5, 5, 5], [5, 5, 5, 5]) == 1.0
+
+
+def test_mann_whitney_u_empty_samples() -> None:
+    assert mann_whitney_u([], [1, 2, 3]) == 1.0
+
+
+def test_mann_whitney_u_different_samples() -> None:
+    first = [100, 102, 98, 101, 99, 103, 97, 100, 101, 99]
+    second = [120, 118, 123, 121, 119, 122, 117, 120, 121, 119]
+
+    assert mann_whitney_u(first, second) < 0.001
+
+
+def test_mann_whitney_u_overlapping_samples() -> None:
+    first = [100, 102, 98, 101, 99, 103, 97, 100, 101, 99]
+    second = [101, 99, 100, 102, 98, 100, 103, 97, 99, 101]
+
+    assert mann_whitney_u(first, second) > 0.5
+
+
+@pytest.mark.parametrize(
+    ("first", "second", "expected"),
+    [
+        ([1, 2, 3, 4], [5, 6, 7, 8], 2 / 70),
+        ([5, 6, 7], [1, 2, 3, 4, 8], 14 / 56),
+        ([1, 2, 3], [4, 5, 6, 7], 2 / 35),
+    ],
+)
+def test_mann_whitney_u_exact(
+    first: list[float], second: list[float], expected: float
+) -> None:
+    assert mann_whitney_u(first, second) == pytest.approx(expected)
+
+
+def test_compare_samples_regression() -> None:
+    first = [100, 102, 98, 101, 99, 103, 97, 100, 101, 99]
+    second = [120, 118, 123, 121, 119, 122, 117, 120, 121, 119]
+
+    comparison = compare_samples(first, second)
+
+    assert comparison.change == pytest.approx(0.2)
+    assert 0 < comparison.low <= comparison.change <= comparison.high
+    assert comparison.is_significant(0.05)
+    assert not comparison.is_significant(0.25)
+
+
+def test_compare_samples_noise() -> None:
+    first = [100, 102, 98, 101, 99, 103, 97, 100, 101, 99]
+    second = [101, 99, 100, 102, 98, 100, 103, 97, 99, 104]
+
+    assert not compare_samples(first, second).is_significant(0)
+
+
+@pytest.mark.parametrize(
+    ("comparison", "expected"),
+    [
+        (Comparison(change=0.1, low=0.05, high=0.15, p_value=0.01), True),
+        (Comparison(change=-0.1, low=-0.15, high=-0.05, p_value=0.01), True),
+        (Comparison(change=0.1, low=-0.05, high=0.15, p_value=0.01), False),
+        (Comparison(change=0.1, low=0.05, high=0.15, p_value=0.2), False),
+        (Comparison(change=0.01, low=0.005, high=0.015, p_value=0.01), False),
+    ],
+)
+def test_comparison_is_significant(comparison: Comparison, expected: bool) -> None:
+    assert comparison.is_significant(0.05) is expected
+
+
+@pytest.mark.parametrize(
+    ("samples", "proportion", "expected"),
+    [
+        ([1, 2, 3, 4, 100], 0.2, 3),
+        ([1, 2, 3, 4, 100], 0, 22),
+        ([1, 100], 0.5, 50.5),
+    ],
+)
+def test_trimmed_mean(samples: list[int], proportion: float, expected: float) -> None:
+    assert trimmed_mean(samples, proportion) == expected
+
+
+@pytest.mark.parametrize(
+    ("samples", "expected"),
+    [
+        ([10, 11, 9, 10, 12, 8, 500], 10),
+        ([7, 7, 7, 100], 7),
+    ],
+)
+def test_mad_mean(samples: list[int], expected: float) -> None:
+    assert mad_mean(samples, 3) == expected
+
+
+def test_geometric_mean() -> None:
+    assert geometric_mean([1, 100, 0]) == pytest.approx(10)
+    assert math.isnan(geometric_mean([]))
+
+
+@pytest.mark.parametrize(
+    ("rank", "expected"),
+    [(0, 1), (50, 4), (90, 8.4), (100, 10)],
+)
+def test_percentile(rank: float, expected: float) -> None:
+    assert percentile([1, 2, 4, 6, 10], rank) == pytest.approx(expected)
+
+
+def test_summarise_column() -> None:
+    column = [10, 40, math.nan, 5]
+    baseline = [20, 20, 20, math.nan]
+
+    column_summary = summarise_column(column, baseline)
+    assert column_summary is not None
+    assert column_summary.count == 3
+    assert column_summary.geometric_mean == pytest.approx(2000 ** (1 / 3))
+    assert column_summary.percentiles == pytest.approx((10, 34, 39.4))
+    assert column_summary.speed_up == pytest.approx(1)
+    assert column_summary.wins == 1
+    assert column_summary.losses == 1
+    assert summarise_column([math.nan], baseline[:1]) is None
+
+
+@pytest.mark.parametrize(
+    ("values", "expected"),
+    [
+        ([100, 102, 99, 101, 103, 100, 98, 101], []),
+        ([100, 102, 99, 101, 200, 198, 202, 201], [4]),
+        ([100, 101, 99, 100, 200, 199, 198, 201, 50, 51, 49, 52], [4, 8]),
+        ([100, 101, 200, 199], []),
+        ([100, 101, 99, 200, 201, 199, 202, 198], [3]),
+        ([100, 99, 201, 199, 202, 198, 200], []),
+        ([100, 130, 90, 120, 95, 125, 85, 110], []),
+    ],
+)
+def test_find_change_points(values: list[float], expected: list[int]) -> None:
+    assert find_change_points(values, 0.05) == expected
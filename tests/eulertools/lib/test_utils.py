@@ -1,7 +1,17 @@
+import json
+from dataclasses import replace
+from pathlib import Path
+from unittest import mock
+
 import pytest
+import yaml
 from pyutilkit.timing import Timing
 
 from eulertools.lib import utils
+from eulertools.lib.backends import YamlBackend
+from eulertools.lib.constants import AGGREGATION, Aggregation, ParseResult
+from eulertools.lib.exceptions import MergeConflictError
+from eulertools.lib.utils import Language, Problem
 
 
 @pytest.mark.parametrize(
@@ -16,3 +26,455 @@ from eulertools.lib import utils
 def test_get_average(values: list[int], expected: int) -> None:
     timings = [Timing(nanoseconds=value) for value in values]
     assert utils.get_average(timings) == Timing(nanoseconds=expected)
+
+
+@pytest.mark.parametrize(
+    ("policy", "expected"),
+    [
+        (utils.AggregationPolicy(), 16),
+        (utils.AggregationPolicy(warmup=1), 4),
+        (utils.AggregationPolicy(method=Aggregation.MEDIAN), 4),
+        (utils.AggregationPolicy(method=Aggregation.MIN), 3),
+        (utils.AggregationPolicy(method=Aggregation.TRIMMED_MEAN, trim=25), 4),
+        (utils.AggregationPolicy(method=Aggregation.MAD_MEAN), 4),
+    ],
+)
+def test_get_average_with_policy(
+    policy: utils.AggregationPolicy, expected: int
+) -> None:
+    values = [90, 3, 4, 5, 4, 3, 5, 4, 110]
+    timings = [Timing(nanoseconds=value) for value in values]
+    assert utils.get_average(timings, policy) == Timing(nanoseconds=expected)
+
+
+@pytest.mark.parametrize(
+    ("policy", "expected"),
+    [
+        (utils.AggregationPolicy(), "mean"),
+        (
+            utils.AggregationPolicy(method=Aggregation.MEDIAN, warmup=3),
+            "median,warmup=3",
+        ),
+        (utils.AggregationPolicy(method=Aggregation.TRIMMED_MEAN), "trimmed_mean=10%"),
+        (utils.AggregationPolicy(method=Aggregation.MAD_MEAN), "mad_mean=3"),
+    ],
+)
+def test_aggregation_policy_str(policy: utils.AggregationPolicy, expected: str) -> None:
+    assert str(policy) == expected
+
+
+def test_aggregation_is_stored_with_the_timing(
+    tmp_path: Path, problems: list[Problem], languages: list[Language]
+) -> None:
+    c, python = languages
+    case_summary = utils.CaseSummary(case_id=utils.CaseId(problems[0], "1"))
+    case_summary.update_answer("42")
+    case_summary.update_timing(c, Timing(nanoseconds=10), "median")
+    case_summary.update_timing(python, Timing(nanoseconds=20))
+
+    data = utils.ProblemSummary(
+        problem=problems[0], cases={case_summary.case_id: case_summary}
+    ).as_dict()
+    assert data == {
+        "1": {"answer": "42", "c": 10, "python": 20, AGGREGATION: {"c": "median"}}
+    }
+
+    YamlBackend(tmp_path).save({"p0001": data})
+    with (
+        mock.patch.object(
+            utils, "_get_results_backend", return_value=YamlBackend(tmp_path)
+        ),
+        mock.patch.object(utils, "get_all_languages", return_value=languages),
+    ):
+        loaded = utils.get_summary().problems[problems[0]]
+    loaded_case = loaded.cases[case_summary.case_id]
+    assert loaded_case.get_aggregation(c) == "median"
+    assert loaded_case.get_aggregation(python) == Aggregation.MEAN
+
+    case_summary.dirty = False
+    case_summary.update_timing(c, Timing(nanoseconds=10))
+    assert case_summary.dirty
+    assert AGGREGATION not in case_summary.as_dict()["1"]
+
+
+def test_get_summary_loads_problems_lazily(
+    tmp_path: Path, problems: list[Problem], languages: list[Language]
+) -> None:
+    tmp_path.joinpath("p0001.yaml").write_text(
+        "'1':\n  answer: '233168'\n  c: 44\n  python: 662\n"
+    )
+    with (
+        mock.patch.object(
+            utils, "_get_results_backend", return_value=YamlBackend(tmp_path)
+        ),
+        mock.patch.object(utils, "get_all_languages", return_value=languages),
+        mock.patch.object(yaml, "safe_load", wraps=yaml.safe_load) as load,
+    ):
+        summary = utils.get_summary()
+        assert load.call_count == 0
+
+        problem_summary = summary.problems[problems[0]]
+        summary.get_or_create_problem(problems[0])
+        assert load.call_count == 1
+
+    case_summary = problem_summary.cases[utils.CaseId(problems[0], "1")]
+    assert case_summary.answer == "233168"
+    assert case_summary.timings == {
+        languages[0]: Timing(nanoseconds=44),
+        languages[1]: Timing(nanoseconds=662),
+    }
+    assert not summary.success(languages[0], problems[1])
+    assert problems[1] not in summary.problems
+
+
+def test_update_summary_writes_only_dirty_problems(
+    tmp_path: Path, summary: utils.Summary, problems: list[Problem]
+) -> None:
+    case_summary = summary.problems[problems[0]].cases[utils.CaseId(problems[0], "1")]
+    case_summary.update_answer("233168")
+    summary.problems[problems[1]].cases[utils.CaseId(problems[1], "1")].update_answer(
+        "163"
+    )
+
+    with mock.patch.object(
+        utils, "_get_results_backend", return_value=YamlBackend(tmp_path)
+    ):
+        utils.update_summary(summary)
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["p0042.yaml"]
+    assert not summary.problems[problems[1]].dirty
+    assert yaml.safe_load(tmp_path.joinpath("p0042.yaml").read_text()) == {
+        "1": {"answer": "163", "python": 1400121}
+    }
+
+
+@pytest.mark.parametrize(
+    ("string", "expected"),
+    [
+        ("30s", Timing(seconds=30)),
+        ("1.5 ms", Timing(microseconds=1500)),
+        ("200µs", Timing(microseconds=200)),
+        ("2m", Timing(minutes=2)),
+        ("10", Timing(seconds=10)),
+    ],
+)
+def test_parse_duration(string: str, expected: Timing) -> None:
+    assert utils.parse_duration(string) == expected
+
+
+@pytest.mark.parametrize("string", ["", "ten seconds", "10 days"])
+def test_parse_duration_invalid(string: str) -> None:
+    with pytest.raises(ValueError, match="invalid duration"):
+        utils.parse_duration(string)
+
+
+@pytest.mark.parametrize(("string", "expected"), [("1%", 0.01), ("2.5", 0.025)])
+def test_parse_percentage(string: str, expected: float) -> None:
+    assert utils.parse_percentage(string) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize(
+    ("cpus", "jobs", "expected"),
+    [
+        ((0, 1, 2, 3), 2, [{0, 1}, {2, 3}]),
+        ((0, 1, 2), 2, [{0}, {1, 2}]),
+        ((4, 5), 3, [{4}, {5}]),
+        ((), 2, [set(), set()]),
+    ],
+)
+def test_isolation_policy_partition(
+    cpus: tuple[int, ...], jobs: int, expected: list[set[int]]
+) -> None:
+    assert utils.IsolationPolicy(cpus=cpus).partition(jobs) == expected
+
+
+@mock.patch(
+    "os.sched_getaffinity",
+    create=True,
+    new=mock.MagicMock(return_value={0, 1, 2, 3, 5}),
+)
+def test_parse_cpus() -> None:
+    assert utils.parse_cpus("0-2, 5") == (0, 1, 2, 5)
+    assert utils.format_cpus({0, 1, 2, 5}) == "0-2,5"
+    with pytest.raises(ValueError, match="unavailable CPUs: 4"):
+        utils.parse_cpus("3-4")
+
+
+@mock.patch("eulertools.lib.utils.os", new=mock.MagicMock(spec=[]))
+def test_isolation_is_rejected_where_it_is_not_supported() -> None:
+    with pytest.raises(ValueError, match="CPU pinning is not supported"):
+        utils.parse_cpus("0")
+    with pytest.raises(ValueError, match="niceness is not supported"):
+        utils.parse_niceness("5")
+    assert utils.parse_niceness("0") == 0
+    utils.IsolationPolicy(nice=5).apply(42, frozenset({0}))
+
+
+@mock.patch("os.getpriority", create=True, new=mock.MagicMock(return_value=0))
+@mock.patch("os.setpriority", create=True, new=mock.MagicMock())
+@mock.patch(
+    "eulertools.lib.utils.get_min_niceness", new=mock.MagicMock(return_value=-3)
+)
+def test_parse_niceness() -> None:
+    assert utils.parse_niceness("5") == 5
+    assert utils.parse_niceness("-3") == -3
+    with pytest.raises(ValueError, match="not permitted to lower the niceness by 5"):
+        utils.parse_niceness("-5")
+
+
+def test_resources_are_stored_with_the_problem(
+    tmp_path: Path, problems: list[Problem], languages: list[Language]
+) -> None:
+    problem_summary = utils.ProblemSummary(problem=problems[0], cases={})
+    case_summary = problem_summary.get_or_create_case(utils.CaseId(problems[0], "1"))
+    case_summary.update_answer("42")
+    resources = utils.Resources(
+        wall_time=Timing(milliseconds=3),
+        user_time=Timing(milliseconds=2),
+        system_time=Timing(milliseconds=1),
+        max_rss=4096,
+        voluntary_switches=5,
+        involuntary_switches=6,
+    )
+    problem_summary.mark_clean()
+    problem_summary.update_resources(languages[0], resources)
+    assert problem_summary.dirty
+
+    YamlBackend(tmp_path).save({"p0001": problem_summary.as_dict()})
+    with (
+        mock.patch.object(
+            utils, "_get_results_backend", return_value=YamlBackend(tmp_path)
+        ),
+        mock.patch.object(utils, "get_all_languages", return_value=languages),
+    ):
+        loaded = utils.get_summary().problems[problems[0]]
+    assert loaded.resources == {languages[0]: resources}
+    assert list(loaded.cases) == [utils.CaseId(problems[0], "1")]
+
+
+@pytest.mark.parametrize(
+    ("size", "expected"),
+    [
+        (512, "512.0B"),
+        (2048, "2.0KiB"),
+        (3 * 1024**3, "3.0GiB"),
+        (1024**5, "1024.0TiB"),
+    ],
+)
+def test_format_size(size: int, expected: str) -> None:
+    assert utils.format_size(size) == expected
+
+
+@pytest.mark.parametrize(
+    ("values", "expected"),
+    [
+        ([1, 8, 4.5, 2], "▁█▅▂"),
+        ([3, 3], "▁▁"),
+        ([], ""),
+    ],
+)
+def test_format_sparkline(values: list[float], expected: str) -> None:
+    assert utils.format_sparkline(values) == expected
+
+
+@pytest.mark.parametrize(
+    ("string", "expected"),
+    [("100", 100), ("2 KiB", 2048), ("512MiB", 1 << 29), ("1.5G", 3 << 29)],
+)
+def test_parse_size(string: str, expected: int) -> None:
+    assert utils.parse_size(string) == expected
+
+
+@pytest.mark.parametrize(
+    ("changed", "expected"),
+    [
+        ([], set()),
+        (["c/src/solutions/p0001.c"], {("c", "p0001")}),
+        (["c/src/solutions/p0002.c", "c/README.md"], {("c", "p0001"), ("c", "p0042")}),
+        ([".euler/statements/p0042.toml"], {("c", "p0042"), ("python", "p0042")}),
+        (
+            [".euler/templates/solution.py.jinja"],
+            {("python", "p0001"), ("python", "p0042")},
+        ),
+        (
+            [
+                ".euler/index.json",
+                ".euler/history/c/p0001.jsonl",
+                ".euler/results.yaml",
+                ".euler/results/p0001.yaml",
+            ],
+            set(),
+        ),
+        (
+            [".euler/euler.toml"],
+            {(lang, p) for lang in ("c", "python") for p in ("p0001", "p0042")},
+        ),
+    ],
+)
+def test_get_changed_pairs(
+    tmp_path: Path,
+    problems: list[Problem],
+    languages: list[Language],
+    changed: list[str],
+    expected: set[tuple[str, str]],
+) -> None:
+    languages = [
+        replace(
+            language,
+            path=tmp_path.joinpath(language.name),
+            solutions_path=tmp_path.joinpath(language.name, "src/solutions"),
+            suffix=f".{language.suffix.lstrip('.')}",
+        )
+        for language in languages
+    ]
+    with (
+        mock.patch.object(
+            utils, "_get_settings_root", return_value=tmp_path.joinpath(".euler")
+        ),
+        mock.patch.object(
+            utils,
+            "_get_changed_files",
+            return_value={tmp_path.joinpath(path) for path in changed},
+        ),
+    ):
+        pairs = utils.get_changed_pairs("main", languages, problems)
+    assert {(language.name, problem.name) for language, problem in pairs} == expected
+
+
+def test_save_verdicts(
+    tmp_path: Path, problems: list[Problem], languages: list[Language]
+) -> None:
+    with mock.patch.object(utils, "_get_run_cache_dir", return_value=tmp_path):
+        assert utils.load_failures() == set()
+        utils.save_verdicts(
+            {(languages[0], problems[0]): False, (languages[1], problems[1]): False}
+        )
+        utils.save_verdicts({(languages[0], problems[0]): True})
+        assert utils.load_failures() == {("python", "p0042")}
+
+
+def test_get_duration(
+    summary: utils.Summary, problems: list[Problem], languages: list[Language]
+) -> None:
+    assert summary.get_duration(languages[1], problems[0]) == Timing(nanoseconds=1383)
+    assert summary.get_duration(languages[0], problems[1]) == Timing()
+
+
+@pytest.mark.parametrize(
+    ("string", "expected"),
+    [("1/3", utils.Shard(1, 3)), ("4/4", utils.Shard(4, 4))],
+)
+def test_parse_shard(string: str, expected: utils.Shard) -> None:
+    assert utils.parse_shard(string) == expected
+
+
+@pytest.mark.parametrize("string", ["0/3", "4/3", "1", "a/b"])
+def test_parse_invalid_shard(string: str) -> None:
+    with pytest.raises(ValueError, match="invalid"):
+        utils.parse_shard(string)
+
+
+def test_shard_select(
+    summary: utils.Summary, problems: list[Problem], languages: list[Language]
+) -> None:
+    pairs = [(language, problem) for language in languages for problem in problems]
+    shards = [utils.Shard(index, 3) for index in range(1, 4)]
+
+    dealt = [shard.select(pairs) for shard in shards]
+    assert dealt == [
+        {(languages[0], problems[0]), (languages[1], problems[1])},
+        {(languages[0], problems[1])},
+        {(languages[1], problems[0])},
+    ]
+
+    balanced = [shard.select(pairs, summary.get_duration) for shard in shards]
+    assert balanced == [
+        {(languages[1], problems[1])},
+        {(languages[0], problems[1])},
+        {(languages[0], problems[0]), (languages[1], problems[0])},
+    ]
+
+
+def test_merge_shards(
+    tmp_path: Path,
+    summary: utils.Summary,
+    problems: list[Problem],
+    languages: list[Language],
+) -> None:
+    c, python = languages
+    problem_summary = summary.problems[problems[0]]
+    problem_summary.result = {python: ParseResult.SUCCESS}
+    case_summary = problem_summary.cases[utils.CaseId(problems[0], "1")]
+    case_summary.update_timing(python, Timing(nanoseconds=600), Aggregation.MEDIAN)
+    shard = utils.Shard(1, 2)
+    with mock.patch.object(utils, "_get_settings_root", return_value=tmp_path):
+        utils.update_summary(summary, shard)
+        assert utils.get_shard_files() == [tmp_path.joinpath("shards/1-of-2.json")]
+        shard_file = utils.get_shard_files()[0]
+        assert json.loads(shard_file.read_text()) == {
+            "p0001": {
+                "1": {
+                    "answer": "233168",
+                    "python": 600,
+                    AGGREGATION: {"python": "median"},
+                },
+                "2": {"answer": "23331668", "python": 721},
+            }
+        }
+        conflicting_file = tmp_path.joinpath("conflicting.json")
+        conflicting_file.write_text(shard_file.read_text().replace("23331668", "42"))
+
+        stored = utils.Summary(problems={})
+        with (
+            mock.patch.object(utils, "get_all_languages", return_value=languages),
+            mock.patch.object(
+                utils,
+                "get_all_problems",
+                return_value={problem.id: problem for problem in problems},
+            ),
+            mock.patch.object(utils, "get_summary", return_value=stored),
+        ):
+            merged = utils.merge_shards([shard_file])
+            with pytest.raises(MergeConflictError):
+                utils.merge_shards([shard_file, conflicting_file])
+
+    merged_case = merged.problems[problems[0]].cases[utils.CaseId(problems[0], "1")]
+    assert merged_case.answer == "233168"
+    assert merged_case.timings == {python: Timing(nanoseconds=600)}
+    assert merged_case.get_aggregation(python) == Aggregation.MEDIAN
+    assert c not in merged_case.timings
+
+
+def test_fold_journal(
+    tmp_path: Path,
+    summary: utils.Summary,
+    problems: list[Problem],
+    languages: list[Language],
+) -> None:
+    c, python = languages
+    problem_summary = summary.problems[problems[0]]
+    case_summary = problem_summary.cases[utils.CaseId(problems[0], "1")]
+    case_summary.update_timing(python, Timing(nanoseconds=600))
+    case_summary.new_timings[python] = [Timing(nanoseconds=600)]
+    with mock.patch.object(utils, "_get_settings_root", return_value=tmp_path):
+        with utils.get_journal(resume=False) as journal:
+            journal.append(utils.get_journal_entry(python, problem_summary))
+            journal.append(utils.get_journal_entry(c, summary.problems[problems[1]]))
+        problem_summary.discard_samples(python)
+        assert case_summary.new_timings == {}
+
+        stored = utils.Summary(problems={})
+        with (
+            mock.patch.object(utils, "get_all_languages", return_value=languages),
+            mock.patch.object(
+                utils,
+                "get_all_problems",
+                return_value={problem.id: problem for problem in problems},
+            ),
+        ):
+            completed = utils.fold_journal(stored)
+
+    assert completed == {("python", "p0001"), ("c", "p0042")}
+    folded_case = stored.problems[problems[0]].cases[utils.CaseId(problems[0], "1")]
+    assert folded_case.timings == {python: Timing(nanoseconds=600)}
+    assert folded_case.dirty
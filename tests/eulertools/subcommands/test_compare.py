@@ -1,6 +1,8 @@
+import json
 import os
 from unittest import mock
 
+from eulertools.lib.constants import CompareOrder, OutputFormat
 from eulertools.lib.utils import Language, Problem, Summary
 from eulertools.subcommands.compare import Compare
 
@@ -25,8 +27,113 @@ def test_compare_two_languages(
         "│    p0001 │        1 │     44ns │    662ns │",
         "│    p0001 │        2 │     48ns │    721ns │",
         "│    p0042 │        1 │      N/A │    1.4ms │",
+        "├──────────┼──────────┼──────────┼──────────┤",
+        "│  geomean │        * │     46ns │    8.7µs │",
+        "│      p50 │        * │     46ns │    721ns │",
+        "│      p90 │        * │     48ns │    1.1ms │",
+        "│      p99 │        * │     48ns │    1.4ms │",
+        "│ speed-up │        c │    1.00x │    0.07x │",
+        "│ won/lost │        c │      0/0 │      0/2 │",
         "└──────────┴──────────┴──────────┴──────────┘",
     )
 
     assert captured.out.strip() == os.linesep.join(expected_output_lines)
     assert captured.err == ""
+
+
+@mock.patch("eulertools.subcommands.compare.get_summary", new_callable=mock.MagicMock)
+def test_compare_top_regressions_against_a_baseline(
+    mock_get_summary: mock.MagicMock,
+    summary: Summary,
+    problems: list[Problem],
+    languages: list[Language],
+    capsys: mock.MagicMock,
+) -> None:
+    mock_get_summary.return_value = summary
+    compare_command = Compare(
+        languages=languages,
+        problems=problems,
+        baseline=languages[1],
+        order=CompareOrder.REGRESSED,
+        top=2,
+    )
+
+    compare_command.run()
+    captured = capsys.readouterr()
+    expected_output_lines = (
+        "┌──────────┬──────────┬──────────┬──────────┐",
+        "│ problem  │ case_key │    c     │  python  │",
+        "├──────────┼──────────┼──────────┼──────────┤",
+        "│    p0001 │        1 │     44ns │    662ns │",
+        "│    p0001 │        2 │     48ns │    721ns │",
+        "├──────────┼──────────┼──────────┼──────────┤",
+        "│  geomean │        * │     46ns │    8.7µs │",
+        "│      p50 │        * │     46ns │    721ns │",
+        "│      p90 │        * │     48ns │    1.1ms │",
+        "│      p99 │        * │     48ns │    1.4ms │",
+        "│ speed-up │   python │   15.03x │    1.00x │",
+        "│ won/lost │   python │      2/0 │      0/0 │",
+        "└──────────┴──────────┴──────────┴──────────┘",
+    )
+
+    assert captured.out.strip() == os.linesep.join(expected_output_lines)
+
+
+@mock.patch("eulertools.subcommands.compare.get_summary", new_callable=mock.MagicMock)
+def test_compare_as_jsonl(
+    mock_get_summary: mock.MagicMock,
+    summary: Summary,
+    problems: list[Problem],
+    languages: list[Language],
+    capsys: mock.MagicMock,
+) -> None:
+    mock_get_summary.return_value = summary
+    compare_command = Compare(
+        languages=languages, problems=problems, output_format=OutputFormat.JSONL
+    )
+
+    compare_command.run()
+    captured = capsys.readouterr()
+    records = [json.loads(line) for line in captured.out.splitlines()]
+
+    assert [
+        (record["problem"], record["case_key"], record["language"], record["aggregate"])
+        for record in records
+    ] == [
+        ("p0001", "1", "c", 44),
+        ("p0001", "1", "python", 662),
+        ("p0001", "2", "c", 48),
+        ("p0001", "2", "python", 721),
+        ("p0042", "1", "python", 1_400_121),
+    ]
+    assert records[1]["delta"] == 662 / 44 - 1
+    assert records[4]["delta"] is None
+    assert summary.problems == {}
+
+
+@mock.patch("eulertools.subcommands.compare.get_summary", new_callable=mock.MagicMock)
+def test_compare_defaults_to_the_first_language_as_the_baseline(
+    mock_get_summary: mock.MagicMock,
+    summary: Summary,
+    problems: list[Problem],
+    languages: list[Language],
+    capsys: mock.MagicMock,
+) -> None:
+    mock_get_summary.return_value = summary
+    compare_command = Compare(
+        languages=[languages[1], languages[0]],
+        problems=problems,
+        output_format=OutputFormat.JSONL,
+    )
+
+    compare_command.run()
+    captured = capsys.readouterr()
+    records = [json.loads(line) for line in captured.out.splitlines()]
+
+    assert [(record["language"], record["delta"]) for record in records] == [
+        ("python", 0),
+        ("c", 44 / 662 - 1),
+        ("python", 0),
+        ("c", 48 / 721 - 1),
+        ("python", 0),
+    ]
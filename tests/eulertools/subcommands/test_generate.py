@@ -1,10 +1,22 @@
+from collections.abc import Iterator
 from pathlib import Path
 from unittest import mock
 
+import pytest
+
 from eulertools.lib.utils import Language, Problem
 from eulertools.subcommands.generate import Generate
 
 
+@pytest.fixture(autouse=True)
+def template_cache_dir(tmp_path: Path) -> Iterator[Path]:
+    with mock.patch(
+        "eulertools.subcommands.generate.get_template_cache_dir",
+        return_value=tmp_path,
+    ):
+        yield tmp_path
+
+
 @mock.patch("eulertools.subcommands.generate.get_context", new_callable=mock.MagicMock)
 @mock.patch("eulertools.subcommands.generate.get_solution", new_callable=mock.MagicMock)
 @mock.patch("eulertools.subcommands.generate.get_template", new_callable=mock.MagicMock)
@@ -93,3 +105,54 @@ def test_generate_one_missing_solution(
         mock.call("Jinja template\n"),
     ]
     assert mock_write_text.call_args_list == calls
+
+
+@mock.patch("eulertools.subcommands.generate.get_context", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.generate.get_solution", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.generate.get_template", new_callable=mock.MagicMock)
+def test_generate_compiles_each_template_once(
+    mock_get_template: mock.MagicMock,
+    mock_get_solution: mock.MagicMock,
+    mock_get_context: mock.MagicMock,
+    problems: list[Problem],
+    languages: list[Language],
+    data_dir: Path,
+    template_cache_dir: Path,
+) -> None:
+    mock_get_template.return_value = data_dir.joinpath("template.jinja")
+    mock_get_solution.return_value.exists.return_value = False
+    mock_get_context.return_value = {}
+    generate_command = Generate(languages=languages, problems=problems * 10)
+
+    generate_command.run()
+    assert mock_get_template.call_count == len(languages)
+    assert mock_get_solution.return_value.write_text.call_count == 40
+    assert list(template_cache_dir.iterdir())
+
+
+@mock.patch("eulertools.subcommands.generate.get_context", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.generate.get_solution", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.generate.get_template", new_callable=mock.MagicMock)
+def test_generate_dry_run(
+    mock_get_template: mock.MagicMock,
+    mock_get_solution: mock.MagicMock,
+    mock_get_context: mock.MagicMock,
+    problems: list[Problem],
+    languages: list[Language],
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    mock_file = mock.MagicMock(spec=Path)
+    mock_file.exists.side_effect = [True, False, True, True]
+    mock_file.configure_mock(
+        **{"__str__.return_value": "python/src/solutions/p0001.py"}
+    )
+    mock_get_solution.return_value = mock_file
+    generate_command = Generate(languages=languages, problems=problems, dry_run=True)
+
+    generate_command.run()
+    assert mock_file.write_text.call_count == 0
+    assert mock_get_template.call_count == 0
+    assert mock_get_context.call_count == 0
+    assert capsys.readouterr().out.strip() == (
+        "🟠 Generating python // 1... would create `python/src/solutions/p0001.py`"
+    )
@@ -0,0 +1,38 @@
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from eulertools.lib import utils
+from eulertools.subcommands.merge import Merge
+
+
+@mock.patch("eulertools.subcommands.merge.update_summary", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.merge.merge_shards", new_callable=mock.MagicMock)
+def test_merge_removes_the_merged_shards(
+    mock_merge_shards: mock.MagicMock,
+    mock_update_summary: mock.MagicMock,
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    shards_dir = tmp_path.joinpath("shards")
+    shards_dir.mkdir()
+    shard_files = [
+        shards_dir.joinpath("1-of-2.json"),
+        shards_dir.joinpath("2-of-2.json"),
+    ]
+    for shard_file in shard_files:
+        shard_file.write_text("{}")
+
+    with mock.patch.object(utils, "_get_settings_root", return_value=tmp_path):
+        Merge(files=[]).run()
+        Merge(files=[]).run()
+
+    mock_merge_shards.assert_called_once_with(shard_files)
+    mock_update_summary.assert_called_once_with(mock_merge_shards.return_value)
+    assert not any(shards_dir.iterdir())
+    assert capsys.readouterr().out.splitlines() == [
+        f"🟢 Merged {shard_files[0]}",
+        f"🟢 Merged {shard_files[1]}",
+        "🟠 There are no shard files to merge",
+    ]
@@ -0,0 +1,579 @@
+import io
+import threading
+from collections.abc import Iterator
+from dataclasses import replace
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from pyutilkit.timing import Timing
+
+from eulertools.lib import utils
+from eulertools.lib.constants import RSS_UNIT, CaseResult, OutputFormat, ParseResult
+from eulertools.lib.limits import Limits
+from eulertools.lib.utils import (
+    CaseId,
+    IsolationPolicy,
+    Language,
+    Problem,
+    SamplingPolicy,
+    Summary,
+)
+from eulertools.subcommands.run import Run
+
+RUSAGE = SimpleNamespace(
+    ru_utime=0.25, ru_stime=0.5, ru_maxrss=2048, ru_nvcsw=3, ru_nivcsw=1
+)
+
+
+def _popen(stdout: str) -> mock.MagicMock:
+    process = mock.MagicMock()
+    process.stdout = io.StringIO(stdout)
+    process.__enter__.return_value = process
+    return process
+
+
+@pytest.fixture(autouse=True)
+def wait4() -> Iterator[mock.MagicMock]:
+    with mock.patch(
+        "eulertools.subcommands.run.os.wait4",
+        side_effect=lambda pid, _: (pid, 0, RUSAGE),
+        create=True,
+    ) as mock_wait4:
+        yield mock_wait4
+
+
+@pytest.fixture(autouse=True)
+def limits() -> Iterator[mock.MagicMock]:
+    with mock.patch(
+        "eulertools.subcommands.run.get_limits", return_value=Limits()
+    ) as mock_get_limits:
+        yield mock_get_limits
+
+
+@pytest.fixture(autouse=True)
+def verdicts() -> Iterator[mock.MagicMock]:
+    with mock.patch("eulertools.subcommands.run.save_verdicts") as mock_save_verdicts:
+        yield mock_save_verdicts
+
+
+def _fake_popen(command: list[str], **_: object) -> mock.MagicMock:
+    if command[1] == "1":
+        return _popen("Time 1 10\nAnswer 1 233168\nTime 2 12\nAnswer 2 23331668\n")
+    return _popen("Time 1 10\nAnswer 1 162\n")
+
+
+@mock.patch("eulertools.subcommands.run.subprocess.Popen", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.get_solution", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.get_summary", new_callable=mock.MagicMock)
+def test_run_get_summaries_in_parallel(
+    mock_get_summary: mock.MagicMock,
+    mock_get_solution: mock.MagicMock,
+    mock_popen: mock.MagicMock,
+    summary: Summary,
+    problems: list[Problem],
+    languages: list[Language],
+) -> None:
+    mock_get_summary.return_value = summary
+    mock_get_solution.return_value.exists.return_value = True
+    mock_popen.side_effect = _fake_popen
+    runner = Run(languages, problems, verbosity=0, times=1, jobs=4)
+
+    pairs = [
+        (language, problem)
+        for language, problem, _ in runner.get_summaries(languages, problems)
+    ]
+
+    assert pairs == [
+        (languages[0], problems[0]),
+        (languages[0], problems[1]),
+        (languages[1], problems[0]),
+        (languages[1], problems[1]),
+    ]
+    assert mock_popen.call_count == 4
+    case_summary = summary.problems[problems[0]].cases[CaseId(problems[0], "2")]
+    assert case_summary.result == {
+        languages[0]: CaseResult.SUCCESS,
+        languages[1]: CaseResult.SUCCESS,
+    }
+
+
+@mock.patch("eulertools.subcommands.run.subprocess.Popen", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.get_solution", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.get_summary", new_callable=mock.MagicMock)
+def test_run_stops_on_malformed_line(
+    mock_get_summary: mock.MagicMock,
+    mock_get_solution: mock.MagicMock,
+    mock_popen: mock.MagicMock,
+    summary: Summary,
+    problems: list[Problem],
+    languages: list[Language],
+) -> None:
+    mock_get_summary.return_value = summary
+    mock_get_solution.return_value.exists.return_value = True
+    process = _popen("Time 1 10\nSegmentation fault\nAnswer 1 233168\n")
+    mock_popen.return_value = process
+    runner = Run(languages, problems, verbosity=0, times=1)
+
+    list(runner.get_summaries(languages[:1], problems[:1]))
+
+    problem_summary = summary.problems[problems[0]]
+    assert problem_summary.result[languages[0]] == ParseResult.FAILURE
+    assert problem_summary.parse_info[languages[0]] == "Segmentation fault"
+    assert process.kill.call_count == 1
+    assert process.stdout.readline() == "Answer 1 233168\n"
+
+
+@mock.patch("eulertools.subcommands.run.subprocess.Popen", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.get_solution", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.get_summary", new_callable=mock.MagicMock)
+def test_run_samples_until_stable(
+    mock_get_summary: mock.MagicMock,
+    mock_get_solution: mock.MagicMock,
+    mock_popen: mock.MagicMock,
+    summary: Summary,
+    problems: list[Problem],
+    languages: list[Language],
+) -> None:
+    mock_get_summary.return_value = summary
+    mock_get_solution.return_value.exists.return_value = True
+    mock_popen.side_effect = [
+        _popen("Time 1 100\nAnswer 1 162\nTime 1 200\nAnswer 1 162\n"),
+        _popen("Time 1 150\nAnswer 1 162\nTime 1 150\nAnswer 1 162\n"),
+        _popen("Time 1 150\nAnswer 1 162\nTime 1 150\nAnswer 1 162\n"),
+        _popen("Time 1 150\nAnswer 1 162\nTime 1 150\nAnswer 1 162\n"),
+    ]
+    sampling = SamplingPolicy(target_rse=0.1, max_time=Timing(seconds=60))
+    runner = Run(languages, problems, verbosity=0, times=2, sampling=sampling)
+
+    list(runner.get_summaries(languages[:1], problems[1:]))
+
+    assert mock_popen.call_count == 3
+    case_summary = summary.problems[problems[1]].cases[CaseId(problems[1], "1")]
+    assert len(case_summary.new_timings[languages[0]]) == 6
+
+
+@mock.patch("eulertools.subcommands.run.subprocess.Popen", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.get_solution", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.get_summary", new_callable=mock.MagicMock)
+def test_run_prints_the_debug_lines_in_order(
+    mock_get_summary: mock.MagicMock,
+    mock_get_solution: mock.MagicMock,
+    mock_popen: mock.MagicMock,
+    summary: Summary,
+    problems: list[Problem],
+    languages: list[Language],
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    mock_get_summary.return_value = summary
+    mock_get_solution.return_value.exists.return_value = True
+    finished = threading.Event()
+
+    def first_lines() -> Iterator[str]:
+        # the first problem only writes its debug line after the second one is done
+        finished.wait(timeout=5)
+        yield from io.StringIO(
+            "Debug first\nTime 1 10\nAnswer 1 233168\nTime 2 12\nAnswer 2 23331668\n"
+        )
+
+    def second_lines() -> Iterator[str]:
+        yield from io.StringIO("Debug second\nTime 1 10\nAnswer 1 162\n")
+        finished.set()
+
+    def fake_popen(command: list[str], **_: object) -> mock.MagicMock:
+        process = _popen("")
+        process.stdout = first_lines() if command[1] == "1" else second_lines()
+        return process
+
+    mock_popen.side_effect = fake_popen
+    runner = Run(languages[:1], problems, verbosity=0, times=1, jobs=2)
+
+    outputs = [
+        capsys.readouterr().out for _ in runner.get_summaries(languages[:1], problems)
+    ]
+
+    assert outputs == ["🔍Debug first\n", "🔍Debug second\n"]
+
+
+@mock.patch("os.sched_setaffinity", create=True, new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.subprocess.Popen", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.get_solution", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.get_summary", new_callable=mock.MagicMock)
+def test_run_pins_each_job_to_its_own_cpus(
+    mock_get_summary: mock.MagicMock,
+    mock_get_solution: mock.MagicMock,
+    mock_popen: mock.MagicMock,
+    mock_setaffinity: mock.MagicMock,
+    summary: Summary,
+    problems: list[Problem],
+    languages: list[Language],
+) -> None:
+    mock_get_summary.return_value = summary
+    mock_get_solution.return_value.exists.return_value = True
+    mock_popen.side_effect = _fake_popen
+    isolation = IsolationPolicy(cpus=(2, 3, 4, 5))
+    runner = Run(languages, problems, verbosity=0, times=1, jobs=2, isolation=isolation)
+
+    list(runner.get_summaries(languages, problems))
+
+    cpu_sets = {call.args[1] for call in mock_setaffinity.call_args_list}
+    assert mock_setaffinity.call_count == 4
+    assert cpu_sets <= {frozenset({2, 3}), frozenset({4, 5})}
+    assert summary.problems[problems[0]].affinity[languages[0]] in {"2-3", "4-5"}
+
+
+@mock.patch("eulertools.subcommands.run.subprocess.Popen", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.get_solution", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.get_summary", new_callable=mock.MagicMock)
+def test_run_records_resources(
+    mock_get_summary: mock.MagicMock,
+    mock_get_solution: mock.MagicMock,
+    mock_popen: mock.MagicMock,
+    summary: Summary,
+    problems: list[Problem],
+    languages: list[Language],
+) -> None:
+    mock_get_summary.return_value = summary
+    mock_get_solution.return_value.exists.return_value = True
+    mock_popen.side_effect = _fake_popen
+    runner = Run(languages, problems, verbosity=0, times=1)
+
+    list(runner.get_summaries(languages[:1], problems[:1]))
+
+    resources = summary.problems[problems[0]].new_resources[languages[0]]
+    assert resources.user_time == Timing(milliseconds=250)
+    assert resources.system_time == Timing(milliseconds=500)
+    assert resources.cpu_time == Timing(milliseconds=750)
+    assert resources.max_rss == 2048 * RSS_UNIT
+    assert resources.voluntary_switches == 3
+    assert resources.involuntary_switches == 1
+
+
+@mock.patch("eulertools.subcommands.run.subprocess.Popen", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.get_solution", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.get_summary", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.os", new=mock.MagicMock(spec=[]))
+def test_run_without_resources(
+    mock_get_summary: mock.MagicMock,
+    mock_get_solution: mock.MagicMock,
+    mock_popen: mock.MagicMock,
+    summary: Summary,
+    problems: list[Problem],
+    languages: list[Language],
+) -> None:
+    mock_get_summary.return_value = summary
+    mock_get_solution.return_value.exists.return_value = True
+    process = _popen("Time 1 10\nAnswer 1 233168\n")
+    process.wait.return_value = 0
+    mock_popen.return_value = process
+    runner = Run(languages, problems, verbosity=0, times=1)
+
+    list(runner.get_summaries(languages[:1], problems[:1]))
+
+    problem_summary = summary.problems[problems[0]]
+    assert problem_summary.result[languages[0]] == ParseResult.SUCCESS
+    assert languages[0] not in problem_summary.new_resources
+
+
+@mock.patch("eulertools.subcommands.run.subprocess.Popen", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.get_solution", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.get_summary", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.get_run_key", new_callable=mock.MagicMock)
+def test_run_skips_unchanged_solutions(
+    mock_get_run_key: mock.MagicMock,
+    mock_get_summary: mock.MagicMock,
+    mock_get_solution: mock.MagicMock,
+    mock_popen: mock.MagicMock,
+    tmp_path: Path,
+    summary: Summary,
+    problems: list[Problem],
+    languages: list[Language],
+) -> None:
+    mock_get_run_key.return_value = "key"
+    mock_get_summary.return_value = summary
+    mock_get_solution.return_value.exists.return_value = True
+    mock_popen.side_effect = _fake_popen
+
+    with mock.patch.object(utils, "_get_run_cache_dir", return_value=tmp_path):
+        runner = Run(languages, problems, verbosity=0, times=1, use_cache=True)
+        list(runner.get_summaries(languages[:1], problems[:1]))
+        assert mock_popen.call_count == 1
+        assert languages[0] not in summary.problems[problems[0]].cached
+
+        runner = Run(languages, problems, verbosity=0, times=1, use_cache=True)
+        list(runner.get_summaries(languages[:1], problems[:1]))
+        assert mock_popen.call_count == 1
+        assert languages[0] in summary.problems[problems[0]].cached
+
+        mock_get_run_key.return_value = "other"
+        runner = Run(languages, problems, verbosity=0, times=1, use_cache=True)
+        list(runner.get_summaries(languages[:1], problems[:1]))
+        assert mock_popen.call_count == 2
+
+    case_summary = summary.problems[problems[0]].cases[CaseId(problems[0], "2")]
+    assert case_summary.result[languages[0]] == CaseResult.SUCCESS
+
+
+@mock.patch("eulertools.subcommands.run.subprocess.Popen", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.get_solution", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.get_summary", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.get_run_key", new_callable=mock.MagicMock)
+def test_run_caches_each_number_of_times(
+    mock_get_run_key: mock.MagicMock,
+    mock_get_summary: mock.MagicMock,
+    mock_get_solution: mock.MagicMock,
+    mock_popen: mock.MagicMock,
+    tmp_path: Path,
+    summary: Summary,
+    problems: list[Problem],
+    languages: list[Language],
+) -> None:
+    mock_get_run_key.side_effect = lambda _, __, times, ___: f"key-{times}"
+    mock_get_summary.return_value = summary
+    mock_get_solution.return_value.exists.return_value = True
+    mock_popen.side_effect = _fake_popen
+
+    with mock.patch.object(utils, "_get_run_cache_dir", return_value=tmp_path):
+        for times in (1, 2, 1, 2):
+            runner = Run(languages, problems, verbosity=0, times=times, use_cache=True)
+            list(runner.get_summaries(languages[:1], problems[:1]))
+
+    assert mock_popen.call_count == 2
+    assert sorted(path.name for path in tmp_path.joinpath("c", "p0001").iterdir()) == [
+        "1.json",
+        "2.json",
+    ]
+
+
+@mock.patch("eulertools.subcommands.run.subprocess.Popen", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.get_solution", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.get_summary", new_callable=mock.MagicMock)
+def test_run_only_selected_pairs(
+    mock_get_summary: mock.MagicMock,
+    mock_get_solution: mock.MagicMock,
+    mock_popen: mock.MagicMock,
+    summary: Summary,
+    problems: list[Problem],
+    languages: list[Language],
+) -> None:
+    mock_get_summary.return_value = summary
+    mock_get_solution.return_value.exists.return_value = True
+    mock_popen.side_effect = _fake_popen
+    selection = {(languages[0], problems[1]), (languages[1], problems[0])}
+    runner = Run(languages, problems, verbosity=0, times=1, selection=selection)
+
+    pairs = [
+        (language, problem)
+        for language, problem, _ in runner.get_summaries(languages, problems)
+    ]
+
+    assert pairs == [(languages[0], problems[1]), (languages[1], problems[0])]
+    assert mock_popen.call_count == 2
+
+
+def _batch_languages(languages: list[Language]) -> list[Language]:
+    return [
+        replace(language, runner=replace(language.runner, batch=True))
+        for language in languages
+    ]
+
+
+@mock.patch("eulertools.subcommands.run.subprocess.Popen", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.get_solution", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.get_summary", new_callable=mock.MagicMock)
+def test_run_batch_demultiplexes_the_output(
+    mock_get_summary: mock.MagicMock,
+    mock_get_solution: mock.MagicMock,
+    mock_popen: mock.MagicMock,
+    summary: Summary,
+    problems: list[Problem],
+    languages: list[Language],
+) -> None:
+    mock_get_summary.return_value = summary
+    mock_get_solution.return_value.exists.return_value = True
+    process = _popen(
+        "1 Time 1 10\n1 Answer 1 233168\n1 Time 2 12\n1 Answer 2 23331668\n1 Done\n"
+        "42 Time 1 10\n42 Answer 1 162\n42 Done\n"
+    )
+    process.wait.return_value = 0
+    mock_popen.return_value = process
+    python = _batch_languages(languages)[1]
+    runner = Run([python], problems, verbosity=0, times=1)
+
+    pairs = [
+        (language, problem)
+        for language, problem, _ in runner.get_summaries([python], problems)
+    ]
+
+    assert pairs == [(python, problems[0]), (python, problems[1])]
+    assert mock_popen.call_count == 1
+    process.stdin.write.assert_called_once_with("1 1\n42 1\n")
+    assert summary.success(python, problems[0])
+    assert summary.success(python, problems[1])
+
+
+@mock.patch("eulertools.subcommands.run.subprocess.Popen", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.get_solution", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.get_summary", new_callable=mock.MagicMock)
+def test_run_batch_attributes_a_crash(
+    mock_get_summary: mock.MagicMock,
+    mock_get_solution: mock.MagicMock,
+    mock_popen: mock.MagicMock,
+    summary: Summary,
+    problems: list[Problem],
+    languages: list[Language],
+) -> None:
+    mock_get_summary.return_value = summary
+    mock_get_solution.return_value.exists.return_value = True
+    crashed = _popen("1 Time 1 10\n1 Answer 1 233168\n")
+    crashed.wait.return_value = 1
+    requeued = _popen("42 Time 1 10\n42 Answer 1 162\n42 Done\n")
+    requeued.wait.return_value = 0
+    mock_popen.side_effect = [crashed, requeued]
+    python = _batch_languages(languages)[1]
+    runner = Run([python], problems, verbosity=0, times=1)
+
+    list(runner.get_summaries([python], problems))
+
+    assert mock_popen.call_count == 2
+    requeued.stdin.write.assert_called_once_with("42 1\n")
+    assert summary.problems[problems[0]].result[python] == ParseResult.FAILURE
+    assert summary.success(python, problems[1])
+
+
+@mock.patch("eulertools.subcommands.run.Watchdog", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.get_limits", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.subprocess.Popen", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.get_solution", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.get_summary", new_callable=mock.MagicMock)
+def test_run_batch_times_out_each_problem(
+    mock_get_summary: mock.MagicMock,
+    mock_get_solution: mock.MagicMock,
+    mock_popen: mock.MagicMock,
+    mock_get_limits: mock.MagicMock,
+    mock_watchdog: mock.MagicMock,
+    summary: Summary,
+    problems: list[Problem],
+    languages: list[Language],
+) -> None:
+    mock_get_summary.return_value = summary
+    mock_get_solution.return_value.exists.return_value = True
+    timeout = Timing(seconds=1)
+    mock_get_limits.side_effect = lambda _, problem: (
+        Limits(timeout=timeout) if problem == problems[1] else Limits()
+    )
+    process = _popen(
+        "1 Time 1 10\n1 Answer 1 233168\n1 Time 2 12\n1 Answer 2 23331668\n1 Done\n"
+        "42 Time 1 10\n"
+    )
+    process.wait.return_value = -9
+    mock_popen.return_value = process
+    watchdog = mock_watchdog.return_value.__enter__.return_value
+    watchdog.expired = True
+    python = _batch_languages(languages)[1]
+    runner = Run([python], problems, verbosity=0, times=1)
+
+    list(runner.get_summaries([python], problems))
+
+    assert mock_watchdog.call_args.args[0] is None
+    assert watchdog.rearm.call_args_list == [mock.call(timeout)]
+    assert summary.success(python, problems[0])
+    assert summary.problems[problems[1]].result[python] == ParseResult.TIMED_OUT
+
+
+@pytest.mark.parametrize(
+    ("jobs", "expected"),
+    [
+        (1, [(1, 1), (0, 1), (0, 0), (1, 0)]),
+        (4, [(1, 1), (1, 0), (0, 0), (0, 1)]),
+    ],
+)
+@mock.patch("eulertools.subcommands.run.subprocess.Popen", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.get_solution", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.get_summary", new_callable=mock.MagicMock)
+@mock.patch(
+    "eulertools.subcommands.run.load_failures",
+    new=mock.MagicMock(return_value={("python", "p0042")}),
+)
+def test_run_prioritises_failures_and_durations(
+    mock_get_summary: mock.MagicMock,
+    mock_get_solution: mock.MagicMock,
+    mock_popen: mock.MagicMock,
+    verdicts: mock.MagicMock,
+    summary: Summary,
+    problems: list[Problem],
+    languages: list[Language],
+    jobs: int,
+    expected: list[tuple[int, int]],
+) -> None:
+    mock_get_summary.return_value = summary
+    mock_get_solution.return_value.exists.return_value = True
+    mock_popen.side_effect = _fake_popen
+    runner = Run(languages, problems, verbosity=0, times=1, jobs=jobs, prioritise=True)
+
+    pairs = [
+        (language, problem)
+        for language, problem, _ in runner.get_summaries(languages, problems)
+    ]
+
+    assert pairs == [(languages[i], problems[j]) for i, j in expected]
+    verdicts.assert_called_once_with(dict.fromkeys(pairs, True))
+
+
+@mock.patch("eulertools.subcommands.run.subprocess.Popen", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.get_solution", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.get_summary", new_callable=mock.MagicMock)
+@mock.patch.object(Run, "_print_summary", new_callable=mock.MagicMock)
+def test_run_fails_fast(
+    mock_print_summary: mock.MagicMock,
+    mock_get_summary: mock.MagicMock,
+    mock_get_solution: mock.MagicMock,
+    mock_popen: mock.MagicMock,
+    summary: Summary,
+    problems: list[Problem],
+    languages: list[Language],
+) -> None:
+    mock_get_summary.return_value = summary
+    mock_get_solution.return_value.exists.return_value = True
+    mock_popen.side_effect = lambda *_, **__: _popen("Time 1 10\nAnswer 1 0\n")
+    runner = Run(languages, problems, verbosity=0, times=1, fail_fast=True)
+
+    with pytest.raises(SystemExit, match="81"):
+        runner.run()
+
+    mock_print_summary.assert_called_once_with(languages[0], problems[0])
+
+
+@mock.patch("eulertools.subcommands.run.subprocess.Popen", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.get_solution", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.run.get_summary", new_callable=mock.MagicMock)
+def test_run_streams_records(
+    mock_get_summary: mock.MagicMock,
+    mock_get_solution: mock.MagicMock,
+    mock_popen: mock.MagicMock,
+    summary: Summary,
+    problems: list[Problem],
+    languages: list[Language],
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    mock_get_summary.return_value = summary
+    mock_get_solution.return_value.exists.return_value = True
+    mock_popen.side_effect = _fake_popen
+    runner = Run(
+        languages[:1],
+        problems[:1],
+        verbosity=0,
+        times=1,
+        output_format=OutputFormat.CSV,
+    )
+
+    runner.run()
+
+    assert capsys.readouterr().out.splitlines() == [
+        "problem,case_key,language,result,answer,samples,aggregate,delta",
+        f"p0001,1,{languages[0].name},success,233168,10,,",
+        f"p0001,2,{languages[0].name},success,23331668,12,,",
+    ]
+    case_summary = summary.problems[problems[0]].cases[CaseId(problems[0], "1")]
+    assert languages[0] not in case_summary.new_timings
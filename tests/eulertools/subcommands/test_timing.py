@@ -0,0 +1,105 @@
+from array import array
+from unittest import mock
+
+import pytest
+from pyutilkit.timing import Timing
+
+from eulertools.lib.constants import RUN, CaseResult, ParseResult, UpdateMode
+from eulertools.lib.history import HistoryRecord
+from eulertools.lib.utils import CaseId, Language, Problem, Summary
+from eulertools.subcommands.timing import Time
+
+
+@mock.patch("eulertools.subcommands.timing.record_history", new=mock.MagicMock())
+@mock.patch("eulertools.subcommands.timing.get_history", new_callable=mock.MagicMock)
+@mock.patch("eulertools.subcommands.timing.Run", new_callable=mock.MagicMock)
+def test_time_compares_against_the_cached_timing(
+    mock_run: mock.MagicMock,
+    mock_get_history: mock.MagicMock,
+    summary: Summary,
+    problems: list[Problem],
+    languages: list[Language],
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    problem_summary = summary.problems[problems[0]]
+    problem_summary.result[languages[0]] = ParseResult.SUCCESS
+    for case_key, timing in (("1", 80), ("2", 48)):
+        case_summary = problem_summary.cases[CaseId(problems[0], case_key)]
+        case_summary.new_timings[languages[0]] = [Timing(nanoseconds=timing)] * 10
+    problem_summary.cases[CaseId(problems[0], "1")].runs[languages[0]] = "100"
+    mock_run.return_value.get_summaries.return_value = [
+        (languages[0], problems[0], summary)
+    ]
+    # the cached timing of 44ns was stored from the first run, whose samples were
+    # downsampled since, and the previous run already regressed without being stored
+    mock_get_history.return_value = {
+        "1": [
+            HistoryRecord(
+                case_key="1",
+                timestamp=100,
+                commit="abc0",
+                samples=array("q", [40, 45] * 5),
+            ),
+            HistoryRecord(
+                case_key="1",
+                timestamp=200,
+                commit="abc1",
+                samples=array("q", [80] * 10),
+            ),
+        ]
+    }
+    time_command = Time(
+        languages=languages[:1],
+        problems=problems[:1],
+        times=10,
+        verbosity=0,
+        update_mode=UpdateMode.NONE,
+        fail_on_regression=50,
+    )
+
+    with pytest.raises(SystemExit, match="82"):
+        time_command.run()
+    lines = capsys.readouterr().out.strip().splitlines()
+
+    assert lines[0].startswith(
+        "🔴 Timing c // 1 // 1... timing changed from 44ns to 80ns"
+    )
+    assert "95% CI" in lines[0]
+    assert lines[1] == "🔵 Timing c // 1 // 2... timing remained unchanged at: 48ns"
+
+
+@mock.patch("eulertools.subcommands.timing.update_summary", new=mock.MagicMock())
+@mock.patch("eulertools.subcommands.timing.get_journal", new=mock.MagicMock())
+@mock.patch("eulertools.subcommands.timing.get_history", new=mock.MagicMock())
+@mock.patch(
+    "eulertools.subcommands.timing.record_history",
+    new=mock.MagicMock(return_value=300),
+)
+@mock.patch("eulertools.subcommands.timing.Run", new_callable=mock.MagicMock)
+def test_time_stores_the_run_of_the_timing(
+    mock_run: mock.MagicMock,
+    summary: Summary,
+    problems: list[Problem],
+    languages: list[Language],
+) -> None:
+    problem_summary = summary.problems[problems[0]]
+    problem_summary.result[languages[0]] = ParseResult.SUCCESS
+    for case_summary in problem_summary.cases.values():
+        case_summary.result[languages[0]] = CaseResult.SUCCESS
+        case_summary.new_timings[languages[0]] = [Timing(nanoseconds=50)] * 10
+    mock_run.return_value.get_summaries.return_value = [
+        (languages[0], problems[0], summary)
+    ]
+    time_command = Time(
+        languages=languages[:1],
+        problems=problems[:1],
+        times=10,
+        verbosity=0,
+        update_mode=UpdateMode.UPDATE,
+    )
+
+    time_command.run()
+
+    case_data = problem_summary.as_dict()["1"]
+    assert case_data["c"] == 50
+    assert case_data[RUN] == {"c": "300"}
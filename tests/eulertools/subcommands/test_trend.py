@@ -0,0 +1,86 @@
+import os
+from array import array
+from unittest import mock
+
+from eulertools.lib.constants import OutputFormat
+from eulertools.lib.history import HistoryRecord
+from eulertools.lib.utils import Language, Problem
+from eulertools.subcommands.trend import Trend
+
+
+def _history(*timings: int) -> dict[str, list[HistoryRecord]]:
+    return {
+        "1": [
+            HistoryRecord(
+                case_key="1",
+                timestamp=100 * index,
+                commit=f"abc{index}",
+                samples=array("q", [timing]),
+            )
+            for index, timing in enumerate(timings)
+        ]
+    }
+
+
+@mock.patch("eulertools.subcommands.trend.get_history", new_callable=mock.MagicMock)
+def test_trend_reports_the_last_change_point(
+    mock_get_history: mock.MagicMock,
+    problems: list[Problem],
+    languages: list[Language],
+    capsys: mock.MagicMock,
+) -> None:
+    mock_get_history.return_value = _history(100, 102, 99, 101, 200, 198, 202, 201)
+    trend_command = Trend(languages=languages[:1], problems=problems[:1])
+
+    trend_command.run()
+    captured = capsys.readouterr()
+
+    assert captured.out.strip() == (
+        "🔴 Trend c // 1 // 1... ▁▁▁▁████ changed from 100ns to 200ns (+99.50%) "
+        "at abc4, 1 change point(s) in 8 runs"
+    )
+
+
+@mock.patch("eulertools.subcommands.trend.get_history", new_callable=mock.MagicMock)
+def test_trend_as_csv(
+    mock_get_history: mock.MagicMock,
+    problems: list[Problem],
+    languages: list[Language],
+    capsys: mock.MagicMock,
+) -> None:
+    mock_get_history.return_value = _history(100, 101, 100, 99, 50, 51, 49, 52, 50)
+    trend_command = Trend(
+        languages=languages[:1],
+        problems=problems[:1],
+        last=8,
+        output_format=OutputFormat.CSV,
+    )
+
+    trend_command.run()
+    captured = capsys.readouterr()
+    assert captured.out.strip() == os.linesep.join(
+        [
+            "problem,case_key,language,timestamp,commit,timing,change_point",
+            "p0001,1,c,100,abc1,101,False",
+            "p0001,1,c,200,abc2,100,False",
+            "p0001,1,c,300,abc3,99,False",
+            "p0001,1,c,400,abc4,50,True",
+            "p0001,1,c,500,abc5,51,False",
+            "p0001,1,c,600,abc6,49,False",
+            "p0001,1,c,700,abc7,52,False",
+            "p0001,1,c,800,abc8,50,False",
+        ]
+    )
+
+
+@mock.patch("eulertools.subcommands.trend.get_history", new_callable=mock.MagicMock)
+def test_trend_without_history(
+    mock_get_history: mock.MagicMock,
+    problems: list[Problem],
+    languages: list[Language],
+    capsys: mock.MagicMock,
+) -> None:
+    mock_get_history.return_value = {}
+    Trend(languages=languages, problems=problems).run()
+
+    assert capsys.readouterr().out.strip() == "🟠 There is no timing history"
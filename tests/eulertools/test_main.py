@@ -5,10 +5,12 @@ import pytest
 from eulertools.__main__ import main
 from eulertools.subcommands.compare import Compare
 from eulertools.subcommands.generate import Generate
+from eulertools.subcommands.merge import Merge
 from eulertools.subcommands.run import Run
 from eulertools.subcommands.statement import Statement
 from eulertools.subcommands.test import Test
 from eulertools.subcommands.timing import Time
+from eulertools.subcommands.trend import Trend
 
 
 @pytest.mark.parametrize(
@@ -16,9 +18,11 @@ from eulertools.subcommands.timing import Time
     [
         ("compare", Compare),
         ("generate", Generate),
+        ("merge", Merge),
         ("statement", Statement),
         ("test", Test),
         ("time", Time),
+        ("trend", Trend),
     ],
 )
 @mock.patch("eulertools.lib.cli.filter_languages", mock.MagicMock())
@@ -27,7 +31,9 @@ def test_main(subcommand: str, command_class: object) -> None:
     with (
         mock.patch(
             "eulertools.__main__.parse_args",
-            new=mock.MagicMock(return_value=mock.MagicMock(subcommand=subcommand)),
+            new=mock.MagicMock(
+                return_value=mock.MagicMock(subcommand=subcommand, verbosity=0)
+            ),
         ),
         mock.patch.object(command_class, "run", mock.MagicMock()) as mock_runner,
     ):
@@ -39,7 +45,7 @@ def test_main(subcommand: str, command_class: object) -> None:
 
 @mock.patch(
     "eulertools.__main__.parse_args",
-    new=mock.MagicMock(return_value=mock.MagicMock(subcommand="run")),
+    new=mock.MagicMock(return_value=mock.MagicMock(subcommand="run", verbosity=0)),
 )
 @mock.patch("eulertools.subcommands.run.get_summary", new=mock.MagicMock())
 @mock.patch.object(Run, "run", new_callable=mock.MagicMock())